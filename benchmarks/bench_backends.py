@@ -0,0 +1,100 @@
+"""Benchmark: reading history with the git CLI versus pygit2.
+
+Builds a throwaway repository with a synthetic history (commits are
+written with `git fast-import`, so setup stays quick even for large
+histories), then times a full history read, a read with file paths and
+a small incremental read through each backend. The first two show the
+parsing and walking cost; the incremental read is dominated by the
+per-run process spawn that pygit2 avoids.
+
+Run with:
+    python benchmarks/bench_backends.py [--commits N] [--repeat N]
+"""
+
+import argparse
+import subprocess
+import tempfile
+import time
+
+from automated_changelog.backends import GitCLIBackend, Pygit2Backend
+
+
+def make_repo(path: str, commits: int) -> None:
+    """Repository with `commits` commits, each touching one of 200 files."""
+    lines = []
+    for n in range(commits):
+        message = f"feat: change number {n}\n".encode()
+        content = f"{n}\n".encode()
+        lines.append(b"commit refs/heads/main")
+        lines.append(f"mark :{n + 1}".encode())
+        lines.append(
+            f"committer Bench <bench@example.com> {1700000000 + n * 60} +0000".encode()
+        )
+        lines.append(f"data {len(message)}".encode())
+        lines.append(message)
+        if n:
+            lines.append(f"from :{n}".encode())
+        lines.append(f"M 644 inline src/file_{n % 200}.txt".encode())
+        lines.append(f"data {len(content)}".encode())
+        lines.append(content)
+    subprocess.run(["git", "init", "-q", "-b", "main", path], check=True)
+    subprocess.run(
+        ["git", "-C", path, "fast-import", "--quiet"],
+        input=b"\n".join(lines) + b"\n",
+        check=True,
+    )
+    subprocess.run(["git", "-C", path, "reset", "-q", "--hard", "main"], check=True)
+
+
+def best_of(repeat: int, fn) -> float:
+    """Fastest of `repeat` runs in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commits", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as repo:
+        make_repo(repo, args.commits)
+        last = subprocess.run(
+            ["git", "-C", repo, "rev-parse", "HEAD~10"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+
+        backends = [GitCLIBackend(repo), Pygit2Backend(repo)]
+        reads = {
+            "full history": {},
+            "full history + paths": {"with_paths": True},
+            "last 10 commits": {"last_commit_hash": last},
+        }
+
+        print(f"{args.commits} commits, best of {args.repeat}")
+        for label, kwargs in reads.items():
+            results = []
+            for backend in backends:
+                commits = list(backend.iter_commits(**kwargs))
+                results.append(commits)
+                elapsed = best_of(
+                    args.repeat, lambda: list(backend.iter_commits(**kwargs))
+                )
+                print(f"{label:<24}{backend.name:<8}{elapsed:10.1f} ms")
+            # Short hashes may differ in length on large repositories
+            git_commits, pygit2_commits = (
+                [{**commit, "short_hash": None} for commit in commits]
+                for commits in results
+            )
+            assert git_commits == pygit2_commits, f"backends disagree on {label}"
+
+
+if __name__ == "__main__":
+    main()
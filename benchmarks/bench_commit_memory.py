@@ -0,0 +1,79 @@
+"""Memory per commit: plain dicts versus Commit records.
+
+Run with:
+    python benchmarks/bench_commit_memory.py [--commits N]
+"""
+
+import argparse
+import random
+import tracemalloc
+
+from automated_changelog.git_state import Commit
+
+AUTHORS = [f"Developer {n}" for n in range(50)]
+
+
+def make_fields(count: int, seed: int = 0) -> list[tuple[str, str, str, str, str]]:
+    """Build realistic commit fields as they come out of git log."""
+    rng = random.Random(seed)
+    fields = []
+    for n in range(count):
+        commit_hash = f"{rng.getrandbits(160):040x}"
+        # Author names arrive as fresh strings for every record, like a parser
+        author = "".join(rng.choice(AUTHORS))
+        date = f"2025-{n % 12 + 1:02d}-{n % 28 + 1:02d} 12:{n % 60:02d}"
+        subject = f"feat: change number {n} to the thing"
+        fields.append((commit_hash, commit_hash[:7], author, date, subject))
+    return fields
+
+
+def as_dicts(fields):
+    return [
+        {
+            "hash": h,
+            "short_hash": short,
+            "author": author,
+            "date": date,
+            "subject": subject,
+        }
+        for h, short, author, date, subject in fields
+    ]
+
+
+def as_records(fields):
+    return [
+        Commit(hash=h, author=author, date=date, subject=subject, abbrev=len(short))
+        for h, short, author, date, subject in fields
+    ]
+
+
+def measure(build, fields) -> int:
+    """Return bytes allocated by build(fields), excluding the inputs."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    # Copy the inputs so each representation owns its strings
+    result = build([tuple("".join(f) for f in row) for row in fields])
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del result
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--commits", type=int, default=100_000)
+    args = parser.parse_args()
+
+    fields = make_fields(args.commits)
+    dict_bytes = measure(as_dicts, fields)
+    record_bytes = measure(as_records, fields)
+
+    print(f"commits:        {args.commits}")
+    print(f"dict:           {dict_bytes / args.commits:8.1f} bytes/commit")
+    print(f"Commit:         {record_bytes / args.commits:8.1f} bytes/commit")
+    print(f"reduction:      {1 - record_bytes / dict_bytes:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Microbenchmark: filter_commits over 100k subjects x 500 rules.
+
+Compares the compiled CommitFilter against the original per-rule loop
+and checks that both keep exactly the same commits.
+
+Run with:
+    python benchmarks/bench_filter.py [--subjects N] [--rules N]
+"""
+
+import argparse
+import random
+import time
+
+from automated_changelog.filtering import compile_filter, filter_commits
+
+WORDS = [
+    "parser", "cache", "widget", "login", "token", "session", "render",
+    "deploy", "config", "schema", "index", "query", "build", "export",
+]  # fmt: skip
+
+
+def make_rules(count: int, rng: random.Random) -> dict[str, list[str]]:
+    """Half prefix rules, half keyword rules."""
+    prefixes = [f"{rng.choice(WORDS)}-{n}:" for n in range(count // 2)]
+    keywords = [
+        f"{rng.choice(WORDS)} {rng.choice(WORDS)}{n}" for n in range(count - count // 2)
+    ]
+    return {"ignore_prefixes": prefixes, "ignore_keywords": keywords}
+
+
+def make_commits(count: int, rules, rng: random.Random) -> list[dict[str, str]]:
+    commits = []
+    for n in range(count):
+        subject = " ".join(rng.choice(WORDS) for _ in range(6))
+        roll = rng.random()
+        if roll < 0.05:
+            subject = rng.choice(rules["ignore_prefixes"]) + " " + subject
+        elif roll < 0.10:
+            subject += " " + rng.choice(rules["ignore_keywords"]).upper()
+        commits.append({"short_hash": f"{n:07x}", "subject": subject})
+    return commits
+
+
+def naive_filter(commits, filter_config):
+    """The pre-compilation implementation of filter_commits."""
+    filtered = []
+    ignore_prefixes = filter_config.get("ignore_prefixes", [])
+    ignore_keywords = filter_config.get("ignore_keywords", [])
+    for commit in commits:
+        subject = commit["subject"]
+        if any(subject.startswith(prefix) for prefix in ignore_prefixes):
+            continue
+        subject_lower = subject.lower()
+        if any(keyword.lower() in subject_lower for keyword in ignore_keywords):
+            continue
+        filtered.append(commit)
+    return filtered
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subjects", type=int, default=100_000)
+    parser.add_argument("--rules", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    rules = make_rules(args.rules, rng)
+    commits = make_commits(args.subjects, rules, rng)
+
+    expected, naive_seconds = timed(naive_filter, commits, rules)
+    _, compile_seconds = timed(compile_filter, rules)
+    result, compiled_seconds = timed(filter_commits, commits, rules)
+    assert result == expected, "compiled filter disagrees with the naive loop"
+
+    print(f"subjects x rules: {args.subjects} x {args.rules}")
+    print(f"kept:             {len(result)}")
+    print(f"naive loop:       {naive_seconds:8.3f} s")
+    print(f"compile rules:    {compile_seconds:8.3f} s")
+    print(f"compiled filter:  {compiled_seconds:8.3f} s")
+    print(f"speedup:          {naive_seconds / compiled_seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
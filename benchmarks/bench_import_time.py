@@ -0,0 +1,102 @@
+"""Benchmark: startup time of commands that never call an LLM.
+
+Measures wall-clock time of `init`, `--help` and `generate --skip-llm
+--dry-run` (in a throwaway git repository), plus the cumulative import
+time of the CLI module as reported by `python -X importtime`. Heavy
+modules (litellm, dotenv, httpx) must not show up in these commands.
+
+Run with:
+    python benchmarks/bench_import_time.py [--repeat N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HEAVY_MODULES = ("litellm", "dotenv", "httpx")
+
+CLI = [sys.executable, "-m", "automated_changelog.cli"]
+
+
+def best_of(repeat: int, cmd: list[str], cwd: str) -> float:
+    """Fastest of `repeat` runs in milliseconds (least scheduler noise)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=cwd, capture_output=True, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def import_profile(module: str) -> tuple[float, list[str]]:
+    """Cumulative import time of `module` (ms) and heavy modules it loaded."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0.0
+    loaded = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        loaded.add(name.split(".")[0])
+        if name == module:
+            total = int(cumulative) / 1000
+    return total, sorted(loaded.intersection(HEAVY_MODULES))
+
+
+def make_repo(path: str) -> None:
+    """A tiny git repository with a config and a few commits."""
+    env = {
+        **os.environ,
+        "GIT_AUTHOR_NAME": "Bench",
+        "GIT_AUTHOR_EMAIL": "bench@example.com",
+        "GIT_COMMITTER_NAME": "Bench",
+        "GIT_COMMITTER_EMAIL": "bench@example.com",
+    }
+    subprocess.run(["git", "init", "-q", path], check=True)
+    for n in range(20):
+        subprocess.run(
+            ["git", "-C", path, "commit", "-q", "--allow-empty", "-m", f"feat: {n}"],
+            check=True,
+            env=env,
+        )
+    subprocess.run(CLI + ["init"], cwd=path, capture_output=True, check=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as repo:
+        make_repo(repo)
+        baseline = best_of(args.repeat, [sys.executable, "-c", "pass"], repo)
+        commands = {
+            "--help": CLI + ["--help"],
+            "init": CLI + ["init", "--config", "bench_config.yaml"],
+            "generate --skip-llm": CLI + ["generate", "--skip-llm", "--dry-run"],
+        }
+
+        print(f"{'python -c pass':<24}{baseline:8.1f} ms")
+        for label, cmd in commands.items():
+            if label == "init":
+                # Answer the overwrite prompt on repeated runs
+                cmd = ["sh", "-c", 'echo y | "$@"', "sh", *cmd]
+            elapsed = best_of(args.repeat, cmd, repo)
+            print(f"{label:<24}{elapsed:8.1f} ms  (+{elapsed - baseline:.1f} ms)")
+
+    for module in ("automated_changelog.cli", "automated_changelog.llm"):
+        total, heavy = import_profile(module)
+        print(f"import {module:<32}{total:8.1f} ms  heavy: {', '.join(heavy) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
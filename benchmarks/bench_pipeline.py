@@ -0,0 +1,335 @@
+"""Benchmark: the generate pipeline on synthetic repositories of 1k to 1M commits.
+
+Builds git repositories with realistic commit subjects, authors and file
+churn (written with `git fast-import`, streamed so even 1M commits stay
+cheap to set up), then times each stage of a `generate` run on them:
+
+* fetch_commits, with and without file paths
+* filter_commits with the default config's filter rules
+* generate_summary (map-reduce over all commits) against a stub LLM that
+  answers instantly, or after --llm-latency seconds, without the network
+  (--http-stub sends the requests through litellm to a local
+  StubLLMServer instead, to include the HTTP path)
+* markdown assembly of the entry, as a string and streamed to a file
+* read_last_commit_hash and write_changelog_entry on a changelog holding
+  the whole history
+
+Each stage is run again under tracemalloc for its peak Python memory.
+Results are written as JSON; pass an earlier file with --compare to see
+throughput and memory changes between releases.
+
+Run with:
+    python benchmarks/bench_pipeline.py [--sizes 1000,100000,1000000]
+        [--repo-dir DIR] [--output FILE] [--compare OLD_FILE]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from importlib.metadata import version
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import yaml
+
+from automated_changelog.compaction import PromptCompactor
+from automated_changelog.config import generate_config_template
+from automated_changelog.filtering import filter_commits
+from automated_changelog.git_state import (
+    fetch_commits,
+    read_last_commit_hash,
+    write_changelog_entry,
+)
+from automated_changelog.llm import AsyncLLMClient
+from automated_changelog.rendering import EntryRenderer
+from automated_changelog.stub_server import StubLLMServer
+from automated_changelog.summarization import generate_summary
+
+TYPES = [
+    ("feat", 30), ("fix", 25), ("chore", 10), ("docs", 8), ("test", 7),
+    ("refactor", 7), ("perf", 3), ("ci", 3), ("build", 2), ("merge", 3),
+    ("bump", 2),
+]  # fmt: skip
+SCOPES = ["api", "cli", "auth", "db", "ui", "parser", "cache", "deps", None, None]
+VERBS = ["add", "fix", "handle", "support", "remove", "update", "speed up", "rework"]
+NOUNS = [
+    "login flow", "token refresh", "pagination", "export to CSV", "retry logic",
+    "schema migration", "error messages", "config loading", "search index",
+    "rate limiting", "session timeout", "webhook payloads", "dark mode",
+]  # fmt: skip
+AUTHORS = [f"Developer {n}" for n in range(80)]
+SOURCE_DIRS = [f"src/pkg_{n}" for n in range(30)]
+
+
+def make_subject(rng: random.Random, n: int) -> str:
+    """A commit subject in the mix seen in a busy repository."""
+    kind = rng.choices([t for t, _ in TYPES], [w for _, w in TYPES])[0]
+    if kind == "merge":
+        return f"Merge pull request #{n} from dev{n % 80}/topic-{n}"
+    if kind == "bump":
+        return f"Bump version to {n // 1000}.{n // 100 % 10}.{n % 100}"
+    scope = rng.choice(SCOPES)
+    prefix = f"{kind}({scope}): " if scope else f"{kind}: "
+    subject = f"{prefix}{rng.choice(VERBS)} {rng.choice(NOUNS)}"
+    if rng.random() < 0.3:
+        subject += f" (#{rng.randrange(1, 20000)})"
+    return subject
+
+
+def make_paths(rng: random.Random, subject: str, n: int) -> list[str]:
+    """Files touched by a commit; about 1% are huge vendoring commits."""
+    if subject.startswith("docs"):
+        return [f"docs/page_{rng.randrange(200)}.md"]
+    if subject.startswith("test"):
+        return [f"tests/test_{rng.randrange(300)}.py"]
+    if subject.startswith("ci"):
+        return [".github/workflows/ci.yml"]
+    if rng.random() < 0.01:
+        return [f"vendor/lib_{n % 7}/file_{k}.c" for k in range(100)]
+    return [
+        f"{rng.choice(SOURCE_DIRS)}/module_{rng.randrange(60)}.py"
+        for _ in range(rng.randint(1, 4))
+    ]
+
+
+def make_repo(path: Path, commits: int, seed: int = 0) -> None:
+    """Repository with `commits` synthetic commits on branch main."""
+    rng = random.Random(seed)
+    subprocess.run(["git", "init", "-q", "-b", "main", str(path)], check=True)
+    importer = subprocess.Popen(
+        ["git", "-C", str(path), "fast-import", "--quiet"], stdin=subprocess.PIPE
+    )
+    out = importer.stdin
+    start = 1_600_000_000
+    for n in range(commits):
+        subject = make_subject(rng, n)
+        message = subject.encode() + b"\n"
+        author = rng.choice(AUTHORS)
+        when = f"{start + n * 600} +0000"
+        email = author.lower().replace(" ", ".")
+        out.write(
+            b"commit refs/heads/main\n"
+            + f"mark :{n + 1}\n".encode()
+            + f"author {author} <{email}@example.com> {when}\n".encode()
+            + f"committer {author} <{email}@example.com> {when}\n".encode()
+            + f"data {len(message)}\n".encode()
+            + message
+        )
+        if n:
+            out.write(f"from :{n}\n".encode())
+        content = f"{n}\n".encode()
+        for file_path in sorted(set(make_paths(rng, subject, n))):
+            out.write(
+                f"M 644 inline {file_path}\ndata {len(content)}\n".encode() + content
+            )
+        out.write(b"\n")
+    out.close()
+    if importer.wait():
+        raise RuntimeError("git fast-import failed")
+
+
+def stub_llm(latency: float):
+    """Replacement for litellm.acompletion with deterministic answers."""
+
+    async def acompletion(**request):
+        if latency:
+            await asyncio.sleep(latency)
+        lines = request["messages"][0]["content"].count("\n- ")
+        text = f"- Summarized {lines} lines\n- Deterministic stub output"
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+            usage=SimpleNamespace(completion_tokens=12),
+        )
+
+    return acompletion
+
+
+def llm_stub(args):
+    """Context manager answering LLM requests during the summary stage."""
+    if not args.http_stub:
+        return patch("automated_changelog.llm.acompletion", stub_llm(args.llm_latency))
+    server = StubLLMServer(latency=args.llm_latency)
+    os.environ["LITELLM_PROXY_API_BASE"] = server.url
+    return server
+
+
+def measure(func, repeat: int, memory: bool) -> tuple[object, dict]:
+    """Best wall time of `repeat` runs and, optionally, peak traced memory."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    stats = {"seconds": round(best, 6)}
+    if memory:
+        del result
+        tracemalloc.start()
+        result = func()
+        stats["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, stats
+
+
+def bench_size(repo: Path, work: Path, args) -> dict:
+    """Time every pipeline stage on one repository."""
+    filter_config = yaml.safe_load(generate_config_template("bench"))["filter"]
+    stages = {}
+
+    def run(name, func):
+        result, stats = measure(func, args.repeat, not args.no_memory)
+        stages[name] = stats
+        print(f"  {name:<24}{stats['seconds']:10.3f} s", flush=True)
+        return result
+
+    run("fetch_commits", lambda: fetch_commits(repo_path=repo))
+    commits = run(
+        "fetch_commits_paths", lambda: fetch_commits(repo_path=repo, with_paths=True)
+    )
+    filtered = run("filter_commits", lambda: filter_commits(commits, filter_config))
+
+    def summarize():
+        client = AsyncLLMClient(max_concurrency=args.llm_concurrency)
+        return generate_summary(
+            filtered,
+            "Summarize the commits in 2-4 bullet points.",
+            chunk_token_budget=8000,
+            client=client,
+            compactor=PromptCompactor(),
+        )
+
+    with llm_stub(args):
+        # Keep the one-off import of litellm out of the measurement
+        generate_summary(filtered[:1], "Warm up.")
+        summary = run("generate_summary", summarize)
+
+    renderer = EntryRenderer()
+    entry_args = {
+        "latest_hash": commits[0]["hash"],
+        "changelog_summary": summary,
+        "collapse_commits": True,
+    }
+    entry = run(
+        "build_markdown",
+        lambda: renderer.render("2025-01-01", commits, **entry_args),
+    )
+
+    def render_to_file():
+        with open(work / "entry.md", "w", encoding="utf-8") as out:
+            renderer.write(out, "2025-01-01", commits, **entry_args)
+
+    run("build_markdown_to_file", render_to_file)
+
+    # A changelog holding the whole history, plus one new entry on top
+    changelog = work / "CHANGELOG.md"
+    changelog.unlink(missing_ok=True)
+    write_changelog_entry(changelog, commits[-1]["hash"], entry)
+    new_entry = renderer.render(
+        "2025-01-02", commits[:10], latest_hash=commits[0]["hash"]
+    )
+    run("read_last_commit_hash", lambda: read_last_commit_hash(changelog))
+    run(
+        "write_changelog_entry",
+        lambda: write_changelog_entry(changelog, commits[0]["hash"], new_entry),
+    )
+
+    for stats in stages.values():
+        stats["commits_per_second"] = round(len(commits) / stats["seconds"])
+    return {
+        "commits": len(commits),
+        "filtered_commits": len(filtered),
+        "changelog_bytes": changelog.stat().st_size,
+        "stages": stages,
+    }
+
+
+def compare(old: dict, new: dict) -> None:
+    """Print time and memory ratios (new / old) for stages in both results."""
+    print("\nCompared with", old["meta"]["version"], "(new / old)")
+    for size, result in new["sizes"].items():
+        previous = old["sizes"].get(size)
+        if not previous:
+            continue
+        print(f"{size} commits")
+        for name, stats in result["stages"].items():
+            before = previous["stages"].get(name)
+            if not before:
+                continue
+            line = f"  {name:<24}time {stats['seconds'] / before['seconds']:6.2f}x"
+            if stats.get("peak_bytes") and before.get("peak_bytes"):
+                line += f"  memory {stats['peak_bytes'] / before['peak_bytes']:6.2f}x"
+            print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,100000")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--repo-dir", help="Keep generated repositories here and reuse them"
+    )
+    parser.add_argument("--output", default="bench_pipeline.json")
+    parser.add_argument("--compare", help="Earlier results file to compare with")
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--http-stub", action="store_true")
+    parser.add_argument("--llm-concurrency", type=int, default=8)
+    parser.add_argument("--no-memory", action="store_true")
+    args = parser.parse_args()
+
+    # The stub replaces the request itself; credentials only have to exist
+    os.environ.setdefault("LITELLM_PROXY_API_BASE", "http://stub.invalid")
+    os.environ.setdefault("LITELLM_PROXY_API_KEY", "stub")
+
+    git_version = subprocess.run(
+        ["git", "--version"], capture_output=True, text=True, check=True
+    ).stdout.strip()
+    results = {
+        "meta": {
+            "version": version("automated-changelog"),
+            "python": platform.python_version(),
+            "git": git_version,
+            "platform": platform.platform(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "repeat": args.repeat,
+            "llm_latency": args.llm_latency,
+            "http_stub": args.http_stub,
+        },
+        "sizes": {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo_dir = Path(args.repo_dir or tmp)
+        repo_dir.mkdir(parents=True, exist_ok=True)
+        for size in (int(s) for s in args.sizes.split(",")):
+            repo = repo_dir / f"synthetic-{size}"
+            if not (repo / ".git").exists():
+                start = time.perf_counter()
+                make_repo(repo, size)
+                print(f"built {repo} in {time.perf_counter() - start:.1f} s")
+            print(f"{size} commits")
+            results["sizes"][str(size)] = bench_size(repo, Path(tmp), args)
+
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results["meta"]["max_rss_bytes"] = max_rss * (
+        1 if sys.platform == "darwin" else 1024
+    )
+    Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text()), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""Repository backends for reading commit history."""
+
+import subprocess
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+from automated_changelog.config import ConfigError
+from automated_changelog.git_state import (
+    DEFAULT_MAX_BODY_TOKENS,
+    MAX_COMMIT_PATHS,
+    Commit,
+    DiffStat,
+    StatCounter,
+    clean_body,
+    iter_commits,
+)
+
+DEFAULT_BACKEND = "git"
+
+# Commits older than since_date walked past before a date range walk stops,
+# in case clock skew put commits still in range behind them (git's slop)
+SINCE_SLOP = 5
+
+
+class BackendError(Exception):
+    """Raised when a backend cannot read the repository."""
+
+    pass
+
+
+class GitCLIBackend:
+    """
+    Read history by running the ``git`` command line tool.
+
+    This is the default backend; it needs git on PATH and spawns one
+    process per query.
+    """
+
+    name = "git"
+
+    def __init__(self, repo_path: str | Path = "."):
+        """
+        Args:
+            repo_path: Path to the git repository (default: current directory)
+        """
+        self.repo_path = repo_path
+
+    def iter_commits(
+        self,
+        last_commit_hash: Optional[str] = None,
+        since_date: Optional[str] = None,
+        until_date: Optional[str] = None,
+        max_count: Optional[int] = None,
+        with_paths: bool = False,
+        with_stats: bool = False,
+        with_body: bool = False,
+        max_body_tokens: int = DEFAULT_MAX_BODY_TOKENS,
+    ) -> Iterator[Commit]:
+        """Stream commits newest first; see git_state.iter_commits."""
+        return iter_commits(
+            last_commit_hash=last_commit_hash,
+            repo_path=self.repo_path,
+            since_date=since_date,
+            until_date=until_date,
+            max_count=max_count,
+            with_paths=with_paths,
+            with_stats=with_stats,
+            with_body=with_body,
+            max_body_tokens=max_body_tokens,
+        )
+
+    def remote_url(self, remote: str = "origin") -> Optional[str]:
+        """Return the URL of a remote, or None if it isn't configured."""
+        try:
+            result = subprocess.run(
+                ["git", "-C", str(self.repo_path), "remote", "get-url", remote],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return None
+        return result.stdout.strip() or None
+
+
+class Pygit2Backend:
+    """
+    Read history in-process through libgit2 (requires ``pygit2``).
+
+    Walks the commit graph directly instead of spawning git and parsing
+    its output, and works without git installed. Results match the git
+    backend: commits newest first by commit time, merges without paths and
+    renames reported under their new name. When commit times are out of
+    order (clock skew, rebased history) the two can differ: ``git log
+    --since`` stops at the first commit older than the cutoff, while this
+    backend keeps every commit in range, and commits with equal commit
+    times may come out in a different order. Dates for ``since_date`` and
+    ``until_date`` must be ISO 8601 (e.g. ``2024-01-31`` or
+    ``2024-01-31 23:59:59``, local time unless an offset is given).
+
+    Short hashes are libgit2's: 7 characters (or ``core.abbrev``), longer
+    only where needed to be unique. git grows its default abbreviation
+    with the size of the repository, so on large repositories its short
+    hashes can be a character or two longer.
+    """
+
+    name = "pygit2"
+
+    def __init__(self, repo_path: str | Path = "."):
+        """
+        Args:
+            repo_path: Path inside the git repository (default: current
+                directory)
+
+        Raises:
+            ConfigError: If pygit2 is not installed
+            BackendError: If no repository is found at repo_path
+        """
+        try:
+            import pygit2
+        except ImportError as e:
+            raise ConfigError(
+                "The pygit2 backend requires the pygit2 package: "
+                "pip install 'automated-changelog[pygit2]'"
+            ) from e
+
+        self._pygit2 = pygit2
+        try:
+            self.repo = pygit2.Repository(str(repo_path))
+        except pygit2.GitError as e:
+            raise BackendError(f"Not a git repository: {repo_path}") from e
+
+    def iter_commits(
+        self,
+        last_commit_hash: Optional[str] = None,
+        since_date: Optional[str] = None,
+        until_date: Optional[str] = None,
+        max_count: Optional[int] = None,
+        with_paths: bool = False,
+        with_stats: bool = False,
+        with_body: bool = False,
+        max_body_tokens: int = DEFAULT_MAX_BODY_TOKENS,
+    ) -> Iterator[Commit]:
+        """
+        Stream commits newest first, with the same range semantics as git log.
+
+        Args:
+            last_commit_hash: Only commits after this one (ignored if a date
+                range is given)
+            since_date: Earliest commit date (ISO 8601)
+            until_date: Latest commit date (ISO 8601)
+            max_count: Maximum number of (newest) commits
+            with_paths: Also collect the files each commit touches
+            with_stats: Also collect the size of each change (DiffStat)
+            with_body: Also collect each commit's body (see clean_body)
+            max_body_tokens: Truncate each body to about this many tokens
+
+        Yields:
+            Commit records, newest first
+
+        Raises:
+            BackendError: If HEAD or last_commit_hash cannot be resolved, or a
+                date is not ISO 8601
+        """
+        if self.repo.head_is_unborn:
+            raise BackendError("The current branch does not have any commits yet")
+
+        since = _parse_date(since_date)
+        until = _parse_date(until_date)
+
+        walker = self.repo.walk(self.repo.head.target, self._pygit2.GIT_SORT_TIME)
+        if last_commit_hash and since is None and until is None:
+            try:
+                walker.hide(last_commit_hash)
+            except (KeyError, ValueError, self._pygit2.GitError) as e:
+                raise BackendError(f"Unknown revision: {last_commit_hash}") from e
+
+        body_tokens = max_body_tokens if with_body else None
+        count = 0
+        too_old = 0
+        for commit in walker:
+            if since is not None and commit.commit_time < since:
+                # Commits come newest first, so the walk can stop soon
+                too_old += 1
+                if too_old > SINCE_SLOP:
+                    break
+                continue
+            too_old = 0
+            if until is not None and commit.commit_time > until:
+                continue
+            yield self._to_commit(commit, with_paths, with_stats, body_tokens)
+            count += 1
+            if max_count and count >= max_count:
+                return
+
+    def remote_url(self, remote: str = "origin") -> Optional[str]:
+        """Return the URL of a remote, or None if it isn't configured."""
+        try:
+            return self.repo.remotes[remote].url
+        except (KeyError, ValueError):
+            return None
+
+    def _to_commit(
+        self,
+        commit,
+        with_paths: bool,
+        with_stats: bool = False,
+        max_body_tokens: Optional[int] = None,
+    ) -> Commit:
+        author = commit.author
+        message = commit.raw_message.decode("utf-8", errors="replace")
+        author_tz = timezone(timedelta(minutes=author.offset))
+        short_id = commit.short_id
+        paths = stats = None
+        if with_paths or with_stats:
+            paths, stats = self._changes(commit, with_stats)
+        return Commit(
+            str(commit.id),
+            author.raw_name.decode("utf-8", errors="replace"),
+            datetime.fromtimestamp(author.time, author_tz).strftime("%Y-%m-%d %H:%M"),
+            _subject(message),
+            abbrev=len(short_id),
+            paths=paths[:MAX_COMMIT_PATHS] if with_paths else None,
+            stats=stats,
+            body=(
+                clean_body(_body(message), max_body_tokens)
+                if max_body_tokens is not None
+                else None
+            ),
+            paths_truncated=with_paths and len(paths) > MAX_COMMIT_PATHS,
+        )
+
+    def _changes(
+        self, commit, with_stats: bool
+    ) -> tuple[tuple[str, ...], Optional[DiffStat]]:
+        """
+        Files touched by a commit, as listed by ``git log --name-only``, and
+        with_stats the size of the change as ``git log --numstat`` counts it.
+        """
+        parents = commit.parents
+        if len(parents) > 1:
+            # git log shows no diff for merges unless asked to
+            return (), DiffStat() if with_stats else None
+        if parents:
+            diff = self.repo.diff(parents[0], commit)
+        else:
+            diff = commit.tree.diff_to_tree(swap=True)
+        deltas = list(diff.deltas)
+        statuses = {delta.status for delta in deltas}
+        if self._has_rename_candidates(statuses):
+            # Report renames once, under the new name, like git's diff.renames
+            diff.find_similar()
+            deltas = list(diff.deltas)
+        paths = tuple(delta.new_file.path for delta in deltas)
+        if not with_stats:
+            return paths, None
+
+        counter = StatCounter()
+        for path, patch in zip(paths, diff):
+            # Binary files have no line counts, like "-" in numstat
+            _, insertions, deletions = patch.line_stats if patch else (0, 0, 0)
+            counter.add(path, insertions, deletions)
+        return paths, counter.result()
+
+    def _has_rename_candidates(self, statuses: set[int]) -> bool:
+        """Whether a diff adds and deletes files, the only case find_similar changes."""
+        return (
+            self._pygit2.GIT_DELTA_ADDED in statuses
+            and self._pygit2.GIT_DELTA_DELETED in statuses
+        )
+
+
+BACKENDS = {
+    GitCLIBackend.name: GitCLIBackend,
+    Pygit2Backend.name: Pygit2Backend,
+}
+
+
+def get_backend(name: Optional[str] = None, repo_path: str | Path = "."):
+    """
+    Create the repository backend selected in the config.
+
+    Args:
+        name: Backend name ("git" or "pygit2"); None selects the default
+        repo_path: Path to the git repository
+
+    Returns:
+        A backend instance
+
+    Raises:
+        ConfigError: If the backend is unknown or its dependency is missing
+    """
+    name = name or DEFAULT_BACKEND
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ConfigError(
+            f"Unknown backend '{name}'. Choose one of: {', '.join(BACKENDS)}"
+        ) from None
+    return backend_class(repo_path)
+
+
+def _parse_date(value: Optional[str]) -> Optional[float]:
+    """Parse an ISO 8601 date into a POSIX timestamp (naive means local)."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError as e:
+        raise BackendError(
+            f"Unsupported date {value!r}; use ISO 8601 (YYYY-MM-DD[ HH:MM:SS])"
+        ) from e
+
+
+def _subject(message: str) -> str:
+    """First paragraph of a commit message on one line, like git's %s."""
+    lines = []
+    for line in message.splitlines():
+        line = line.rstrip()
+        if not line:
+            if lines:
+                break
+            continue
+        lines.append(line)
+    return " ".join(lines)
+
+
+def _body(message: str) -> str:
+    """Commit message after its first paragraph, like git's %b."""
+    lines = message.splitlines()
+    start = 0
+    while start < len(lines) and not lines[start].strip():
+        start += 1
+    while start < len(lines) and lines[start].strip():
+        start += 1
+    return "\n".join(lines[start:])
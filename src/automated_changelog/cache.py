@@ -0,0 +1,304 @@
+"""On-disk cache for LLM summaries."""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Any, Optional
+
+DEFAULT_CACHE_DIR = ".changelog_cache"
+DEFAULT_MAX_AGE_DAYS = 30
+DEFAULT_MAX_SIZE_MB = 50
+
+# Subdirectory indexing cached summaries by the commit range they cover
+SEGMENTS_DIR = "segments"
+
+# Bump when the key or entry format changes to orphan old entries
+CACHE_VERSION = 1
+
+
+def summary_cache_key(
+    model: str,
+    prompt_template: str,
+    max_tokens: int,
+    commits: Iterable[Mapping[str, Any]],
+    **options: Any,
+) -> str:
+    """
+    Compute the content address of a summary.
+
+    The key covers everything that influences the LLM output: the model,
+    prompt template, response token limit, the commits that go into the
+    prompt and any extra summarization options (e.g. chunking settings).
+
+    Args:
+        model: LLM model identifier
+        prompt_template: Prompt template from config
+        max_tokens: Maximum tokens in the LLM response
+        commits: Commits included in the prompt
+        **options: Additional settings that change the prompt
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    header = {
+        "version": CACHE_VERSION,
+        "model": model,
+        "prompt_template": prompt_template,
+        "max_tokens": max_tokens,
+        "options": options,
+    }
+    digest.update(json.dumps(header, sort_keys=True).encode("utf-8"))
+    for commit in commits:
+        line = "\0".join(
+            (commit["hash"], commit["subject"], commit["author"], commit["date"])
+        )
+        # Diff stats and bodies show up in the prompt; commits without them
+        # keep the keys they had before these existed
+        stats = commit.get("stats")
+        if stats is not None:
+            line += "\0" + json.dumps(stats)
+        body = commit.get("body")
+        if body is not None:
+            line += "\0body\0" + body
+        digest.update(b"\n" + line.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SummaryCache:
+    """
+    Content-addressed store of generated summaries, one JSON file per key.
+
+    Entries older than ``max_age_days`` (since last use) are treated as
+    misses, and the least recently used entries are evicted once the cache
+    grows beyond ``max_size_mb``. A small index of the commit ranges that
+    have summaries lets later runs reuse them for overlapping ranges. Cache
+    I/O errors are never fatal; they simply behave like a miss.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path = DEFAULT_CACHE_DIR,
+        max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+        max_size_mb: float = DEFAULT_MAX_SIZE_MB,
+    ):
+        """
+        Args:
+            directory: Directory holding cache entries (created on first write)
+            max_age_days: Entries unused for longer than this are discarded
+            max_size_mb: Total size the cache is trimmed back to after writes
+        """
+        self.directory = Path(directory)
+        self.max_age_seconds = max_age_days * 24 * 60 * 60
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        # Newest hashes of the indexed ranges, listed once per instance
+        self._segment_starts: Optional[set[str]] = None
+        # Running size of the entries, measured by the first eviction pass
+        self._size_bytes: Optional[int] = None
+
+    @classmethod
+    def from_config(
+        cls, cache_config: Optional[dict[str, Any]]
+    ) -> Optional["SummaryCache"]:
+        """
+        Create a cache from the optional ``cache:`` config section.
+
+        The cache is opt-in: without a ``cache:`` section no cache is used
+        (None is returned), so no cache directory appears in repositories
+        whose config doesn't ask for one.
+        """
+        if cache_config is None:
+            return None
+        return cls(
+            directory=cache_config.get("directory", DEFAULT_CACHE_DIR),
+            max_age_days=cache_config.get("max_age_days", DEFAULT_MAX_AGE_DAYS),
+            max_size_mb=cache_config.get("max_size_mb", DEFAULT_MAX_SIZE_MB),
+        )
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _segment_path(self, newest_hash: str) -> Path:
+        return self.directory / SEGMENTS_DIR / f"{newest_hash}.json"
+
+    def _known_segment_starts(self) -> set[str]:
+        """Commits that indexed ranges start at, read from disk on first use."""
+        if self._segment_starts is None:
+            try:
+                names = os.listdir(self.directory / SEGMENTS_DIR)
+            except OSError:
+                names = []
+            self._segment_starts = {
+                name[: -len(".json")] for name in names if name.endswith(".json")
+            }
+        return self._segment_starts
+
+    def segment_lengths(self, newest_hash: str) -> list[int]:
+        """
+        Lengths of cached commit ranges that start at a commit, longest first.
+
+        Summaries are cached per commit range; this index lets a later run
+        find the ranges that begin (newest first) at a given commit, such as
+        the commit recorded in a ``LATEST_COMMIT`` marker. The commits that
+        have ranges are listed once per cache instance, so probing every
+        commit of a long range only touches the disk at those boundaries.
+
+        Args:
+            newest_hash: Hash of the newest commit of the range
+
+        Returns:
+            Numbers of commits of the known ranges
+        """
+        if newest_hash not in self._known_segment_starts():
+            return []
+        try:
+            lengths = json.loads(
+                self._segment_path(newest_hash).read_text(encoding="utf-8")
+            )
+        except (OSError, ValueError):
+            return []
+        if not isinstance(lengths, list):
+            return []
+        return sorted(
+            (n for n in lengths if isinstance(n, int) and n > 0), reverse=True
+        )
+
+    def add_segment(self, newest_hash: str, length: int) -> None:
+        """
+        Remember that a summary was cached for a commit range.
+
+        Args:
+            newest_hash: Hash of the newest commit of the range
+            length: Number of commits in the range
+        """
+        path = self._segment_path(newest_hash)
+        lengths = self.segment_lengths(newest_hash)
+        try:
+            if length in lengths:
+                # Keep ranges that are still in use from expiring
+                os.utime(path)
+                return
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(lengths + [length], f)
+            os.replace(tmp_name, path)
+        except OSError:
+            return
+        self._known_segment_starts().add(newest_hash)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached summary.
+
+        Args:
+            key: Key from summary_cache_key
+
+        Returns:
+            The cached summary, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.max_age_seconds:
+                path.unlink()
+                self.misses += 1
+                return None
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            # Refresh mtime so size-based eviction drops least recently used
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        summary = entry.get("summary") if isinstance(entry, dict) else None
+        if not isinstance(summary, str):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return summary
+
+    def set(self, key: str, summary: str, **metadata: Any) -> None:
+        """
+        Store a summary, trimming the cache once it grows past the size cap.
+
+        Args:
+            key: Key from summary_cache_key
+            summary: Summary text to cache
+            **metadata: Extra JSON-serializable fields stored for inspection
+        """
+        entry = {"summary": summary, "created": time.time(), **metadata}
+        path = self._path(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            try:
+                replaced = path.stat().st_size
+            except FileNotFoundError:
+                replaced = 0
+            # Write atomically so concurrent runs never read a partial entry
+            fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            data = json.dumps(entry)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_name, path)
+        except OSError:
+            return
+
+        # Scan the directory on the first write only; afterwards keep a
+        # running total and rescan when it crosses the cap
+        if self._size_bytes is None:
+            self.evict()
+        else:
+            self._size_bytes += len(data) - replaced
+            if self._size_bytes > self.max_size_bytes:
+                self.evict()
+
+    def evict(self) -> None:
+        """Remove expired entries, then least recently used ones over the size cap."""
+        now = time.time()
+        entries = []
+        try:
+            for path in self.directory.glob("*.json"):
+                stat = path.stat()
+                if now - stat.st_mtime > self.max_age_seconds:
+                    path.unlink()
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        except OSError:
+            return
+
+        # Range index files are tiny; they only expire with age
+        for path in (self.directory / SEGMENTS_DIR).glob("*.json"):
+            try:
+                if now - path.stat().st_mtime > self.max_age_seconds:
+                    path.unlink()
+            except OSError:
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+        self._size_bytes = total
+
+    def clear(self) -> None:
+        """Remove every cache entry."""
+        self._segment_starts = None
+        self._size_bytes = None
+        for pattern in ("*.json", f"{SEGMENTS_DIR}/*.json"):
+            for path in self.directory.glob(pattern):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
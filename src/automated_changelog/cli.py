@@ -1,23 +1,168 @@
 """CLI entry point for automated-changelog."""
 
+import bisect
+import glob
+import io
 import subprocess
-from datetime import datetime
+import time
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 from pathlib import Path
+from typing import Optional
 
 import click
 
+from automated_changelog.backends import BackendError, get_backend
+from automated_changelog.cache import DEFAULT_CACHE_DIR, SummaryCache
 from automated_changelog.config import (
     ConfigError,
     generate_config_template,
     get_repo_name,
     load_config,
 )
+from automated_changelog.filtering import (
+    compile_filter,
+    filter_commits,
+    group_commits_by_module,
+)
 from automated_changelog.git_state import (
+    DEFAULT_MAX_BODY_TOKENS,
     fetch_commits,
+    iter_commits,
     read_last_commit_hash,
     write_changelog_entry,
 )
-from automated_changelog.summarization import filter_commits
+from automated_changelog.profiling import StageTimer, profile_run
+from automated_changelog.rendering import EntryRenderer
+from automated_changelog.state import StateIndex
+
+# The LLM and summarization modules (and litellm behind them) are imported
+# only when summaries are generated, so init, --help and --skip-llm start fast
+
+
+def _check_llm_credentials() -> bool:
+    """Report missing LLM credentials; returns whether summarization can run."""
+    from automated_changelog.llm import get_llm_client
+
+    try:
+        get_llm_client()
+    except ValueError as e:
+        click.echo(f"\n⚠ {e}", err=True)
+        click.echo("  Run with --skip-llm to generate without summarization.\n")
+        return False
+    return True
+
+
+class _CommitSpan(Sequence):
+    """
+    Stand-in for a streamed run's commit list in StateIndex.record_write.
+
+    Only the count and the newest and oldest commits are known (and needed)
+    once the commits have been streamed.
+    """
+
+    def __init__(self, newest, oldest, count: int):
+        self._newest = newest
+        self._oldest = oldest
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if index in (0, -self._count):
+            return self._newest
+        if index in (-1, self._count - 1):
+            return self._oldest
+        raise IndexError(index)
+
+
+def _load_state_index(cfg: dict) -> Optional[StateIndex]:
+    """Load the sidecar state index if ``state_file`` is configured."""
+    state_file = cfg.get("state_file")
+    if not state_file:
+        return None
+    return StateIndex.load(state_file, cfg["output_file"])
+
+
+def _prompt_detail_options(cfg: dict) -> dict:
+    """fetch_commits arguments for the optional diff stats and commit bodies."""
+    body_config = cfg.get("commit_bodies") or {}
+    return {
+        "with_stats": bool(cfg.get("diff_stats")),
+        "with_body": bool(body_config.get("enabled", False)),
+        "max_body_tokens": body_config.get("max_tokens", DEFAULT_MAX_BODY_TOKENS),
+    }
+
+
+def _summary_options(cfg: dict, no_cache: bool, client=None) -> dict:
+    """
+    Build the keyword arguments shared by all summarization calls.
+
+    Args:
+        cfg: Loaded configuration
+        no_cache: Disable the summary cache (which is only used when the
+            config has a ``cache:`` section)
+        client: AsyncLLMClient to use; by default one is created from the
+            ``llm:`` section
+    """
+    from automated_changelog.compaction import PromptCompactor
+    from automated_changelog.llm import DEFAULT_MAX_TOKENS, AsyncLLMClient
+    from automated_changelog.summarization import DEFAULT_CHUNK_TOKEN_BUDGET
+
+    llm_config = cfg.get("llm", {})
+    cache = None
+    if not no_cache:
+        cache = SummaryCache.from_config(cfg.get("cache"))
+    return {
+        "model": llm_config.get("model", "claude-sonnet-4-5"),
+        "chunk_token_budget": llm_config.get(
+            "chunk_token_budget", DEFAULT_CHUNK_TOKEN_BUDGET
+        ),
+        "max_tokens": llm_config.get("max_tokens", DEFAULT_MAX_TOKENS),
+        "cache": cache,
+        "client": client or AsyncLLMClient.from_config(llm_config),
+        "compactor": PromptCompactor.from_config(cfg.get("compaction")),
+    }
+
+
+class _StreamPreview:
+    """on_token callback that echoes the summary while the LLM writes it."""
+
+    def __init__(self):
+        self.started = False
+
+    def __call__(self, text: str) -> None:
+        if not self.started:
+            click.echo("\n--- Summary preview ---")
+            self.started = True
+        click.echo(text, nl=False)
+
+
+def _report_latency(client) -> None:
+    """Print LLM request latency and retry statistics for the run."""
+    if client.latency.attempts:
+        click.echo(f"  LLM requests: {client.latency.summary()}")
+
+
+def _count_llm_usage(timer, client) -> None:
+    """Add the client's LLM request and token counts to a profile."""
+    timer.count("llm_requests", len(client.latency.attempts))
+    timer.count("llm_tokens_in", client.latency.prompt_tokens)
+    timer.count("llm_tokens_out", client.latency.completion_tokens)
+
+
+def _report_compaction(compactors: list) -> None:
+    """Print the prompt tokens saved by compaction, if any."""
+    compactors = [c for c in compactors if c is not None]
+    before = sum(c.tokens_before for c in compactors)
+    after = sum(c.tokens_after for c in compactors)
+    if before > after:
+        click.echo(
+            f"  Compacted prompts: ~{before:,} -> ~{after:,} tokens "
+            f"(saved ~{before - after:,})"
+        )
 
 
 @click.group()
@@ -46,8 +191,12 @@ def init(config):
             click.echo("Initialization cancelled.")
             return
 
-    # Get repo name
-    repo_name = get_repo_name()
+    # Get repo name, in-process through pygit2 when it is installed
+    try:
+        backend = get_backend("pygit2")
+    except (ConfigError, BackendError):
+        backend = get_backend()
+    repo_name = get_repo_name(backend)
 
     # Generate template
     template = generate_config_template(repo_name)
@@ -89,11 +238,68 @@ def init(config):
     "--to-date",
     help="End date for commits (YYYY-MM-DD) for historical generation.",
 )
-def generate(config, dry_run, skip_llm, from_date, to_date):
+@click.option(
+    "--max-commits",
+    type=click.IntRange(min=1),
+    help="Only process the newest N commits (bounds memory on large first runs).",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Always call the LLM instead of reusing cached summaries",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    envvar="CHANGELOG_PROFILE",
+    help="Print the time spent in each stage (or set CHANGELOG_PROFILE=1)",
+)
+@click.option(
+    "--profile-json",
+    type=click.Path(dir_okay=False),
+    envvar="CHANGELOG_PROFILE_JSON",
+    help="Write stage timings and token counts to this file as JSON",
+)
+@click.option(
+    "--profile-cprofile",
+    type=click.Path(dir_okay=False),
+    envvar="CHANGELOG_PROFILE_CPROFILE",
+    help="Dump cProfile statistics of the run to this file",
+)
+def generate(
+    config,
+    dry_run,
+    skip_llm,
+    from_date,
+    to_date,
+    max_commits,
+    no_cache,
+    profile,
+    profile_json,
+    profile_cprofile,
+):
     """Generate changelog from git history."""
+    timer = StageTimer()
+    with profile_run(
+        timer,
+        echo=(lambda report: click.echo(f"\n{report}")) if profile else None,
+        json_path=profile_json,
+        cprofile_path=profile_cprofile,
+    ):
+        _generate(
+            config, dry_run, skip_llm, from_date, to_date, max_commits, no_cache, timer
+        )
+
+
+def _generate(
+    config, dry_run, skip_llm, from_date, to_date, max_commits, no_cache, timer
+):
+    """Body of the generate command, timing each stage in ``timer``."""
     # Load configuration
     try:
-        cfg = load_config(config)
+        with timer.stage("load_config"):
+            cfg = load_config(config)
+            renderer = EntryRenderer.from_config(cfg.get("render"))
         click.echo(f"✓ Loaded configuration from {config}")
 
         # Display config summary
@@ -106,6 +312,8 @@ def generate(config, dry_run, skip_llm, from_date, to_date):
         using_date_range = from_date or to_date
         output_file = cfg["output_file"]
         last_hash = None
+        with timer.stage("read_state"):
+            state_index = _load_state_index(cfg)
 
         if using_date_range:
             # Date range mode - for historical generation
@@ -115,49 +323,109 @@ def generate(config, dry_run, skip_llm, from_date, to_date):
             if to_date:
                 click.echo(f"  To: {to_date}")
         else:
-            # Incremental mode - read last commit hash from changelog
-            last_hash = read_last_commit_hash(output_file)
+            # Incremental mode - read last commit hash from the state index
+            # if one is configured, otherwise from the changelog
+            last_hash = None
+            if state_index is not None:
+                last_hash = state_index.last_commit_hash
+            if not last_hash:
+                with timer.stage("read_state"):
+                    last_hash = read_last_commit_hash(output_file)
 
             if last_hash:
                 click.echo(f"\n✓ Found last processed commit: {last_hash[:8]}")
             else:
                 click.echo("\n! No previous state found, fetching all commits")
 
-        # Fetch commits
-        try:
-            commits = fetch_commits(
-                last_commit_hash=last_hash,
-                since_date=from_date,
-                until_date=to_date,
+        # --max-commits keeps only the newest commits of the range; moving
+        # the state marker past the older ones would skip them for good
+        if max_commits and last_hash:
+            click.echo(
+                "✗ --max-commits is only supported on a first run or with "
+                "--from-date/--to-date: the commits older than the newest "
+                f"{max_commits} since {last_hash[:8]} would never be processed",
+                err=True,
             )
-            click.echo(f"✓ Found {len(commits)} commits to process")
+            raise click.Abort()
 
-            if not commits:
+        # Per-module summaries only make sense with more than one module
+        modules = cfg.get("modules") or []
+        use_modules = len(modules) > 1
+        use_llm = not skip_llm
+
+        # Stream commits (with touched files if paths are filtered or
+        # grouped, and with line counts and bodies if those go into the
+        # prompt). Each commit is filtered and its changelog line rendered
+        # as it arrives; only the filtered commits are kept, for the summary.
+        # Filtering and rendering are timed apart from reading git so the
+        # profile keeps its per-stage breakdown
+        filter_config = cfg.get("filter", {})
+        commit_filter = compile_filter(filter_config)
+        commit_lines = io.StringIO()
+        recent: list = []
+        filtered_commits: list = []
+        commit_count = filtered_count = 0
+        oldest = None
+        filter_seconds = render_seconds = 0.0
+        try:
+            fetch_start = time.perf_counter()
+            try:
+                for commit in iter_commits(
+                    last_commit_hash=last_hash,
+                    since_date=from_date,
+                    until_date=to_date,
+                    max_count=max_commits,
+                    with_paths=use_modules
+                    or bool(filter_config.get("ignore_paths_only")),
+                    **_prompt_detail_options(cfg),
+                    backend=get_backend(cfg.get("backend")),
+                ):
+                    commit_count += 1
+                    oldest = commit
+                    if len(recent) < 5:
+                        recent.append(commit)
+                    started = time.perf_counter()
+                    commit_lines.write(renderer.commit_line(commit))
+                    rendered = time.perf_counter()
+                    ignored = commit_filter.is_ignored(commit)
+                    filter_seconds += time.perf_counter() - rendered
+                    render_seconds += rendered - started
+                    if not ignored:
+                        filtered_count += 1
+                        if use_llm:
+                            filtered_commits.append(commit)
+            finally:
+                timer.add(
+                    "fetch_commits",
+                    time.perf_counter() - fetch_start - filter_seconds - render_seconds,
+                )
+                timer.add("filter_commits", filter_seconds)
+            timer.count("commits", commit_count)
+            click.echo(f"✓ Found {commit_count} commits to process")
+            if max_commits and commit_count == max_commits:
+                click.echo(f"  (limited to the newest {max_commits} commits)")
+
+            if not commit_count:
                 click.echo("\n! No new commits to process")
                 return
 
             # Display some commits for verification
             click.echo("\nRecent commits:")
-            for commit in commits[:5]:
+            for commit in recent:
                 click.echo(f"  {commit['short_hash']} - {commit['subject']}")
-            if len(commits) > 5:
-                click.echo(f"  ... and {len(commits) - 5} more")
+            if commit_count > 5:
+                click.echo(f"  ... and {commit_count - 5} more")
 
             # Get the latest commit hash
-            latest_hash = commits[0]["hash"]
-
-            # Filter commits based on config
-            filter_config = cfg.get("filter", {})
-            filtered_commits = filter_commits(commits, filter_config)
+            latest_hash = recent[0]["hash"]
 
             click.echo(
-                f"  After filtering: {len(filtered_commits)} commits "
-                f"(excluded {len(commits) - len(filtered_commits)})"
+                f"  After filtering: {filtered_count} commits "
+                f"(excluded {commit_count - filtered_count})"
             )
 
             # Get LLM configuration
             llm_config = cfg.get("llm", {})
-            model = llm_config.get("model", "claude-sonnet-4-5")
             summary_prompt = llm_config.get(
                 "summary_prompt",
                 "Summarize the commits in 2-4 bullet points.",
@@ -165,31 +433,63 @@ def generate(config, dry_run, skip_llm, from_date, to_date):
 
             # Generate summary
             changelog_summary = None
-            use_llm = not skip_llm
+            module_summaries = {}
 
             if use_llm:
                 try:
                     # Check for LLM credentials
-                    from automated_changelog.llm import get_llm_client
-
-                    try:
-                        get_llm_client()
-                    except ValueError as e:
-                        click.echo(f"\n⚠ {e}", err=True)
-                        click.echo(
-                            "  Run with --skip-llm to generate without summarization.\n"
-                        )
-                        use_llm = False
+                    use_llm = _check_llm_credentials()
 
                     if use_llm:
                         click.echo("\n✓ Generating LLM summary...")
-                        from automated_changelog.summarization import generate_summary
-
-                        changelog_summary = generate_summary(
-                            commits=filtered_commits,
-                            prompt_template=summary_prompt,
-                            model=model,
+                        from automated_changelog.summarization import (
+                            DEFAULT_OVERALL_SUMMARY_PROMPT,
+                            generate_module_summaries,
+                            generate_summary,
                         )
+
+                        summary_options = _summary_options(cfg, no_cache)
+                        cache = summary_options["cache"]
+                        if dry_run:
+                            # Preview the summary while the LLM writes it
+                            summary_options["on_token"] = _StreamPreview()
+
+                        if use_modules:
+                            module_commits = group_commits_by_module(
+                                filtered_commits, modules
+                            )
+                            click.echo(
+                                f"  Summarizing {len(module_commits)} modules "
+                                "in parallel"
+                            )
+                            with timer.stage("generate_summary"):
+                                changelog_summary, module_summaries = (
+                                    generate_module_summaries(
+                                        module_commits,
+                                        module_prompt=llm_config.get(
+                                            "module_summary_prompt", summary_prompt
+                                        ),
+                                        overall_prompt=llm_config.get(
+                                            "overall_summary_prompt",
+                                            DEFAULT_OVERALL_SUMMARY_PROMPT,
+                                        ),
+                                        **summary_options,
+                                    )
+                                )
+                        else:
+                            with timer.stage("generate_summary"):
+                                changelog_summary = generate_summary(
+                                    commits=filtered_commits,
+                                    prompt_template=summary_prompt,
+                                    **summary_options,
+                                )
+                        if dry_run and summary_options["on_token"].started:
+                            click.echo("\n")
+                        if cache and cache.hits:
+                            click.echo(f"  Using cached summary from {cache.directory}")
+                        _report_compaction([summary_options["compactor"]])
+                        _report_latency(summary_options["client"])
+                        _count_llm_usage(timer, summary_options["client"])
                 except Exception as e:
                     click.echo(f"\n⚠ LLM summarization failed: {e}", err=True)
                     click.echo("  Falling back to commit list only...\n")
@@ -208,39 +508,39 @@ def generate(config, dry_run, skip_llm, from_date, to_date):
             else:
                 timestamp = datetime.now().strftime("%Y-%m-%d")
 
-            summary = f"## [{timestamp}]\n"
             # Only add state marker in incremental mode (not for historical date ranges)
-            if not using_date_range:
-                summary += f"<!-- LATEST_COMMIT: {latest_hash} -->\n\n"
-            else:
-                summary += "\n"
-
-            # Add LLM summary if available
-            if use_llm and changelog_summary:
-                summary += "### Summary\n\n"
-                summary += f"{changelog_summary}\n\n"
-
-            # Add commits section
-            summary += f"### Changes ({len(commits)} commits)\n\n"
-
-            # List all commits (not just filtered)
-            if use_llm:
-                summary += "<details>\n<summary>All commits</summary>\n\n"
-            for commit in commits:
-                summary += (
-                    f"- `{commit['short_hash']}` {commit['subject']} "
-                    f"({commit['author']}, {commit['date']})\n"
+            with timer.stage("build_markdown"):
+                summary = renderer.render(
+                    timestamp,
+                    (),
+                    commit_count=commit_count,
+                    commit_lines=commit_lines.getvalue(),
+                    latest_hash=None if using_date_range else latest_hash,
+                    changelog_summary=changelog_summary if use_llm else None,
+                    module_summaries=module_summaries if use_llm else None,
+                    collapse_commits=use_llm,
                 )
-            if use_llm:
-                summary += "\n</details>\n\n"
-            else:
-                summary += "\n"
+            timer.add("build_markdown", render_seconds)
 
             # Write to changelog
             if not dry_run:
                 # Pass None for latest_hash in date range mode to skip state update
                 hash_to_write = None if using_date_range else latest_hash
-                write_changelog_entry(output_file, hash_to_write, summary)
+                with timer.stage("write_changelog_entry"):
+                    offset = write_changelog_entry(output_file, hash_to_write, summary)
+                    if state_index is not None:
+                        state_index.record_write(
+                            output_file,
+                            offset,
+                            [
+                                (
+                                    timestamp,
+                                    summary,
+                                    _CommitSpan(recent[0], oldest, commit_count),
+                                )
+                            ],
+                            hash_to_write,
+                        )
                 click.echo(f"\n✓ Changelog updated: {output_file}")
                 if not using_date_range:
                     click.echo(f"  Latest commit: {latest_hash[:8]}")
@@ -256,10 +556,648 @@ def generate(config, dry_run, skip_llm, from_date, to_date):
         except FileNotFoundError:
             click.echo("✗ Git not found. Please ensure git is installed.", err=True)
             raise click.Abort()
+        except BackendError as e:
+            click.echo(f"✗ Could not read repository: {e}", err=True)
+            raise click.Abort()
+
+    except ConfigError as e:
+        click.echo(f"✗ {e}", err=True)
+        raise click.Abort()
+
+
+def _date_windows(start: date, end: date, interval: str) -> list[tuple[date, date]]:
+    """
+    Split an inclusive date span into consecutive windows.
+
+    Weekly windows are 7-day steps from ``start``; monthly windows follow
+    calendar months. The first and last windows are clipped to the span.
+
+    Args:
+        start: First day of the span
+        end: Last day of the span
+        interval: "week" or "month"
+
+    Returns:
+        (first_day, last_day) pairs in chronological order
+    """
+    windows = []
+    window_start = start
+    while window_start <= end:
+        if interval == "week":
+            next_start = window_start + timedelta(days=7)
+        elif window_start.month == 12:
+            next_start = date(window_start.year + 1, 1, 1)
+        else:
+            next_start = date(window_start.year, window_start.month + 1, 1)
+        windows.append((window_start, min(next_start - timedelta(days=1), end)))
+        window_start = next_start
+    return windows
+
+
+def _bucket_commits(commits: list, windows: list[tuple[date, date]]) -> list[list]:
+    """
+    Assign commits to the window containing their author date.
+
+    The commits come from a ``git log --since/--until`` range, which filters
+    by committer date, so a rebased or cherry-picked commit can carry an
+    author date outside the span; it goes to the first or last window
+    rather than being dropped. The windows are consecutive, so every other
+    commit lands in the window of its author date. Commits keep their
+    (newest first) order within each window.
+    """
+    starts = [first.isoformat() for first, _ in windows]
+    buckets = [[] for _ in windows]
+    last = len(windows) - 1
+    for commit in commits:
+        index = bisect.bisect_right(starts, commit["date"][:10]) - 1
+        buckets[min(max(index, 0), last)].append(commit)
+    return buckets
+
+
+@cli.command()
+@click.option(
+    "--config",
+    "-c",
+    default=".changelog_config.yaml",
+    help="Path to configuration file",
+)
+@click.option(
+    "--interval",
+    type=click.Choice(["week", "month"]),
+    default="week",
+    show_default=True,
+    help="Length of each changelog entry",
+)
+@click.option(
+    "--from",
+    "from_date",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    required=True,
+    help="First day of the backfill (YYYY-MM-DD)",
+)
+@click.option(
+    "--to",
+    "to_date",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    help="Last day of the backfill (YYYY-MM-DD, default today)",
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Show what would be generated without writing to file",
+)
+@click.option(
+    "--skip-llm",
+    is_flag=True,
+    help="Skip LLM summarization and only list commits",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Always call the LLM instead of reusing cached summaries",
+)
+def backfill(config, interval, from_date, to_date, dry_run, skip_llm, no_cache):
+    """Generate one changelog entry per week or month of past history."""
+    try:
+        cfg = load_config(config)
+        renderer = EntryRenderer.from_config(cfg.get("render"))
+    except ConfigError as e:
+        click.echo(f"✗ {e}", err=True)
+        raise click.Abort()
+    click.echo(f"✓ Loaded configuration from {config}")
+
+    start = from_date.date()
+    end = to_date.date() if to_date else date.today()
+    if start > end:
+        raise click.BadParameter("--from must not be after --to")
+
+    output_file = cfg["output_file"]
+    filter_config = cfg.get("filter", {})
+    modules = cfg.get("modules") or []
+    use_modules = len(modules) > 1
 
+    # One history walk over the whole span; explicit times because git fills
+    # a bare date with the current time of day
+    try:
+        commits = fetch_commits(
+            since_date=f"{start.isoformat()} 00:00:00",
+            until_date=f"{end.isoformat()} 23:59:59",
+            with_paths=use_modules or bool(filter_config.get("ignore_paths_only")),
+            **_prompt_detail_options(cfg),
+            backend=get_backend(cfg.get("backend")),
+        )
     except ConfigError as e:
         click.echo(f"✗ {e}", err=True)
         raise click.Abort()
+    except subprocess.CalledProcessError as e:
+        click.echo(f"✗ Git command failed: {e}", err=True)
+        raise click.Abort()
+    except FileNotFoundError:
+        click.echo("✗ Git not found. Please ensure git is installed.", err=True)
+        raise click.Abort()
+    except BackendError as e:
+        click.echo(f"✗ Could not read repository: {e}", err=True)
+        raise click.Abort()
+
+    all_windows = _date_windows(start, end, interval)
+    windows = [
+        (window, bucket)
+        for window, bucket in zip(all_windows, _bucket_commits(commits, all_windows))
+        if bucket
+    ]
+    click.echo(
+        f"✓ Found {len(commits)} commits in {len(windows)} non-empty "
+        f"{interval} windows"
+    )
+    if not windows:
+        click.echo("\n! No commits to process")
+        return
+
+    results = [(None, None)] * len(windows)
+    use_llm = not skip_llm and _check_llm_credentials()
+    if use_llm:
+        click.echo(f"\n✓ Generating {len(windows)} LLM summaries...")
+        summary_options = _summary_options(cfg, no_cache)
+        try:
+            results = _summarize_windows(
+                [filter_commits(bucket, filter_config) for _, bucket in windows],
+                cfg,
+                modules if use_modules else [],
+                summary_options,
+            )
+            _report_compaction([summary_options["compactor"]])
+            _report_latency(summary_options["client"])
+        except Exception as e:
+            click.echo(f"\n⚠ LLM summarization failed: {e}", err=True)
+            click.echo("  Falling back to commit list only...\n")
+            use_llm = False
+            results = [(None, None)] * len(windows)
+
+    # Newest window first, matching the order of prepended entries
+    sections = []
+    for ((first, last), bucket), (changelog_summary, module_summaries) in zip(
+        windows, results
+    ):
+        title = f"{first.isoformat()} to {last.isoformat()}"
+        entry = renderer.render(
+            title,
+            bucket,
+            changelog_summary=changelog_summary,
+            module_summaries=module_summaries,
+            collapse_commits=use_llm,
+        )
+        sections.append((title, entry, bucket))
+    sections.reverse()
+    content = "\n\n".join(entry for _, entry, _ in sections)
+
+    if dry_run:
+        click.echo("\n--- Generated Changelog (Dry Run) ---")
+        click.echo(content)
+        return
+
+    state_index = _load_state_index(cfg)
+    offset = write_changelog_entry(output_file, None, content)
+    if state_index is not None:
+        state_index.record_write(output_file, offset, sections)
+    click.echo(f"\n✓ Changelog updated: {output_file} ({len(sections)} entries)")
+
+
+async def _asummarize(
+    commits: list,
+    cfg: dict,
+    modules: list[str],
+    summary_options: dict,
+) -> tuple[str, Optional[dict[str, str]]]:
+    """
+    Summarize one set of commits, per module if ``modules`` is non-empty.
+
+    Returns:
+        (summary, module summaries or None)
+    """
+    from automated_changelog.summarization import (
+        DEFAULT_OVERALL_SUMMARY_PROMPT,
+        agenerate_module_summaries,
+        agenerate_summary,
+    )
+
+    llm_config = cfg.get("llm", {})
+    summary_prompt = llm_config.get(
+        "summary_prompt",
+        "Summarize the commits in 2-4 bullet points.",
+    )
+    if modules:
+        return await agenerate_module_summaries(
+            group_commits_by_module(commits, modules),
+            module_prompt=llm_config.get("module_summary_prompt", summary_prompt),
+            overall_prompt=llm_config.get(
+                "overall_summary_prompt", DEFAULT_OVERALL_SUMMARY_PROMPT
+            ),
+            **summary_options,
+        )
+    return await agenerate_summary(commits, summary_prompt, **summary_options), None
+
+
+def _summarize_windows(
+    window_commits: list[list],
+    cfg: dict,
+    modules: list[str],
+    summary_options: dict,
+) -> list[tuple[str, Optional[dict[str, str]]]]:
+    """
+    Summarize every backfill window concurrently through one LLM client.
+
+    Returns:
+        (summary, module summaries or None) per window, in input order
+    """
+    import asyncio
+
+    client = summary_options["client"]
+
+    async def run() -> list[tuple[str, Optional[dict[str, str]]]]:
+        try:
+            return list(
+                await asyncio.gather(
+                    *(
+                        _asummarize(commits, cfg, modules, summary_options)
+                        for commits in window_commits
+                    )
+                )
+            )
+        finally:
+            await client.aclose()
+
+    return asyncio.run(run())
+
+
+def _read_repo_list(repos_file: Optional[str], patterns: tuple[str, ...]) -> list[Path]:
+    """
+    Collect repository directories from a list file and glob patterns.
+
+    The list file has one path per line; blank lines and lines starting
+    with ``#`` are skipped, and relative paths are taken relative to the
+    file. Glob patterns only match directories. Duplicates are dropped,
+    keeping the first occurrence.
+    """
+    repos: list[Path] = []
+    if repos_file:
+        list_path = Path(repos_file)
+        for line in list_path.read_text().splitlines():
+            line = line.strip()
+            if line and not line.startswith("#"):
+                repos.append(list_path.parent / line)
+    for pattern in patterns:
+        repos.extend(
+            Path(match) for match in sorted(glob.glob(pattern)) if Path(match).is_dir()
+        )
+
+    seen = set()
+    unique = []
+    for repo in repos:
+        key = repo.resolve()
+        if key not in seen:
+            seen.add(key)
+            unique.append(repo)
+    return unique
+
+
+def _prepare_repo(repo: Path, config_name: str) -> dict:
+    """
+    Load one repository's config and state and fetch its new commits.
+
+    Runs in a worker thread. Paths in the config (output, state and cache
+    files) are resolved relative to the repository.
+
+    Returns:
+        A job dict with the repo, config, state index, commits and the
+        filtered commits to summarize
+
+    Raises:
+        ConfigError, BackendError, subprocess.CalledProcessError,
+        FileNotFoundError: If the repository cannot be processed
+    """
+    cfg = load_config(repo / config_name)
+    cfg["output_file"] = str(repo / cfg["output_file"])
+    if cfg.get("state_file"):
+        cfg["state_file"] = str(repo / cfg["state_file"])
+    if cfg.get("cache") is not None:
+        cache_config = dict(cfg["cache"])
+        cache_config["directory"] = str(
+            repo / cache_config.get("directory", DEFAULT_CACHE_DIR)
+        )
+        cfg["cache"] = cache_config
+
+    state_index = _load_state_index(cfg)
+    last_hash = state_index.last_commit_hash if state_index is not None else None
+    if not last_hash:
+        last_hash = read_last_commit_hash(cfg["output_file"])
+
+    modules = cfg.get("modules") or []
+    filter_config = cfg.get("filter", {})
+    commits = fetch_commits(
+        last_commit_hash=last_hash,
+        with_paths=len(modules) > 1 or bool(filter_config.get("ignore_paths_only")),
+        **_prompt_detail_options(cfg),
+        backend=get_backend(cfg.get("backend"), repo),
+    )
+    return {
+        "repo": repo,
+        "cfg": cfg,
+        "state_index": state_index,
+        "commits": commits,
+        "filtered": filter_commits(commits, filter_config),
+        "modules": modules if len(modules) > 1 else [],
+        "renderer": EntryRenderer.from_config(cfg.get("render")),
+    }
+
+
+def _shared_client(configs: list[dict], max_concurrency: Optional[int]):
+    """
+    Create one LLM client whose limits hold across all repositories.
+
+    All repositories talk to the same endpoint, so the strictest
+    concurrency and rate limits found in their ``llm:`` sections apply
+    globally; ``max_concurrency`` overrides the concurrency limit. Timeouts,
+    retries and backoff take the most permissive values instead, so no
+    repository's requests are cut shorter than its own config allows.
+    Hedging stays on only when every repository enables it, at the highest
+    configured percentile.
+    """
+    from automated_changelog.llm import (
+        DEFAULT_MAX_CONCURRENCY,
+        AsyncLLMClient,
+        RetryPolicy,
+    )
+
+    def strictest(key: str) -> Optional[float]:
+        values = [c.get("llm", {}).get(key) for c in configs]
+        values = [v for v in values if v is not None]
+        return min(values) if values else None
+
+    def most_permissive(key: str) -> Optional[float]:
+        values = [c.get("llm", {}).get(key) for c in configs]
+        values = [v for v in values if v is not None]
+        return max(values) if values else None
+
+    retry_config = {
+        key: most_permissive(key)
+        for key in ("timeout", "max_retries", "backoff_base", "backoff_max")
+    }
+    if all(c.get("llm", {}).get("hedge_percentile") for c in configs):
+        retry_config["hedge_percentile"] = most_permissive("hedge_percentile")
+        retry_config["hedge_min_samples"] = most_permissive("hedge_min_samples")
+    retry_config = {k: v for k, v in retry_config.items() if v is not None}
+
+    if max_concurrency is None:
+        max_concurrency = strictest("max_concurrency") or DEFAULT_MAX_CONCURRENCY
+    return AsyncLLMClient(
+        max_concurrency=max_concurrency,
+        requests_per_minute=strictest("requests_per_minute"),
+        tokens_per_minute=strictest("tokens_per_minute"),
+        retry_policy=RetryPolicy.from_config(retry_config),
+    )
+
+
+def _summarize_repos(jobs: list[dict], client, no_cache: bool) -> list:
+    """
+    Summarize every repository concurrently through one shared LLM client.
+
+    Returns:
+        Per job, in input order, either (summary, module summaries or None)
+        or the exception that summarization raised
+    """
+    import asyncio
+
+    options = [_summary_options(job["cfg"], no_cache, client) for job in jobs]
+
+    async def run() -> list:
+        try:
+            return list(
+                await asyncio.gather(
+                    *(
+                        _asummarize(
+                            job["filtered"], job["cfg"], job["modules"], job_options
+                        )
+                        for job, job_options in zip(jobs, options)
+                    ),
+                    return_exceptions=True,
+                )
+            )
+        finally:
+            await client.aclose()
+
+    results = asyncio.run(run())
+    _report_compaction([job_options["compactor"] for job_options in options])
+    _report_latency(client)
+    return results
+
+
+@cli.command("generate-all")
+@click.option(
+    "--repos-file",
+    type=click.Path(exists=True, dir_okay=False),
+    help="File listing repository paths, one per line",
+)
+@click.option(
+    "--glob",
+    "patterns",
+    multiple=True,
+    help="Glob pattern matching repository directories (repeatable)",
+)
+@click.option(
+    "--config",
+    "-c",
+    default=".changelog_config.yaml",
+    show_default=True,
+    help="Configuration file name inside each repository",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Repositories read from git at the same time",
+)
+@click.option(
+    "--max-concurrency",
+    type=click.IntRange(min=1),
+    help="LLM requests in flight across all repositories "
+    "(default: strictest llm.max_concurrency)",
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Show what would be generated without writing to files",
+)
+@click.option(
+    "--skip-llm",
+    is_flag=True,
+    help="Skip LLM summarization and only list commits",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Always call the LLM instead of reusing cached summaries",
+)
+def generate_all(
+    repos_file,
+    patterns,
+    config,
+    workers,
+    max_concurrency,
+    dry_run,
+    skip_llm,
+    no_cache,
+):
+    """Generate changelogs for many repositories in one run."""
+    repos = _read_repo_list(repos_file, patterns)
+    if not repos:
+        raise click.UsageError("No repositories given; use --repos-file or --glob")
+    click.echo(f"✓ Processing {len(repos)} repositories")
+
+    # Git work is process and I/O bound, so threads overlap it well
+    report: dict[Path, str] = {}
+    failed = set()
+    jobs = []
+    with ThreadPoolExecutor(max_workers=min(workers, len(repos))) as pool:
+        futures = [pool.submit(_prepare_repo, repo, config) for repo in repos]
+        for repo, future in zip(repos, futures):
+            try:
+                job = future.result()
+            except subprocess.CalledProcessError as e:
+                report[repo] = f"git command failed: {e}"
+            except FileNotFoundError:
+                report[repo] = "git not found"
+            except (ConfigError, BackendError) as e:
+                report[repo] = str(e).splitlines()[0]
+            except Exception as e:
+                # One unreadable repository must not abort the whole run
+                report[repo] = f"{type(e).__name__}: {e}".splitlines()[0]
+            else:
+                if job["commits"]:
+                    jobs.append(job)
+                else:
+                    report[repo] = "no new commits"
+                continue
+            # Only reached when the repository could not be read
+            failed.add(repo)
+
+    results = [(None, None)] * len(jobs)
+    use_llm = bool(jobs) and not skip_llm and _check_llm_credentials()
+    if use_llm:
+        click.echo(f"\n✓ Generating LLM summaries for {len(jobs)} repositories...")
+        client = _shared_client([job["cfg"] for job in jobs], max_concurrency)
+        results = _summarize_repos(jobs, client, no_cache)
+
+    timestamp = datetime.now().strftime("%Y-%m-%d")
+    for job, result in zip(jobs, results):
+        repo, commits = job["repo"], job["commits"]
+        note = ""
+        changelog_summary = module_summaries = None
+        if isinstance(result, Exception):
+            note = f", LLM summarization failed: {result}"
+        else:
+            changelog_summary, module_summaries = result
+        latest_hash = commits[0]["hash"]
+        entry = job["renderer"].render(
+            timestamp,
+            commits,
+            latest_hash=latest_hash,
+            changelog_summary=changelog_summary,
+            module_summaries=module_summaries,
+            collapse_commits=changelog_summary is not None,
+        )
+
+        if dry_run:
+            click.echo(f"\n--- {repo} (Dry Run) ---")
+            click.echo(entry)
+            report[repo] = f"{len(commits)} commits (dry run){note}"
+            continue
+        output_file = job["cfg"]["output_file"]
+        try:
+            offset = write_changelog_entry(output_file, latest_hash, entry)
+            if job["state_index"] is not None:
+                job["state_index"].record_write(
+                    output_file, offset, [(timestamp, entry, commits)], latest_hash
+                )
+        except OSError as e:
+            report[repo] = f"could not write {output_file}: {e}"
+            failed.add(repo)
+        else:
+            report[repo] = f"{len(commits)} commits, updated to {latest_hash[:8]}{note}"
+
+    click.echo("\nResults:")
+    for repo in repos:
+        mark = "✗" if repo in failed else "✓"
+        click.echo(f"  {mark} {repo}: {report[repo]}")
+    click.echo(f"\n{len(repos) - len(failed)} succeeded, {len(failed)} failed")
+    if failed:
+        click.get_current_context().exit(1)
+
+
+@cli.command("stub-llm")
+@click.option("--host", default="127.0.0.1", help="Interface to listen on")
+@click.option("--port", type=int, default=4000, help="Port to listen on")
+@click.option(
+    "--latency",
+    type=click.FloatRange(min=0),
+    default=0.0,
+    help="Seconds before each response starts",
+)
+@click.option(
+    "--jitter",
+    type=click.FloatRange(min=0),
+    default=0.0,
+    help="Up to this many extra seconds of random latency",
+)
+@click.option(
+    "--error-rate",
+    type=click.FloatRange(0, 1),
+    default=0.0,
+    help="Fraction of requests that fail",
+)
+@click.option(
+    "--error-status",
+    type=int,
+    default=503,
+    help="HTTP status of failed requests (default: 503)",
+)
+@click.option(
+    "--completion-tokens",
+    type=click.IntRange(min=1),
+    help="Pad every answer to this many tokens",
+)
+@click.option("--seed", type=int, default=0, help="Seed for jitter and failures")
+def stub_llm(
+    host, port, latency, jitter, error_rate, error_status, completion_tokens, seed
+):
+    """Run a local stub LLM server for offline testing and load tests."""
+    from automated_changelog.stub_server import StubLLMServer
+
+    try:
+        server = StubLLMServer(
+            host=host,
+            port=port,
+            latency=latency,
+            jitter=jitter,
+            error_rate=error_rate,
+            error_status=error_status,
+            completion_tokens=completion_tokens,
+            seed=seed,
+        )
+    except OSError as e:
+        click.echo(f"✗ Could not listen on {host}:{port}: {e}", err=True)
+        raise click.Abort()
+
+    click.echo(f"✓ Stub LLM server listening on {server.url}")
+    click.echo("  Point the changelog tools at it with:")
+    click.echo(f"    export LITELLM_PROXY_API_BASE={server.url}")
+    click.echo("    export LITELLM_PROXY_API_KEY=stub")
+    click.echo("  Press Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    click.echo(f"\n{server.requests} requests served ({server.errors} failed)")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,264 @@
+"""Compact commit lists into short LLM prompts."""
+
+import re
+from collections.abc import Iterable, Mapping
+from typing import Any, Optional
+
+from automated_changelog.git_state import STAT_TOP_DIRECTORIES, DiffStat
+from automated_changelog.llm import estimate_tokens
+
+DEFAULT_MAX_SUBJECT_CHARS = 200
+
+# Tokens reserved for the "... and N older commits not shown" line
+OMITTED_NOTE_TOKENS = 12
+
+# Numbers, versions and hashes that make otherwise identical subjects differ
+_VARIABLE_PARTS = re.compile(r"\b(?=[0-9a-f]*\d)[0-9a-f]{7,40}\b|v?\d+(?:[.\-_]\d+)*")
+_SPACES = re.compile(r"\s+")
+
+
+def format_commit_line(commit: Mapping[str, Any]) -> str:
+    """Render a commit with all of its fields, one prompt line per commit."""
+    line = (
+        f"- {commit['short_hash']} {commit['subject']} "
+        f"({commit['author']}, {commit['date']})"
+    )
+    stats = commit.get("stats")
+    return f"{line} {format_stats(stats)}" if stats and stats.files else line
+
+
+def format_commit_lines(commits: Iterable[Mapping[str, Any]]) -> list[str]:
+    """
+    Render commits in full, one prompt line each.
+
+    Commits fetched with bodies get them indented under their line; a body
+    identical to one already shown (squash and cherry-pick chains repeat
+    them) is left out.
+    """
+    seen: set[str] = set()
+    return [format_body(format_commit_line(commit), commit, seen) for commit in commits]
+
+
+def format_body(line: str, commit: Mapping[str, Any], seen: set[str]) -> str:
+    """
+    Append a commit's body to its prompt line, unless it was already shown.
+
+    Args:
+        line: Prompt line of the commit
+        commit: Commit, possibly with a ``body``
+        seen: Keys of the bodies shown so far; updated in place
+
+    Returns:
+        The line, followed by the indented body if it is new
+    """
+    body = commit.get("body")
+    if not body:
+        return line
+    key = _SPACES.sub(" ", body.lower())
+    if key in seen:
+        return line
+    seen.add(key)
+    return line + "\n  " + body.replace("\n", "\n  ")
+
+
+def _short_count(count: int) -> str:
+    return str(count) if count < 1000 else f"{count / 1000:.1f}k"
+
+
+def format_stats(stats: DiffStat) -> str:
+    """
+    Size of a change in a few prompt tokens.
+
+    For example ``[+1.2k/-30, 4 files: src/auth, tests]``, so the LLM can
+    tell a one-line fix from a large refactor.
+    """
+    files = "1 file" if stats.files == 1 else f"{stats.files} files"
+    text = (
+        f"[+{_short_count(stats.insertions)}/-{_short_count(stats.deletions)}, "
+        f"{files}"
+    )
+    if stats.directories:
+        text += ": " + ", ".join(directory for directory, _ in stats.directories)
+    return text + "]"
+
+
+def merge_stats(all_stats: Iterable[Optional[DiffStat]]) -> Optional[DiffStat]:
+    """Combined size of several changes (None if none carry stats)."""
+    files = insertions = deletions = 0
+    directories: dict[str, int] = {}
+    found = False
+    for stats in all_stats:
+        if stats is None:
+            continue
+        found = True
+        files += stats.files
+        insertions += stats.insertions
+        deletions += stats.deletions
+        for directory, lines in stats.directories:
+            directories[directory] = directories.get(directory, 0) + lines
+    if not found:
+        return None
+    busiest = sorted(directories.items(), key=lambda item: (-item[1], item[0]))
+    return DiffStat(files, insertions, deletions, tuple(busiest[:STAT_TOP_DIRECTORIES]))
+
+
+def _full_prompt_tokens(commits: list[Mapping[str, Any]]) -> int:
+    """
+    Estimated tokens of format_commit_lines(commits), without rendering it.
+
+    Counts the characters of each commit's fields plus the fixed parts of
+    its line (bodies are counted even where duplicates would be left out).
+    """
+    # Newlines join the lines, so the last one has none
+    chars = -1
+    for commit in commits:
+        # "- ", " ", " (", ", ", ")" and the joining newline
+        chars += 9 + len(commit["short_hash"]) + len(commit["subject"])
+        chars += len(commit["author"]) + len(commit["date"])
+        stats = commit.get("stats")
+        if stats and stats.files:
+            chars += 1 + len(format_stats(stats))
+        body = commit.get("body")
+        if body:
+            chars += 3 + len(body) + 2 * body.count("\n")
+    return max(chars, 0) // 4 + 1
+
+
+def subject_key(subject: str) -> str:
+    """
+    Normalize a subject so that near-identical subjects compare equal.
+
+    Case, whitespace, trailing punctuation, numbers, version strings and
+    hashes are ignored, so "Bump version to 1.2.3" and "bump version to
+    1.2.4." share a key.
+    """
+    key = _VARIABLE_PARTS.sub("#", subject.lower())
+    return _SPACES.sub(" ", key).strip(" .!")
+
+
+class PromptCompactor:
+    """
+    Shrink the commit list sent to the LLM.
+
+    Compaction keeps only the commit subjects (hash, author and date don't
+    help a summary), merges near-identical subjects into one line with a
+    count, caps very long subjects and, with a token budget, leaves out the
+    oldest lines that don't fit. Token counts before and after compaction
+    are accumulated across calls for reporting.
+    """
+
+    def __init__(
+        self,
+        token_budget: Optional[int] = None,
+        max_subject_chars: int = DEFAULT_MAX_SUBJECT_CHARS,
+    ):
+        """
+        Args:
+            token_budget: Maximum estimated tokens of commit text per summary;
+                None keeps every (deduplicated) commit
+            max_subject_chars: Subjects longer than this are cut off
+        """
+        self.token_budget = token_budget
+        self.max_subject_chars = max_subject_chars
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    @classmethod
+    def from_config(
+        cls, compaction_config: Optional[dict[str, Any]]
+    ) -> Optional["PromptCompactor"]:
+        """
+        Create a compactor from the ``compaction:`` config section, if enabled.
+
+        Compaction is opt-in: configs without the section keep sending every
+        commit in full, so their prompts and cache keys don't change.
+        """
+        compaction_config = compaction_config or {}
+        if not compaction_config.get("enabled", False):
+            return None
+        return cls(
+            token_budget=compaction_config.get("token_budget"),
+            max_subject_chars=compaction_config.get(
+                "max_subject_chars", DEFAULT_MAX_SUBJECT_CHARS
+            ),
+        )
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    def options(self) -> dict[str, Any]:
+        """Settings that change the compacted prompt (for cache keys)."""
+        return {
+            "token_budget": self.token_budget,
+            "max_subject_chars": self.max_subject_chars,
+        }
+
+    def compact(self, commits: list[Mapping[str, str]]) -> list[str]:
+        """
+        Turn commits into compact prompt lines, newest first.
+
+        Args:
+            commits: Commits in changelog order (newest first)
+
+        Returns:
+            One line per distinct subject, e.g. ``- bump version to 2.1.0
+            (x40)``, plus a final note if lines were left out for the budget.
+            Commits fetched with diff stats get their combined size appended,
+            e.g. ``[+120/-30, 4 files: src/auth]``, and commits fetched with
+            bodies get the newest body of their group indented below, unless
+            the same body was already shown
+        """
+        groups: dict[str, list] = {}
+        for commit in commits:
+            subject = commit["subject"].strip()
+            group = groups.setdefault(subject_key(subject), [subject, 0, [], None])
+            group[1] += 1
+            stats = commit.get("stats")
+            if stats is not None:
+                group[2].append(stats)
+            if group[3] is None and commit.get("body"):
+                group[3] = commit
+
+        entries = []
+        seen_bodies: set[str] = set()
+        for subject, count, group_stats, body_commit in groups.values():
+            if len(subject) > self.max_subject_chars:
+                subject = subject[: self.max_subject_chars].rstrip() + "…"
+            line = f"- {subject} (x{count})" if count > 1 else f"- {subject}"
+            stats = merge_stats(group_stats)
+            if stats and stats.files:
+                line += " " + format_stats(stats)
+            if body_commit is not None:
+                line = format_body(line, body_commit, seen_bodies)
+            entries.append((line, count))
+
+        lines = [line for line, _ in entries]
+        if self.token_budget:
+            lines = self._fit_budget(entries, len(commits))
+
+        self.tokens_before += _full_prompt_tokens(commits)
+        self.tokens_after += estimate_tokens("\n".join(lines))
+        return lines
+
+    def _fit_budget(self, entries: list[tuple[str, int]], total: int) -> list[str]:
+        """Keep the newest lines that fit the budget, noting what was left out."""
+        kept = []
+        used = 0
+        for line, count in entries:
+            # Count the newline joining this line to the next one
+            cost = estimate_tokens(line + "\n")
+            if used + cost > self.token_budget:
+                break
+            kept.append((line, count))
+            used += cost
+        if len(kept) == len(entries):
+            return [line for line, _ in entries]
+
+        # Make room for the note about the omitted commits
+        while kept and used > self.token_budget - OMITTED_NOTE_TOKENS:
+            used -= estimate_tokens(kept.pop()[0] + "\n")
+        omitted = total - sum(count for _, count in kept)
+        return [line for line, _ in kept] + [
+            f"- ... and {omitted} older commits not shown"
+        ]
@@ -24,6 +24,43 @@ def generate_config_template(repo_name: str) -> str:
 # The tool will prepend new entries to this file.
 output_file: "CHANGELOG.md"
 
+# How commit history is read: "git" runs the git command line tool (default);
+# "pygit2" reads the repository in-process through libgit2, which avoids a
+# process per run and works without git installed. Incremental runs are
+# faster with pygit2; git is faster at reading long histories with paths.
+# With skewed commit dates, --from-date ranges can differ slightly between
+# the two (pygit2 keeps in-range commits that git log --since drops).
+# Requires: pip install 'automated-changelog[pygit2]'
+# backend: "git"
+
+# Optional sidecar file recording the last processed commit and an index of
+# changelog entries (byte offsets, commit and date ranges). Incremental runs
+# then read their state from this file instead of the changelog; the marker
+# in the changelog remains the fallback.
+# state_file: ".changelog_state.json"
+
+# Add the size of each change to the LLM prompt: lines added and removed,
+# files touched and the busiest directories, e.g. "[+120/-30, 4 files:
+# src/auth, tests]". Read in the same history walk as the commits; costs
+# a few prompt tokens per commit and some extra git time on long histories.
+# diff_stats: false
+
+# Add commit bodies to the LLM prompt, for teams that explain their changes
+# there. Trailers (Signed-off-by, Co-authored-by, ...) are stripped, each
+# body is cut to max_tokens estimated tokens, and a body identical to one
+# already shown (squash and cherry-pick chains) is sent only once.
+# commit_bodies:
+#   enabled: false
+#   max_tokens: 100
+
+# Modules (directories) of a monorepo, relative to the repository root.
+# With more than one module, commits are grouped by the directories they
+# touch and each module gets its own summary (generated in parallel),
+# followed by an overall summary across modules.
+# modules:
+#   - services/api
+#   - web
+
 # Filtering rules for commits.
 # These help focus the changelog on significant changes by excluding noise.
 filter:
@@ -48,6 +85,8 @@ filter:
 
   # Commits ONLY touching files/paths matching these patterns will be ignored.
   # Use glob patterns. If a commit touches ANY file outside these patterns, it won't be filtered.
+  # Patterns follow .gitignore: "*" stays within one directory, "**" spans
+  # directories, "docs/" matches a directory anywhere, "src/*.py" only at the root.
   ignore_paths_only:
     - "*.md"
     - "docs/"
@@ -61,32 +100,103 @@ llm:
   # Model to use for summarization (default: claude-sonnet-4-5)
   model: "claude-sonnet-4-5"
 
+  # Large commit ranges are split into chunks of roughly this many prompt
+  # tokens, summarized in parallel and then combined into one summary.
+  chunk_token_budget: 60000
+
+  # Maximum number of LLM requests in flight at the same time.
+  max_concurrency: 4
+
+  # Optional rate limits shared by all LLM requests of a run.
+  # requests_per_minute: 50
+  # tokens_per_minute: 100000
+
+  # Maximum tokens in each LLM response.
+  max_tokens: 7096
+
+  # Seconds before an LLM request is abandoned.
+  timeout: 120
+  # Timeouts, connection errors, rate limiting (429) and server errors (5xx)
+  # are retried this many times, with exponential backoff and jitter.
+  max_retries: 3
+  # Send a second, identical request when one takes longer than this
+  # percentile of the run's earlier requests; the first answer wins.
+  # hedge_percentile: 95
+
   # System prompt for changelog summaries
   summary_prompt: |
     You are a technical writer creating changelog entries.
     Summarize the significant changes in 2-4 concise bullet points.
     Focus on features, fixes, and breaking changes. Ignore minor updates.
     Use clear, user-facing language.
+
+  # Prompts used when more than one module is configured.
+  # module_summary_prompt: |
+  #   Summarize the significant changes for this module in 2-4 bullet points.
+  # overall_summary_prompt: |
+  #   Provide a high-level summary (3-4 sentences) of the key activities
+  #   across all modules.
+
+# Summary cache (optional customization)
+# Summaries are cached on disk by model, prompt and commits, so re-running
+# over the same range (e.g. --dry-run followed by generate) skips the LLM.
+# Without this section no cache is used. Add the cache directory to
+# .gitignore. Disable per run with --no-cache.
+cache:
+  directory: ".changelog_cache"
+  # Entries unused for this many days are discarded.
+  max_age_days: 30
+  # Least recently used entries are evicted above this size.
+  max_size_mb: 50
+
+# Prompt compaction (optional customization)
+# Commits are sent to the LLM as subjects only; near-identical subjects
+# (e.g. 40 "bump version" commits) become one line with a count.
+# Without this section commits are sent in full (hash, author and date).
+compaction:
+  enabled: true
+  # Subjects longer than this many characters are cut off.
+  max_subject_chars: 200
+  # Optional cap on commit text per summary, in estimated tokens. The oldest
+  # lines beyond it are left out (chunk_token_budget splits them instead).
+  # token_budget: 20000
+
+# Markdown rendering (optional customization)
+# Templates for the entry heading and each line of the commit list, with
+# {{ field }} placeholders. Commit lines can use hash, short_hash, author,
+# date and subject.
+# render:
+#   header_template: "## [{{ title }}]"
+#   commit_template: "- `{{ short_hash }}` {{ subject }} ({{ author }}, {{ date }})"
 """
 
     return template
 
 
-def get_repo_name() -> str:
+def get_repo_name(backend: Any = None) -> str:
     """Get the repository name from git or current directory.
 
+    Args:
+        backend: Repository backend (see backends.get_backend) to look up the
+            origin URL with; None runs ``git remote get-url``
+
     Returns:
         Repository name as string
     """
     try:
         # Try to get from git remote
-        result = subprocess.run(
-            ["git", "remote", "get-url", "origin"],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        url = result.stdout.strip()
+        if backend is not None:
+            url = backend.remote_url("origin")
+            if not url:
+                raise ValueError("No origin remote")
+        else:
+            result = subprocess.run(
+                ["git", "remote", "get-url", "origin"],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            url = result.stdout.strip()
         # Extract repo name from URL
         # e.g., https://github.com/user/repo.git -> repo
         name = url.split("/")[-1].replace(".git", "")
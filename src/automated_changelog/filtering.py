@@ -0,0 +1,272 @@
+"""Commit filtering and grouping logic."""
+
+import functools
+import re
+from collections.abc import Iterable, Mapping
+from typing import Any, Optional
+
+
+@functools.lru_cache(maxsize=32)
+def compile_path_patterns(patterns: tuple[str, ...]) -> Optional[re.Pattern]:
+    """
+    Compile ignore_paths_only glob patterns into a single matcher.
+
+    Patterns follow .gitignore conventions:
+    - ``docs/`` (trailing slash) matches everything under a ``docs``
+      directory at any depth
+    - ``*.md`` (no slash) matches the file name at any depth
+    - ``src/*.py`` (inner or leading slash) matches from the repository
+      root; ``*`` and ``?`` never match ``/``, so it doesn't match
+      ``src/a/b.py``
+    - ``**`` matches any number of directories: ``src/**/*.py``,
+      ``**/fixtures``, ``vendor/**``
+    - A pattern matching a directory also matches everything under it
+
+    Args:
+        patterns: Glob patterns from the filter configuration
+
+    Returns:
+        Compiled regex whose ``match`` accepts ignored paths, or None if
+        there are no patterns
+    """
+    alternatives = []
+    for pattern in patterns:
+        glob = pattern.strip("/")
+        if not glob:
+            continue
+        # A slash anywhere but at the end anchors the pattern at the root
+        prefix = "" if "/" in pattern.rstrip("/") else "(?:.*/)?"
+        suffix = "/.*" if pattern.endswith("/") else "(?:/.*)?"
+        alternatives.append(f"(?:{prefix}{_glob_regex(glob)}{suffix})")
+
+    if not alternatives:
+        return None
+
+    return re.compile("(?:" + "|".join(alternatives) + r")\Z", re.DOTALL)
+
+
+def _glob_regex(glob: str) -> str:
+    """Translate one .gitignore glob (without outer slashes) into a regex."""
+    parts = []
+    position = 0
+    while position < len(glob):
+        char = glob[position]
+        if glob.startswith("**/", position):
+            parts.append("(?:.*/)?")
+            position += 3
+            continue
+        if glob.startswith("/**", position) and position + 3 == len(glob):
+            parts.append("/.*")
+            position += 3
+            continue
+        if char == "*":
+            parts.append("[^/]*")
+            while glob.startswith("*", position + 1):
+                position += 1
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[" and "]" in glob[position + 2 :]:
+            end = glob.index("]", position + 2)
+            chars = glob[position + 1 : end].replace("\\", "\\\\")
+            if chars.startswith("!"):
+                chars = "^" + chars[1:]
+            elif chars.startswith("^"):
+                chars = "\\" + chars
+            parts.append(f"[{chars}]")
+            position = end
+        else:
+            parts.append(re.escape(char))
+        position += 1
+    return "".join(parts)
+
+
+def _keywords_regex(keywords: Iterable[str]) -> str:
+    """
+    Build a trie-shaped regex that matches any of the given literal keywords.
+
+    Sharing common prefixes (``fix(?:ture|up)``) lets the regex engine test
+    hundreds of keywords at each position of a subject in one pass, instead
+    of scanning the subject once per keyword.
+    """
+    trie: dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict[str, dict]) -> str:
+        branches = [
+            re.escape(char) + build(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        # A keyword ends here: the rest is optional
+        return group + "?" if "" in node else group
+
+    return build(trie)
+
+
+class CommitFilter:
+    """
+    Filter rules compiled once and applied to every commit in one pass.
+
+    - ignore_prefixes become a tuple for a single ``str.startswith`` call
+    - ignore_keywords are lowercased once and merged into one trie regex
+    - ignore_paths_only globs are merged into one path regex
+
+    Use compile_filter() to build (and reuse) instances.
+    """
+
+    def __init__(
+        self,
+        ignore_prefixes: tuple[str, ...] = (),
+        ignore_keywords: tuple[str, ...] = (),
+        ignore_paths_only: tuple[str, ...] = (),
+    ):
+        self.prefixes = tuple(ignore_prefixes)
+        keywords = {keyword.lower() for keyword in ignore_keywords}
+        self.keywords = re.compile(_keywords_regex(keywords)) if keywords else None
+        self.paths = compile_path_patterns(tuple(ignore_paths_only))
+
+    def is_ignored(self, commit: Mapping[str, Any]) -> bool:
+        """Return True if the commit matches any ignore rule."""
+        subject = commit["subject"]
+
+        # Check ignore_prefixes
+        if subject.startswith(self.prefixes):
+            return True
+
+        # Check ignore_keywords (case-insensitive)
+        if self.keywords and self.keywords.search(subject.lower()):
+            return True
+
+        # Check ignore_paths_only (only when all of the commit's files are
+        # known; a truncated file list may hide a file that matters)
+        paths = commit.get("paths")
+        if (
+            self.paths
+            and paths
+            and not commit.get("paths_truncated")
+            and all(self.paths.match(p) for p in paths)
+        ):
+            return True
+
+        return False
+
+    def filter(self, commits: Iterable[Mapping[str, str]]) -> list[Mapping[str, str]]:
+        """Return the commits that match no ignore rule, in order."""
+        is_ignored = self.is_ignored
+        return [commit for commit in commits if not is_ignored(commit)]
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_filter(
+    ignore_prefixes: tuple[str, ...],
+    ignore_keywords: tuple[str, ...],
+    ignore_paths_only: tuple[str, ...],
+) -> CommitFilter:
+    return CommitFilter(ignore_prefixes, ignore_keywords, ignore_paths_only)
+
+
+def compile_filter(filter_config: dict[str, Any]) -> CommitFilter:
+    """
+    Compile filter configuration into a reusable CommitFilter.
+
+    Compiled filters are cached, so repeated calls with the same rules
+    (e.g. across backfill windows or repositories) reuse one instance.
+
+    Args:
+        filter_config: Filter configuration from changelog_config.yaml
+
+    Returns:
+        Compiled CommitFilter
+    """
+    return _compile_filter(
+        tuple(filter_config.get("ignore_prefixes") or ()),
+        tuple(filter_config.get("ignore_keywords") or ()),
+        tuple(filter_config.get("ignore_paths_only") or ()),
+    )
+
+
+def filter_commits(
+    commits: Iterable[Mapping[str, str]],
+    filter_config: dict[str, Any] | CommitFilter,
+) -> list[Mapping[str, str]]:
+    """
+    Filter commits based on configuration rules.
+
+    Commits are consumed in a single pass, so a lazy iterator such as
+    git_state.iter_commits can be passed in directly. ``ignore_paths_only``
+    rules only apply to commits that carry a ``paths`` entry (see
+    git_state.fetch_commits with_paths).
+
+    Args:
+        commits: Iterable of commits (Commit records or dictionaries)
+        filter_config: Filter configuration from changelog_config.yaml, or
+            an already compiled CommitFilter
+
+    Returns:
+        Filtered list of commits
+    """
+    if not filter_config:
+        return list(commits)
+
+    if not isinstance(filter_config, CommitFilter):
+        filter_config = compile_filter(filter_config)
+
+    return filter_config.filter(commits)
+
+
+# Group for commits that touch none of the configured modules
+OTHER_MODULE = "other"
+
+
+def group_commits_by_module(
+    commits: Iterable[Mapping[str, Any]],
+    modules: list[str],
+) -> dict[str, list[Mapping[str, Any]]]:
+    """
+    Group commits by the module directories their files fall under.
+
+    A file belongs to the most specific module whose directory contains it
+    (so ``services/api`` wins over ``services``). A commit touching several
+    modules appears in each of them; commits touching no module, or whose
+    files are unknown or truncated (see MAX_COMMIT_PATHS), go to
+    OTHER_MODULE.
+
+    Args:
+        commits: Commits with a ``paths`` entry (see fetch_commits with_paths)
+        modules: Module directories from the config, relative to the repo root
+
+    Returns:
+        Mapping of module name to its commits, in config order, with
+        OTHER_MODULE last. Modules without commits are omitted.
+    """
+    module_dirs = {module.strip("/"): module for module in modules}
+    groups: dict[str, list[Mapping[str, Any]]] = {module: [] for module in modules}
+    groups[OTHER_MODULE] = []
+
+    for commit in commits:
+        if commit.get("paths_truncated"):
+            groups[OTHER_MODULE].append(commit)
+            continue
+        touched = []
+        for path in commit.get("paths") or ():
+            # Walk from the deepest parent directory up to the first component
+            parts = path.split("/")[:-1]
+            for depth in range(len(parts), 0, -1):
+                module = module_dirs.get("/".join(parts[:depth]))
+                if module is not None:
+                    if module not in touched:
+                        touched.append(module)
+                    break
+        for module in touched or [OTHER_MODULE]:
+            groups[module].append(commit)
+
+    return {module: group for module, group in groups.items() if group}
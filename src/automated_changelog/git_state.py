@@ -1,13 +1,38 @@
 """Git operations and state management for automated-changelog."""
 
+import os
 import re
+import shutil
 import subprocess
+import sys
+import tempfile
+from collections.abc import Iterator, Mapping
 from pathlib import Path
-from typing import Optional
+from typing import Any, BinaryIO, NamedTuple, Optional
 
 STATE_MARKER_START = "<!-- CHANGELOG_STATE:"
 STATE_MARKER_END = "-->"
 
+# The state marker is written as the first line, so writers only look for
+# it in this many leading bytes and readers scan in chunks of this size
+STATE_HEAD_BYTES = 64 * 1024
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# First commit hash recorded by either the state marker or an entry marker
+_HASH_MARKER_PATTERN = re.compile(
+    rb"<!-- (?:CHANGELOG_STATE|LATEST_COMMIT):\s*([a-f0-9]{40})\s*-->"
+)
+_MARKER_OVERLAP = 256
+
+# Old marker plus the blank line(s) after it
+_STATE_LINE_PATTERN = re.compile(
+    rb"("
+    + re.escape(STATE_MARKER_START.encode())
+    + rb"[^\n]*?"
+    + re.escape(STATE_MARKER_END.encode())
+    + rb")\n*"
+)
+
 
 def read_last_commit_hash(changelog_path: str | Path) -> Optional[str]:
     """
@@ -16,6 +41,12 @@ def read_last_commit_hash(changelog_path: str | Path) -> Optional[str]:
     The hash is stored in a HTML comment at the top of the file:
     <!-- CHANGELOG_STATE: <commit_hash> -->
 
+    Each incremental entry also records its newest commit as
+    <!-- LATEST_COMMIT: <commit_hash> -->, so the first marker of either
+    kind is the most recent state. The file is scanned in chunks from the
+    top and reading stops at the first marker, so the cost does not grow
+    with the length of the changelog.
+
     Args:
         changelog_path: Path to the changelog file
 
@@ -28,18 +59,18 @@ def read_last_commit_hash(changelog_path: str | Path) -> Optional[str]:
         return None
 
     try:
-        content = changelog_file.read_text(encoding="utf-8")
-
-        # Look for the state marker in the first few lines
-        start = re.escape(STATE_MARKER_START)
-        end = re.escape(STATE_MARKER_END)
-        pattern = rf"{start}\s*([a-f0-9]{{40}})\s*{end}"
-        match = re.search(pattern, content)
-
-        if match:
-            return match.group(1)
-
-        return None
+        with open(changelog_file, "rb") as f:
+            window = b""
+            while True:
+                chunk = f.read(STATE_HEAD_BYTES)
+                if not chunk:
+                    return None
+                window += chunk
+                match = _HASH_MARKER_PATTERN.search(window)
+                if match:
+                    return match.group(1).decode("ascii")
+                # Keep enough of the tail for a marker split across chunks
+                window = window[-_MARKER_OVERLAP:]
 
     except Exception:
         return None
@@ -49,42 +80,637 @@ def write_changelog_entry(
     changelog_path: str | Path,
     latest_commit_hash: Optional[str],
     summary: str,
-) -> None:
+) -> int:
     """
     Write a new changelog entry and optionally update the state marker.
 
     This function prepends the new summary to the changelog file and
     updates the state marker with the latest commit hash (if provided).
+    The state marker always stays on the first line; without a new hash an
+    existing marker is kept in place above the new entry.
+
+    The new file is streamed into a temporary file next to the changelog:
+    only the first STATE_HEAD_BYTES are searched for the old marker, the
+    rest of the old changelog is copied through in chunks, and the result
+    atomically replaces the original. Memory use is independent of the
+    changelog size, and an interrupted write leaves the old file intact.
 
     Args:
         changelog_path: Path to the changelog file
         latest_commit_hash: Hash of the latest processed commit. If None,
             no state marker will be written (useful for historical generation).
         summary: The changelog summary to prepend
+
+    Returns:
+        Byte offset of the summary in the rewritten file
     """
-    changelog_file = Path(changelog_path)
+    # Replace the target of a symlinked changelog, not the link itself
+    changelog_file = Path(os.path.realpath(changelog_path))
 
-    # Read existing content if file exists
-    existing_content = ""
-    if changelog_file.exists():
-        existing_content = changelog_file.read_text(encoding="utf-8")
+    state_line = b""
+    if latest_commit_hash:
+        state_line = (
+            f"{STATE_MARKER_START} {latest_commit_hash} {STATE_MARKER_END}".encode()
+        )
 
-        # Remove old state marker if it exists (only when updating state)
-        if latest_commit_hash:
-            marker_start = re.escape(STATE_MARKER_START)
-            marker_end = re.escape(STATE_MARKER_END)
-            pattern = rf"{marker_start}.*?{marker_end}\n?"
-            existing_content = re.sub(pattern, "", existing_content, count=1)
+    fd, tmp_name = tempfile.mkstemp(
+        dir=changelog_file.parent, prefix=f".{changelog_file.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as out:
+
+            def write_head(state: bytes, rest: bytes) -> int:
+                offset = 0
+                if state:
+                    offset = out.write(state + b"\n\n")
+                out.write(summary.encode("utf-8") + b"\n\n")
+                out.write(rest)
+                return offset
+
+            if changelog_file.exists():
+                with open(changelog_file, "rb") as source:
+                    head = source.read(STATE_HEAD_BYTES)
+                    match = _STATE_LINE_PATTERN.search(head)
+                    if match:
+                        state_line = state_line or match.group(1)
+                        head = head[: match.start()] + head[match.end() :]
+                    offset = write_head(state_line, head)
+                    shutil.copyfileobj(source, out, COPY_CHUNK_SIZE)
+            else:
+                offset = write_head(state_line, b"")
+
+            out.flush()
+            os.fsync(out.fileno())
+
+        if changelog_file.exists():
+            shutil.copymode(changelog_file, tmp_name)
+        else:
+            os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, changelog_file)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+    return offset
+
+
+# Directory levels that diff stats aggregate by ("src/auth/login.py" counts
+# towards "src/auth")
+STAT_DIRECTORY_DEPTH = 2
+
+# Hard cap on the directories tracked per commit: a huge vendoring commit
+# touching thousands of directories adds the rest to STAT_OTHER_DIRECTORIES
+MAX_STAT_DIRECTORIES = 32
+
+# Hard cap on the paths kept per commit: a vendoring or mass-rename commit
+# keeps only its first MAX_COMMIT_PATHS files and is marked paths_truncated
+MAX_COMMIT_PATHS = 1000
+
+# How many of the busiest directories a DiffStat keeps
+STAT_TOP_DIRECTORIES = 3
+
+STAT_OTHER_DIRECTORIES = "..."
+
+
+class DiffStat(NamedTuple):
+    """
+    Size of a commit's change, aggregated from ``git log --numstat``.
 
-    # Create new content with optional state marker and summary
-    if latest_commit_hash:
-        state_marker = f"{STATE_MARKER_START} {latest_commit_hash} {STATE_MARKER_END}\n"
-        new_content = state_marker + "\n" + summary + "\n\n" + existing_content
-    else:
-        new_content = summary + "\n\n" + existing_content
+    Only totals and the busiest directories are kept, never the file list,
+    so a commit touching 50k files costs as much memory as one touching a
+    single file. Binary files count as changed files without lines.
+    """
+
+    files: int = 0
+    insertions: int = 0
+    deletions: int = 0
+    # (directory, changed lines) of the busiest directories, busiest first
+    directories: tuple[tuple[str, int], ...] = ()
+
+
+def stat_directory(path: str, depth: int = STAT_DIRECTORY_DEPTH) -> str:
+    """Directory a file's changes are counted towards ("." for the root)."""
+    parts = path.split("/")[:-1]
+    return "/".join(parts[:depth]) or "."
+
+
+class StatCounter:
+    """Accumulates one commit's numstat lines into a DiffStat."""
+
+    __slots__ = ("files", "insertions", "deletions", "directories")
 
-    # Write to file
-    changelog_file.write_text(new_content, encoding="utf-8")
+    def __init__(self):
+        self.files = 0
+        self.insertions = 0
+        self.deletions = 0
+        self.directories: dict[str, int] = {}
+
+    def add(self, path: str, insertions: int, deletions: int) -> None:
+        """Count one changed file."""
+        self.files += 1
+        self.insertions += insertions
+        self.deletions += deletions
+        directory = stat_directory(path)
+        directories = self.directories
+        if directory not in directories and len(directories) >= MAX_STAT_DIRECTORIES:
+            directory = STAT_OTHER_DIRECTORIES
+        directories[directory] = directories.get(directory, 0) + insertions + deletions
+
+    def result(self) -> DiffStat:
+        """The commit's DiffStat, with only the busiest directories."""
+        busiest = sorted(self.directories.items(), key=lambda item: (-item[1], item[0]))
+        return DiffStat(
+            self.files,
+            self.insertions,
+            self.deletions,
+            tuple(busiest[:STAT_TOP_DIRECTORIES]),
+        )
+
+
+# Default cap on a commit body in the prompt, in estimated tokens
+DEFAULT_MAX_BODY_TOKENS = 100
+
+# Body lines that say nothing about the change: sign-offs, co-authors and
+# reviewers (any "<Something>-by:" trailer), Gerrit ids, Cc lines and the
+# note `git cherry-pick -x` appends
+_BODY_NOISE_PATTERN = re.compile(
+    r"(?:[\w-]+-by|Change-Id|Cc)\s*:|\(cherry picked from commit ", re.IGNORECASE
+)
+
+
+def clean_body(body: str, max_tokens: int = DEFAULT_MAX_BODY_TOKENS) -> str:
+    """
+    Prompt-ready text of a commit body.
+
+    Drops trailers such as ``Signed-off-by`` and ``Co-authored-by``,
+    cherry-pick notes and blank lines, and cuts the rest to about
+    ``max_tokens`` tokens (~4 characters each), so a commit with a pasted
+    log costs no more than one with a short explanation.
+
+    Args:
+        body: Commit message without its subject (git's ``%b``)
+        max_tokens: Maximum estimated tokens to keep
+
+    Returns:
+        Cleaned body, empty if nothing but trailers was left
+    """
+    max_chars = max_tokens * 4
+    # Only look at a bounded prefix; whitespace and trailers rarely take
+    # up more than three quarters of it
+    lines = (line.strip() for line in body[: max_chars * 4].splitlines())
+    text = "\n".join(
+        line for line in lines if line and not _BODY_NOISE_PATTERN.match(line)
+    )
+    if len(text) > max_chars:
+        text = text[:max_chars].rstrip() + "…"
+    return text
+
+
+class Commit(Mapping):
+    """
+    Compact, immutable record for a single commit.
+
+    Uses ``__slots__`` instead of a per-commit dict, stores the hash as raw
+    bytes and interns author names, which keeps memory flat on histories
+    with hundreds of thousands of commits. It still behaves like the commit
+    dictionaries used throughout the tool (``commit["subject"]``,
+    ``dict(commit)``, comparison with dicts), so both can be passed anywhere
+    a commit is expected.
+
+    Optional fields (``paths``, ``stats`` and ``body``) are only present as
+    keys when they were requested from git, mirroring a dict that lacks the
+    key. ``paths_truncated`` is only present (and True) when the commit
+    touched more than MAX_COMMIT_PATHS files.
+    """
+
+    __slots__ = (
+        "_hash",
+        "_abbrev",
+        "author",
+        "date",
+        "subject",
+        "paths",
+        "stats",
+        "body",
+        "paths_truncated",
+    )
+
+    FIELDS = ("hash", "short_hash", "author", "date", "subject")
+    OPTIONAL_FIELDS = ("paths", "stats", "body", "paths_truncated")
+
+    def __init__(
+        self,
+        hash: str,
+        author: str,
+        date: str,
+        subject: str,
+        abbrev: int = 7,
+        paths: Optional[tuple[str, ...]] = None,
+        stats: Optional[DiffStat] = None,
+        body: Optional[str] = None,
+        paths_truncated: Optional[bool] = None,
+    ):
+        """
+        Args:
+            hash: Full hex commit hash
+            author: Author name (interned)
+            date: Author date (YYYY-MM-DD HH:MM)
+            subject: Commit subject line
+            abbrev: Length of the abbreviated hash
+            paths: Files touched by the commit, or None if not fetched
+            stats: Size of the change, or None if not fetched
+            body: Cleaned commit body (see clean_body), or None if not fetched
+            paths_truncated: True if paths holds only the first
+                MAX_COMMIT_PATHS files, otherwise None
+        """
+        try:
+            self._hash: bytes | str = bytes.fromhex(hash)
+        except ValueError:
+            # Not a plain hex object id; keep it verbatim
+            self._hash = hash
+        self._abbrev = abbrev
+        self.author = sys.intern(author)
+        self.date = date
+        self.subject = subject
+        self.paths = paths
+        self.stats = stats
+        self.body = body
+        self.paths_truncated = paths_truncated or None
+
+    @property
+    def hash(self) -> str:
+        """Full hex commit hash."""
+        if isinstance(self._hash, bytes):
+            return self._hash.hex()
+        return self._hash
+
+    @property
+    def short_hash(self) -> str:
+        """Abbreviated commit hash, computed on access."""
+        return self.hash[: self._abbrev]
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if key in self.OPTIONAL_FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.FIELDS
+        for key in self.OPTIONAL_FIELDS:
+            if getattr(self, key) is not None:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"Commit({self.short_hash} {self.subject!r})"
+
+
+# Size of each read from the git log pipe
+READ_CHUNK_SIZE = 64 * 1024
+
+# Format: hash ||| short_hash ||| author ||| date ||| subject
+LOG_FORMAT = "--pretty=format:%H|||%h|||%an|||%ai|||%s"
+
+# With bodies, the subject is followed by the body between control
+# characters, since bodies span lines and may contain anything printable
+BODY_START = "\x1f"
+BODY_END = "\x1e"
+LOG_FORMAT_WITH_BODY = LOG_FORMAT + "%x1f%b%x1e"
+
+
+def _build_log_command(
+    repo_path: str | Path,
+    last_commit_hash: Optional[str],
+    since_date: Optional[str],
+    until_date: Optional[str],
+    max_count: Optional[int],
+    with_paths: bool = False,
+    with_stats: bool = False,
+    with_body: bool = False,
+) -> list[str]:
+    """Build the NUL-delimited git log command for the requested range."""
+    cmd = ["git", "-C", str(repo_path), "log", "-z"]
+
+    # Determine commit range - date range takes precedence
+    if since_date or until_date:
+        # Use date-based filtering
+        if since_date:
+            cmd.append(f"--since={since_date}")
+        if until_date:
+            cmd.append(f"--until={until_date}")
+    elif last_commit_hash:
+        # Use commit hash range (original behavior)
+        cmd.append(f"{last_commit_hash}..HEAD")
+
+    if max_count:
+        cmd.append(f"--max-count={max_count}")
+
+    if with_stats:
+        # Lists the touched files as well, so it also serves with_paths
+        cmd.append("--numstat")
+    elif with_paths:
+        cmd.append("--name-only")
+
+    cmd.append(LOG_FORMAT_WITH_BODY if with_body else LOG_FORMAT)
+    return cmd
+
+
+def _iter_records(stream: BinaryIO, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Yield NUL-delimited records from a binary stream as they arrive.
+
+    Only the current chunk and any partial trailing record are held in
+    memory, regardless of how much output the stream produces.
+
+    Args:
+        stream: Binary stream to read from (e.g. a subprocess pipe)
+        chunk_size: Maximum number of bytes to read at a time
+
+    Yields:
+        Decoded records, without the NUL terminator
+    """
+    read = getattr(stream, "read1", stream.read)
+    pending = b""
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            break
+        pending += chunk
+        *records, pending = pending.split(b"\0")
+        for record in records:
+            yield record.decode("utf-8", errors="replace")
+
+    if pending:
+        yield pending.decode("utf-8", errors="replace")
+
+
+def _parse_commit_record(
+    record: str,
+    paths: Optional[tuple[str, ...]] = None,
+    stats: Optional[DiffStat] = None,
+    max_body_tokens: Optional[int] = None,
+    paths_truncated: bool = False,
+) -> Optional[Commit]:
+    """
+    Parse a single formatted git log record into a Commit.
+
+    With max_body_tokens, the record is expected to carry a body
+    (LOG_FORMAT_WITH_BODY), which is cleaned and truncated to that budget.
+    """
+    body = None
+    if max_body_tokens is not None:
+        record, _, body = record.partition(BODY_START)
+        body = clean_body(body.partition(BODY_END)[0], max_body_tokens)
+
+    parts = record.split("|||", 4)
+    if len(parts) != 5:
+        return None
+
+    # Trim date to just YYYY-MM-DD HH:MM (remove seconds and timezone)
+    date_str = parts[3].strip()
+    if len(date_str) >= 16:
+        date_str = date_str[:16]  # "2025-10-27 14:32"
+
+    return Commit(
+        hash=parts[0].strip(),
+        author=parts[2].strip(),
+        date=date_str,
+        subject=parts[4].strip(),
+        abbrev=len(parts[1].strip()),
+        paths=paths,
+        stats=stats,
+        body=body,
+        paths_truncated=paths_truncated,
+    )
+
+
+def _parse_commits_with_files(
+    records: Iterator[str],
+    with_paths: bool = True,
+    with_stats: bool = False,
+    max_body_tokens: Optional[int] = None,
+) -> Iterator[Commit]:
+    """
+    Parse ``git log -z --name-only`` or ``--numstat`` records into Commits.
+
+    Each commit arrives as ``<header>\\n<file>\\0<file>\\0...\\0`` followed by
+    an empty record, while commits without file changes (merges, empty
+    commits) arrive as a bare ``<header>`` record. With ``--numstat`` each
+    file is ``<added>\\t<deleted>\\t<path>`` (``-`` for binary files), and a
+    rename is ``<added>\\t<deleted>\\t`` followed by the old and new path as
+    separate records. A header with a body ends at BODY_END, so body lines
+    are not mistaken for files.
+
+    Args:
+        records: NUL-delimited git log records
+        with_paths: Keep the touched paths
+        with_stats: Records carry numstat lines; aggregate them into stats
+        max_body_tokens: Headers carry bodies; truncate them to this budget
+    """
+    header = None
+    paths: list[str] = []
+    paths_truncated = False
+    counter = None
+    # Numstat counts of a rename waiting for its old and new path records
+    rename = None
+    rename_paths_left = 0
+
+    def add_path(path: str) -> None:
+        nonlocal paths_truncated
+        if len(paths) < MAX_COMMIT_PATHS:
+            paths.append(path)
+        else:
+            paths_truncated = True
+
+    def add_file(record: str) -> None:
+        nonlocal rename, rename_paths_left
+        if not with_stats:
+            add_path(record)
+            return
+        if rename_paths_left:
+            rename_paths_left -= 1
+            if rename_paths_left == 0:
+                add_stat(record, *rename)
+            return
+        added, _, rest = record.partition("\t")
+        deleted, _, path = rest.partition("\t")
+        counts = (
+            int(added) if added.isdigit() else 0,
+            int(deleted) if deleted.isdigit() else 0,
+        )
+        if path:
+            add_stat(path, *counts)
+        else:
+            rename, rename_paths_left = counts, 2
+
+    def add_stat(path: str, insertions: int, deletions: int) -> None:
+        if with_paths:
+            add_path(path)
+        counter.add(path, insertions, deletions)
+
+    def build() -> Optional[Commit]:
+        nonlocal header
+        commit = _parse_commit_record(
+            header,
+            paths=tuple(paths) if with_paths else None,
+            stats=counter.result() if with_stats else None,
+            max_body_tokens=max_body_tokens,
+            paths_truncated=paths_truncated,
+        )
+        header = None
+        return commit
+
+    for record in records:
+        if header is None:
+            if max_body_tokens is not None:
+                header, _, rest = record.partition(BODY_END)
+                has_files, first_file = rest[:1], rest[1:]
+            else:
+                header, has_files, first_file = record.partition("\n")
+            paths = []
+            paths_truncated = False
+            counter = StatCounter()
+            if has_files:
+                add_file(first_file)
+                continue
+            commit = build()
+            if commit:
+                yield commit
+        elif record:
+            add_file(record)
+        else:
+            commit = build()
+            if commit:
+                yield commit
+
+    if header is not None:
+        commit = build()
+        if commit:
+            yield commit
+
+
+def iter_commits(
+    last_commit_hash: Optional[str] = None,
+    repo_path: str | Path = ".",
+    since_date: Optional[str] = None,
+    until_date: Optional[str] = None,
+    max_count: Optional[int] = None,
+    with_paths: bool = False,
+    with_stats: bool = False,
+    with_body: bool = False,
+    max_body_tokens: int = DEFAULT_MAX_BODY_TOKENS,
+    backend: Any = None,
+) -> Iterator[Commit]:
+    """
+    Stream commits from git log without buffering its whole output.
+
+    git log is read through a pipe as NUL-delimited records, and each commit
+    is yielded as soon as it has been parsed. Stopping iteration early
+    terminates the git process.
+
+    Args:
+        last_commit_hash: The last processed commit hash. If provided,
+            fetches commits from this hash to HEAD. Ignored if date range is specified.
+        repo_path: Path to the git repository (default: current directory)
+        since_date: Start date for commits (format: YYYY-MM-DD). If provided,
+            date range takes precedence over commit hash range.
+        until_date: End date for commits (format: YYYY-MM-DD). If provided,
+            date range takes precedence over commit hash range.
+        max_count: Maximum number of (newest) commits to read. Use this to
+            bound memory on very large first runs.
+        with_paths: Also collect the files each commit touches, in the same
+            git log invocation (``--name-only``).
+        with_stats: Also collect the size of each change (lines added and
+            removed, busiest directories) as a DiffStat, in the same git log
+            invocation (``--numstat``).
+        with_body: Also collect each commit's body, without trailers
+            (Signed-off-by, Co-authored-by, ...), in the same git log
+            invocation.
+        max_body_tokens: Truncate each body to about this many tokens.
+        backend: Repository backend to read from (see backends.get_backend);
+            None runs git log on repo_path.
+
+    Yields:
+        Commit records, newest first (see fetch_commits for fields)
+
+    Raises:
+        subprocess.CalledProcessError: If git command fails
+        FileNotFoundError: If git is not found
+        backends.BackendError: If the backend cannot read the repository
+    """
+    if backend is not None:
+        yield from backend.iter_commits(
+            last_commit_hash=last_commit_hash,
+            since_date=since_date,
+            until_date=until_date,
+            max_count=max_count,
+            with_paths=with_paths,
+            with_stats=with_stats,
+            with_body=with_body,
+            max_body_tokens=max_body_tokens,
+        )
+        return
+
+    cmd = _build_log_command(
+        repo_path,
+        last_commit_hash,
+        since_date,
+        until_date,
+        max_count,
+        with_paths,
+        with_stats,
+        with_body,
+    )
+    body_tokens = max_body_tokens if with_body else None
+
+    # stderr goes to a file: a pipe that is only read after stdout could
+    # fill up with warnings and leave git blocked while we wait for stdout
+    stderr_file = tempfile.TemporaryFile()
+    try:
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
+        )
+    except BaseException:
+        stderr_file.close()
+        raise
+    try:
+        records = _iter_records(process.stdout)
+        if with_paths or with_stats:
+            yield from _parse_commits_with_files(
+                records, with_paths, with_stats, body_tokens
+            )
+        else:
+            for record in records:
+                commit = _parse_commit_record(record, max_body_tokens=body_tokens)
+                if commit:
+                    yield commit
+
+        returncode = process.wait()
+        if returncode:
+            stderr_file.seek(0)
+            raise subprocess.CalledProcessError(
+                returncode,
+                cmd,
+                stderr=stderr_file.read().decode("utf-8", errors="replace"),
+            )
+    finally:
+        # Consumer stopped early (or parsing failed): don't leave git running
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        stderr_file.close()
 
 
 def fetch_commits(
@@ -92,7 +718,13 @@ def fetch_commits(
     repo_path: str | Path = ".",
     since_date: Optional[str] = None,
     until_date: Optional[str] = None,
-) -> list[dict[str, str]]:
+    max_count: Optional[int] = None,
+    with_paths: bool = False,
+    with_stats: bool = False,
+    with_body: bool = False,
+    max_body_tokens: int = DEFAULT_MAX_BODY_TOKENS,
+    backend: Any = None,
+) -> list[Commit]:
     """
     Fetch commits from git log.
 
@@ -104,66 +736,46 @@ def fetch_commits(
             date range takes precedence over commit hash range.
         until_date: End date for commits (format: YYYY-MM-DD). If provided,
             date range takes precedence over commit hash range.
+        max_count: Maximum number of (newest) commits to fetch. If None,
+            all commits in the range are fetched.
+        with_paths: Also collect the files each commit touches, in the same
+            git log invocation.
+        with_stats: Also collect the size of each change, in the same git
+            log invocation.
+        with_body: Also collect each commit's body, cleaned of trailers and
+            truncated to max_body_tokens, in the same git log invocation.
+        max_body_tokens: Truncate each body to about this many tokens.
+        backend: Repository backend to read from (see backends.get_backend);
+            None runs git log on repo_path.
 
     Returns:
-        List of commit dictionaries with keys:
+        List of Commit records with fields (also readable as ``commit[key]``):
         - hash: full commit hash
         - short_hash: abbreviated commit hash
         - author: author name
         - date: author date (ISO 8601-like format: YYYY-MM-DD HH:MM:SS)
         - subject: commit subject/message
+        - paths: tuple of touched file paths (only when with_paths is set)
+        - stats: DiffStat of the change (only when with_stats is set)
+        - body: cleaned commit body, possibly empty (only when with_body is
+          set)
 
     Raises:
         subprocess.CalledProcessError: If git command fails
         FileNotFoundError: If git is not found
+        backends.BackendError: If the backend cannot read the repository
     """
-    repo = Path(repo_path)
-
-    # Build git log command
-    cmd = ["git", "-C", str(repo), "log"]
-
-    # Determine commit range - date range takes precedence
-    if since_date or until_date:
-        # Use date-based filtering
-        if since_date:
-            cmd.append(f"--since={since_date}")
-        if until_date:
-            cmd.append(f"--until={until_date}")
-    elif last_commit_hash:
-        # Use commit hash range (original behavior)
-        cmd.append(f"{last_commit_hash}..HEAD")
-
-    # Format: hash ||| short_hash ||| author ||| date ||| subject
-    cmd.extend(["--pretty=format:%H|||%h|||%an|||%ai|||%s"])
-
-    # Execute git log
-    result = subprocess.run(
-        cmd,
-        capture_output=True,
-        text=True,
-        check=True,
+    return list(
+        iter_commits(
+            last_commit_hash=last_commit_hash,
+            repo_path=repo_path,
+            since_date=since_date,
+            until_date=until_date,
+            max_count=max_count,
+            with_paths=with_paths,
+            with_stats=with_stats,
+            with_body=with_body,
+            max_body_tokens=max_body_tokens,
+            backend=backend,
+        )
     )
-
-    # Parse output
-    commits = []
-    for line in result.stdout.strip().split("\n"):
-        if not line:
-            continue
-
-        parts = line.split("|||", 4)
-        if len(parts) == 5:
-            # Trim date to just YYYY-MM-DD HH:MM (remove seconds and timezone)
-            date_str = parts[3].strip()
-            if len(date_str) >= 16:
-                date_str = date_str[:16]  # "2025-10-27 14:32"
-
-            commit = {
-                "hash": parts[0].strip(),
-                "short_hash": parts[1].strip(),
-                "author": parts[2].strip(),
-                "date": date_str,
-                "subject": parts[4].strip(),
-            }
-            commits.append(commit)
-
-    return commits
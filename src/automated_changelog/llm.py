@@ -1,19 +1,80 @@
 """LLM client configuration for changelog generation."""
 
+import asyncio
+import functools
+import math
 import os
-import ssl
+import random
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any, Optional
 
-from dotenv import load_dotenv
-from litellm import completion
+# litellm, httpx and dotenv are imported on first use: litellm alone takes
+# seconds to import, which commands that never call an LLM (init, --help,
+# --skip-llm) should not pay for
+if TYPE_CHECKING:
+    import httpx
 
-# Load environment variables (.env file overrides shell environment)
-load_dotenv(override=True)
 
-# Disable SSL verification for internal proxies if needed
-# This is set via environment variable: SSL_VERIFY=false
-# TODO: Don't allow for this and use internal PEM cert
-if os.getenv("SSL_VERIFY", "true").lower() == "false":
-    ssl._create_default_https_context = ssl._create_unverified_context
+# Default maximum tokens in an LLM response
+DEFAULT_MAX_TOKENS = 7096
+
+# Default number of LLM requests in flight at once
+DEFAULT_MAX_CONCURRENCY = 4
+
+# Default seconds before an LLM request attempt is abandoned
+DEFAULT_TIMEOUT = 120.0
+
+# Default number of retries after a failed attempt
+DEFAULT_MAX_RETRIES = 3
+
+# HTTP statuses worth retrying besides 5xx: request timeout, rate limited
+RETRYABLE_STATUSES = (408, 429)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the number of LLM tokens in a piece of text.
+
+    Uses the common ~4 characters per token heuristic, which is close enough
+    for budgeting prompts without loading a tokenizer.
+    """
+    return len(text) // 4 + 1
+
+
+@functools.cache
+def load_environment() -> None:
+    """
+    Load LLM settings from the environment, once per process.
+
+    Reads the .env file (which overrides the shell environment) and applies
+    SSL_VERIFY=false if set.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv(override=True)
+
+    # Disable SSL verification for internal proxies if needed
+    # This is set via environment variable: SSL_VERIFY=false
+    # TODO: Don't allow for this and use internal PEM cert
+    if os.getenv("SSL_VERIFY", "true").lower() == "false":
+        import ssl
+
+        ssl._create_default_https_context = ssl._create_unverified_context
+
+
+def completion(**kwargs: Any) -> Any:
+    """Call litellm.completion, importing litellm on first use."""
+    from litellm import completion as litellm_completion
+
+    return litellm_completion(**kwargs)
+
+
+async def acompletion(**kwargs: Any) -> Any:
+    """Call litellm.acompletion, importing litellm on first use."""
+    from litellm import acompletion as litellm_acompletion
+
+    return await litellm_acompletion(**kwargs)
 
 
 def get_llm_client():
@@ -27,6 +88,8 @@ def get_llm_client():
     Returns:
         Configured client settings dict
     """
+    load_environment()
+
     proxy_base = os.getenv("LITELLM_PROXY_API_BASE")
     # Try multiple key names for proxy
     proxy_key = os.getenv("LITELLM_PROXY_API_KEY") or os.getenv("LITELLM_API_KEY")
@@ -45,23 +108,156 @@ def get_llm_client():
         )
 
 
+def is_retryable(error: BaseException) -> bool:
+    """
+    Whether a failed LLM request is worth retrying.
+
+    Timeouts, connection errors, rate limiting (429) and server errors (5xx)
+    are transient; anything else (bad request, authentication) is not.
+    """
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and (status in RETRYABLE_STATUSES or status >= 500)
+
+
+class RetryPolicy:
+    """
+    Timeout, retry and hedging settings for LLM requests.
+
+    Each attempt is abandoned after ``timeout`` seconds. Transient failures
+    (see is_retryable) are retried up to ``max_retries`` times with
+    exponential backoff and full jitter: before retry n the client sleeps a
+    random time between 0 and ``min(backoff_max, backoff_base * 2**n)``.
+
+    With ``hedge_percentile`` set, a request still unanswered after that
+    percentile of the run's successful request latencies gets a second,
+    identical request; whichever answers first wins and the other is
+    cancelled. Hedging starts once ``hedge_min_samples`` latencies are known.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_samples: int = 10,
+        rng: Callable[[], float] = random.random,
+    ):
+        """
+        Args:
+            timeout: Seconds per attempt (None: wait indefinitely)
+            max_retries: Retries after the first attempt
+            backoff_base: Backoff ceiling before the first retry, in seconds
+            backoff_max: Upper bound of the backoff ceiling, in seconds
+            hedge_percentile: Latency percentile (0-100) after which a hedged
+                request is sent (None: no hedging)
+            hedge_min_samples: Latencies needed before hedging starts
+            rng: Source of uniform random numbers in [0, 1)
+        """
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self._rng = rng
+
+    @classmethod
+    def from_config(cls, llm_config: Optional[dict[str, Any]]) -> "RetryPolicy":
+        """Create a policy from the ``llm:`` config section."""
+        llm_config = llm_config or {}
+        return cls(
+            timeout=llm_config.get("timeout", DEFAULT_TIMEOUT),
+            max_retries=llm_config.get("max_retries", DEFAULT_MAX_RETRIES),
+            backoff_base=llm_config.get("backoff_base", 1.0),
+            backoff_max=llm_config.get("backoff_max", 30.0),
+            hedge_percentile=llm_config.get("hedge_percentile"),
+            hedge_min_samples=llm_config.get("hedge_min_samples", 10),
+        )
+
+    def backoff(self, retry: int) -> float:
+        """Seconds to sleep before retry number ``retry`` (counting from 0)."""
+        ceiling = min(self.backoff_max, self.backoff_base * 2**retry)
+        return self._rng() * ceiling
+
+
+class LatencyTracker:
+    """
+    Latency and outcome of every LLM request attempt in a run.
+
+    Outcomes are "ok", "error", "timeout" and "cancelled" (the losing
+    request of a hedged pair). Token counts cover successful attempts only;
+    prompt tokens are estimated.
+    """
+
+    def __init__(self):
+        self.attempts: list[tuple[float, str]] = []
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def record(self, seconds: float, outcome: str) -> None:
+        self.attempts.append((seconds, outcome))
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Latency percentile of successful attempts (nearest rank), if any."""
+        latencies = sorted(
+            seconds for seconds, outcome in self.attempts if outcome == "ok"
+        )
+        if not latencies:
+            return None
+        rank = math.ceil(percent / 100 * len(latencies))
+        return latencies[min(max(rank, 1), len(latencies)) - 1]
+
+    def summary(self) -> str:
+        """One-line report of attempts, latency percentiles, retries and hedges."""
+        ok = [seconds for seconds, outcome in self.attempts if outcome == "ok"]
+        failed = len(self.attempts) - len(ok)
+        text = f"{len(self.attempts)} attempts ({failed} failed)"
+        if ok:
+            text += (
+                f", p50 {self.percentile(50):.1f}s, p95 {self.percentile(95):.1f}s, "
+                f"max {max(ok):.1f}s"
+            )
+        if self.retries:
+            text += f", {self.retries} retries"
+        if self.hedges:
+            text += f", {self.hedges} hedged ({self.hedge_wins} won by the hedge)"
+        return text
+
+
 def call_llm(
     prompt: str,
     model: str = "claude-sonnet-4-5",
-    max_tokens: int = 7096,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    retry_policy: Optional[RetryPolicy] = None,
+    on_token: Optional[Callable[[str], None]] = None,
 ) -> str:
     """
     Call LLM with the given prompt via LiteLLM proxy.
 
+    Transient failures are retried with backoff according to retry_policy;
+    hedged requests need concurrency and are only sent by AsyncLLMClient.
+
     Args:
         prompt: The prompt to send to the LLM
         model: Model identifier
         max_tokens: Maximum tokens in response
+        retry_policy: Timeout and retry settings (default: RetryPolicy())
+        on_token: Optional callback; if given the response is streamed and
+            each piece of text is passed to it as it arrives. The returned
+            text is the same as without streaming.
 
     Returns:
         LLM response text
     """
     client_config = get_llm_client()
+    policy = retry_policy or RetryPolicy()
 
     # Build completion kwargs
     kwargs = {
@@ -71,6 +267,397 @@ def call_llm(
         "api_base": client_config["api_base"],
         "api_key": client_config["api_key"],
     }
+    if policy.timeout is not None:
+        kwargs["timeout"] = policy.timeout
+    streamed = False
+
+    def emit(text: str) -> None:
+        nonlocal streamed
+        streamed = True
+        on_token(text)
+
+    if on_token is not None:
+        kwargs["stream"] = True
 
-    response = completion(**kwargs)
-    return response.choices[0].message.content or ""
+    retry = 0
+    while True:
+        try:
+            response = completion(**kwargs)
+            if on_token is None:
+                return response.choices[0].message.content or ""
+            return "".join(_stream_text(response, emit))
+        except Exception as e:
+            # Text already shown to the user cannot be taken back
+            if retry == policy.max_retries or not is_retryable(e) or streamed:
+                raise
+            time.sleep(policy.backoff(retry))
+            retry += 1
+
+
+def _chunk_text(chunk: Any) -> str:
+    """Text carried by one streamed response chunk."""
+    choices = getattr(chunk, "choices", None)
+    if not choices:
+        return ""
+    return getattr(choices[0].delta, "content", None) or ""
+
+
+def _stream_text(response: Any, on_token: Callable[[str], None]) -> list[str]:
+    """Collect a streamed response, passing each piece of text to on_token."""
+    parts = []
+    for chunk in response:
+        text = _chunk_text(chunk)
+        if text:
+            on_token(text)
+            parts.append(text)
+    return parts
+
+
+class RateLimiter:
+    """
+    Token-bucket limits on requests per minute and tokens per minute.
+
+    Capacity is reserved up front and the caller is told how long to wait,
+    so reservations from concurrent tasks queue up fairly without a lock.
+    Buckets may go into debt (e.g. after charging actual completion tokens),
+    which simply delays later requests.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            requests_per_minute: Maximum requests per minute (None: unlimited)
+            tokens_per_minute: Maximum tokens per minute (None: unlimited)
+            clock: Monotonic time source in seconds
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._clock = clock
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(
+                self.requests_per_minute,
+                self._requests + elapsed * self.requests_per_minute / 60,
+            )
+        if self.tokens_per_minute:
+            self._tokens = min(
+                self.tokens_per_minute,
+                self._tokens + elapsed * self.tokens_per_minute / 60,
+            )
+
+    def reserve(self, tokens: int) -> float:
+        """
+        Reserve capacity for one request.
+
+        Args:
+            tokens: Estimated tokens the request will use
+
+        Returns:
+            Seconds to wait before sending the request
+        """
+        self._refill()
+        delay = 0.0
+        if self.requests_per_minute:
+            self._requests -= 1
+            if self._requests < 0:
+                delay = -self._requests * 60 / self.requests_per_minute
+        if self.tokens_per_minute:
+            self._tokens -= tokens
+            if self._tokens < 0:
+                delay = max(delay, -self._tokens * 60 / self.tokens_per_minute)
+        return delay
+
+    def charge(self, tokens: int) -> None:
+        """Charge tokens used beyond the reservation (e.g. the completion)."""
+        if self.tokens_per_minute:
+            self._refill()
+            self._tokens -= tokens
+
+
+class AsyncLLMClient:
+    """
+    Asynchronous LLM client for running many requests concurrently.
+
+    Requests go through litellm's async completion API, at most
+    ``max_concurrency`` at a time and within the optional request/token
+    rate limits. Failed and slow requests are retried or hedged according
+    to a RetryPolicy, and every attempt's latency is recorded in
+    ``latency``. Credentials are resolved once per client, and a single HTTP
+    session is shared by all requests while the client is open. Use it as
+    an async context manager, or call aclose() when done.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        """
+        Args:
+            max_concurrency: Maximum number of requests in flight at once (a
+                hedged request shares the slot of the request it hedges)
+            requests_per_minute: Optional request rate limit
+            tokens_per_minute: Optional token rate limit (prompt + completion)
+            retry_policy: Timeout, retry and hedging settings (default:
+                RetryPolicy())
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.latency = LatencyTracker()
+        self._client_config: Optional[dict[str, str]] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._session: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def from_config(cls, llm_config: Optional[dict[str, Any]]) -> "AsyncLLMClient":
+        """Create a client from the ``llm:`` config section."""
+        llm_config = llm_config or {}
+        return cls(
+            max_concurrency=llm_config.get("max_concurrency", DEFAULT_MAX_CONCURRENCY),
+            requests_per_minute=llm_config.get("requests_per_minute"),
+            tokens_per_minute=llm_config.get("tokens_per_minute"),
+            retry_policy=RetryPolicy.from_config(llm_config),
+        )
+
+    async def __aenter__(self) -> "AsyncLLMClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    def _bind_loop(self) -> None:
+        """Create loop-bound primitives for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        import httpx
+        import litellm
+
+        self._loop = loop
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        # Share one connection pool across requests unless the caller
+        # already configured a session for litellm
+        if litellm.aclient_session is None or litellm.aclient_session is self._session:
+            self._session = httpx.AsyncClient()
+            litellm.aclient_session = self._session
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP session."""
+        session, self._session = self._session, None
+        self._loop = None
+        if session is None:
+            return
+        import litellm
+
+        if litellm.aclient_session is session:
+            litellm.aclient_session = None
+        await session.aclose()
+
+    async def complete(
+        self,
+        prompt: str,
+        model: str = "claude-sonnet-4-5",
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """
+        Call the LLM with the given prompt.
+
+        Attempts are timed out, retried and hedged according to the
+        client's retry_policy, and recorded in ``latency``. Streamed requests
+        are never hedged, and are not retried once text has been passed to
+        on_token.
+
+        Args:
+            prompt: The prompt to send to the LLM
+            model: Model identifier
+            max_tokens: Maximum tokens in response
+            on_token: Optional callback; if given the response is streamed
+                and each piece of text is passed to it as it arrives. The
+                returned text is the same as without streaming.
+
+        Returns:
+            LLM response text
+
+        Raises:
+            Exception: The last error once retries are exhausted, or the
+                first error that is not transient
+        """
+        if self._client_config is None:
+            self._client_config = get_llm_client()
+        self._bind_loop()
+
+        request = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "api_base": self._client_config["api_base"],
+            "api_key": self._client_config["api_key"],
+        }
+        prompt_tokens = estimate_tokens(prompt)
+        policy = self.retry_policy
+        streamed = False
+
+        def emit(text: str) -> None:
+            nonlocal streamed
+            streamed = True
+            on_token(text)
+
+        if on_token is not None:
+            request["stream"] = True
+
+        retry = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    if on_token is None:
+                        return await self._send(request, prompt_tokens)
+                    return await self._attempt(request, prompt_tokens, emit)
+            except Exception as e:
+                # Text already shown to the user cannot be taken back
+                if retry == policy.max_retries or not is_retryable(e) or streamed:
+                    raise
+                self.latency.retries += 1
+                # Back off without holding a concurrency slot
+                await asyncio.sleep(policy.backoff(retry))
+                retry += 1
+
+    async def _send(self, request: dict[str, Any], prompt_tokens: int) -> str:
+        """Send a request, hedging it if it is slower than usual."""
+        primary = asyncio.ensure_future(self._attempt(request, prompt_tokens))
+        hedge_delay = self._hedge_delay()
+        if hedge_delay is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+        if done:
+            return primary.result()
+
+        self.latency.hedges += 1
+        hedge = asyncio.ensure_future(self._attempt(request, prompt_tokens))
+        pending = {primary, hedge}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.latency.hedge_wins += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None if hedging is off."""
+        policy = self.retry_policy
+        if policy.hedge_percentile is None:
+            return None
+        successes = sum(1 for _, outcome in self.latency.attempts if outcome == "ok")
+        if successes < policy.hedge_min_samples:
+            return None
+        return self.latency.percentile(policy.hedge_percentile)
+
+    async def _attempt(
+        self,
+        request: dict[str, Any],
+        prompt_tokens: int,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """One request attempt within the rate limits, timed and recorded."""
+        delay = self.rate_limiter.reserve(prompt_tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        start = time.monotonic()
+        try:
+            text, completion_tokens = await asyncio.wait_for(
+                self._request(request, on_token), timeout=self.retry_policy.timeout
+            )
+        except asyncio.CancelledError:
+            self.latency.record(time.monotonic() - start, "cancelled")
+            raise
+        except asyncio.TimeoutError:
+            self.latency.record(time.monotonic() - start, "timeout")
+            raise
+        except Exception:
+            self.latency.record(time.monotonic() - start, "error")
+            raise
+        self.latency.record(time.monotonic() - start, "ok")
+        self.latency.prompt_tokens += prompt_tokens
+        self.latency.completion_tokens += completion_tokens
+        self.rate_limiter.charge(completion_tokens)
+        return text
+
+    async def _request(
+        self, request: dict[str, Any], on_token: Optional[Callable[[str], None]]
+    ) -> tuple[str, int]:
+        """Send one request; returns the text and its completion tokens."""
+        response = await acompletion(**request)
+        if on_token is None:
+            usage = getattr(response, "usage", None)
+            completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+            return response.choices[0].message.content or "", completion_tokens
+
+        parts = []
+        async for chunk in response:
+            text = _chunk_text(chunk)
+            if text:
+                on_token(text)
+                parts.append(text)
+        text = "".join(parts)
+        # Streamed chunks carry no usage; charge the estimate instead
+        return text, estimate_tokens(text)
+
+
+async def acall_llm(
+    prompt: str,
+    model: str = "claude-sonnet-4-5",
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    client: Optional[AsyncLLMClient] = None,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> str:
+    """
+    Asynchronously call LLM with the given prompt via LiteLLM proxy.
+
+    Args:
+        prompt: The prompt to send to the LLM
+        model: Model identifier
+        max_tokens: Maximum tokens in response
+        client: Shared client carrying concurrency and rate limits. A
+            single-use client is created if omitted.
+        on_token: Optional callback receiving the response as it streams in
+
+    Returns:
+        LLM response text
+    """
+    if client is not None:
+        return await client.complete(
+            prompt, model=model, max_tokens=max_tokens, on_token=on_token
+        )
+
+    async with AsyncLLMClient(max_concurrency=1) as own_client:
+        return await own_client.complete(
+            prompt, model=model, max_tokens=max_tokens, on_token=on_token
+        )
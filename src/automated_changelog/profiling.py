@@ -0,0 +1,113 @@
+"""Stage timing and profiling for the generate pipeline."""
+
+import json
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Optional
+
+
+class StageTimer:
+    """
+    Wall-clock time per pipeline stage, plus counters such as LLM tokens.
+
+    Stages are timed with ``with timer.stage(name):``; entering the same
+    stage again adds to its time. Stages keep the order in which they first
+    ran, and timing is cheap enough to be always on.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        """
+        Args:
+            clock: Monotonic time source in seconds
+        """
+        self.stages: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+        self._clock = clock
+        self._started = clock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as (part of) stage ``name``."""
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.add(name, self._clock() - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        """Add ``seconds`` measured outside a ``stage()`` block to stage ``name``."""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def count(self, name: str, value: int) -> None:
+        """Add ``value`` to counter ``name``."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def total(self) -> float:
+        """Seconds since the timer was created."""
+        return self._clock() - self._started
+
+    def report(self) -> str:
+        """Plain-text breakdown of stage times and counters."""
+        total = self.total()
+        width = max((len(name) for name in self.stages), default=5)
+        lines = ["Profile:"]
+        for name, seconds in self.stages.items():
+            share = seconds / total * 100 if total else 0.0
+            lines.append(f"  {name:<{width}}  {seconds:8.3f}s  {share:5.1f}%")
+        other = max(total - sum(self.stages.values()), 0.0)
+        lines.append(f"  {'other':<{width}}  {other:8.3f}s")
+        lines.append(f"  {'total':<{width}}  {total:8.3f}s")
+        for name, value in self.counters.items():
+            lines.append(f"  {name}: {value:,}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-serializable form of the profile."""
+        return {
+            "total_seconds": round(self.total(), 6),
+            "stages": {name: round(sec, 6) for name, sec in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+
+@contextmanager
+def profile_run(
+    timer: StageTimer,
+    echo: Optional[Callable[[str], None]] = None,
+    json_path: Optional[str | Path] = None,
+    cprofile_path: Optional[str | Path] = None,
+) -> Iterator[StageTimer]:
+    """
+    Collect a profile of the enclosed run and report it when the run ends.
+
+    The report is produced even if the run fails, so slow failures can be
+    diagnosed too.
+
+    Args:
+        timer: Timer the run records its stages in
+        echo: Callback printing the text breakdown (None: no breakdown)
+        json_path: File to write the profile to as JSON
+        cprofile_path: File to dump cProfile statistics to (readable with
+            pstats or snakeviz)
+
+    Yields:
+        The timer
+    """
+    profiler = None
+    if cprofile_path:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield timer
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(str(cprofile_path))
+        if echo is not None:
+            echo(timer.report())
+        if json_path:
+            Path(json_path).write_text(json.dumps(timer.to_dict(), indent=2) + "\n")
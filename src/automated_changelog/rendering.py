@@ -0,0 +1,207 @@
+"""Markdown rendering of changelog entries."""
+
+import io
+import re
+from collections.abc import Callable, Iterable, Mapping
+from operator import attrgetter, itemgetter
+from typing import Any, Optional, TextIO
+
+from automated_changelog.config import ConfigError
+from automated_changelog.git_state import Commit
+
+DEFAULT_HEADER_TEMPLATE = "## [{{ title }}]"
+DEFAULT_COMMIT_TEMPLATE = (
+    "- `{{ short_hash }}` {{ subject }} ({{ author }}, {{ date }})"
+)
+
+# Placeholders available in each template
+HEADER_FIELDS = ("title",)
+COMMIT_FIELDS = ("hash", "short_hash", "author", "date", "subject")
+
+_PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+def compile_template(
+    template: str, fields: Iterable[str]
+) -> Callable[[Mapping[str, Any]], str]:
+    """
+    Compile a ``{{ field }}`` template into a fast formatting function.
+
+    The template is parsed and validated once into a %-format string and
+    getters for its fields: Commit records are read by attribute (skipping
+    the Mapping interface), other mappings by key.
+
+    Args:
+        template: Template text with ``{{ field }}`` placeholders
+        fields: Placeholder names the template may use
+
+    Returns:
+        Function rendering the template for a mapping of field values
+
+    Raises:
+        ConfigError: If the template uses an unknown placeholder or
+            unsupported syntax (filters, blocks)
+    """
+    fields = set(fields)
+    parts = []
+    names = []
+    position = 0
+    for match in _PLACEHOLDER.finditer(template):
+        name = match.group(1)
+        if name not in fields:
+            raise ConfigError(
+                f"Unknown placeholder '{{{{ {name} }}}}' in template "
+                f"'{template}'. Available: {', '.join(sorted(fields))}"
+            )
+        parts += [_literal(template[position : match.start()], template), "%s"]
+        names.append(name)
+        position = match.end()
+    parts.append(_literal(template[position:], template))
+    text = "".join(parts)
+    get_attrs = _tuple_getter(attrgetter, names)
+    get_items = _tuple_getter(itemgetter, names)
+
+    def render(commit: Mapping[str, Any]) -> str:
+        if commit.__class__ is Commit:
+            return text % get_attrs(commit)
+        return text % get_items(commit)
+
+    return render
+
+
+def _literal(text: str, template: str) -> str:
+    """Escape template text for %-formatting, rejecting unsupported syntax."""
+    if "{{" in text or "{%" in text:
+        raise ConfigError(
+            f"Unsupported template syntax in '{template}': only "
+            "{{ field }} placeholders are supported"
+        )
+    return text.replace("%", "%%")
+
+
+def _tuple_getter(getter: Callable, names: list[str]) -> Callable[[Any], tuple]:
+    """Build a getter returning a tuple of the named fields, whatever their count."""
+    if len(names) > 1:
+        return getter(*names)
+    if names:
+        get_one = getter(names[0])
+        return lambda obj: (get_one(obj),)
+    return lambda obj: ()
+
+
+class EntryRenderer:
+    """
+    Renders changelog entries as markdown.
+
+    Entries are written piece by piece to a text stream (a file, or a
+    StringIO for render()), so rendering takes time linear in the number
+    of commits and, when writing to a file, memory independent of it.
+    The header and commit line templates are compiled once per renderer.
+    """
+
+    def __init__(
+        self,
+        header_template: str = DEFAULT_HEADER_TEMPLATE,
+        commit_template: str = DEFAULT_COMMIT_TEMPLATE,
+    ):
+        """
+        Args:
+            header_template: Entry heading with a ``{{ title }}`` placeholder
+            commit_template: One commit line, with placeholders for the
+                COMMIT_FIELDS
+
+        Raises:
+            ConfigError: If a template is invalid
+        """
+        self._header = compile_template(header_template + "\n", HEADER_FIELDS)
+        self._commit_line = compile_template(commit_template + "\n", COMMIT_FIELDS)
+
+    @classmethod
+    def from_config(cls, render_config: Optional[dict[str, Any]]) -> "EntryRenderer":
+        """Create a renderer from the ``render:`` config section."""
+        render_config = render_config or {}
+        return cls(
+            header_template=render_config.get(
+                "header_template", DEFAULT_HEADER_TEMPLATE
+            ),
+            commit_template=render_config.get(
+                "commit_template", DEFAULT_COMMIT_TEMPLATE
+            ),
+        )
+
+    def commit_line(self, commit: Mapping[str, Any]) -> str:
+        """Render one commit's line of the commit list (newline included)."""
+        return self._commit_line(commit)
+
+    def write(
+        self,
+        out: TextIO,
+        title: str,
+        commits: Iterable[Mapping[str, Any]],
+        commit_count: Optional[int] = None,
+        commit_lines: Optional[str] = None,
+        latest_hash: Optional[str] = None,
+        changelog_summary: Optional[str] = None,
+        module_summaries: Optional[dict[str, str]] = None,
+        collapse_commits: bool = False,
+    ) -> None:
+        """
+        Write one changelog section to a text stream.
+
+        Args:
+            out: Stream to write to
+            title: Text for the section header
+            commits: All commits in the section (not just filtered ones); may
+                be an iterator if commit_count is given
+            commit_count: Number of commits, if commits has no len()
+            commit_lines: The commit list already rendered with
+                commit_line(), written instead of rendering commits (for
+                callers that render while streaming commits)
+            latest_hash: Commit hash recorded as state marker, if any
+            changelog_summary: LLM summary of the section
+            module_summaries: Per-module LLM summaries (monorepo mode)
+            collapse_commits: Fold the commit list into a <details> block
+        """
+        out.write(self._header({"title": title}))
+        if latest_hash:
+            out.write(f"<!-- LATEST_COMMIT: {latest_hash} -->\n\n")
+        else:
+            out.write("\n")
+
+        # Add LLM summary if available
+        if changelog_summary:
+            out.write(f"### Summary\n\n{changelog_summary}\n\n")
+
+        # Add per-module summaries (monorepo mode)
+        if module_summaries:
+            out.write("### Module Summaries\n\n")
+            for module, module_summary in module_summaries.items():
+                out.write(f"#### {module}\n\n{module_summary}\n\n")
+
+        # Add commits section
+        if commit_count is None:
+            commit_count = len(commits)
+        out.write(f"### Changes ({commit_count} commits)\n\n")
+        if collapse_commits:
+            out.write("<details>\n<summary>All commits</summary>\n\n")
+        if commit_lines is not None:
+            out.write(commit_lines)
+        else:
+            out.writelines(map(self._commit_line, commits))
+        if collapse_commits:
+            out.write("\n</details>\n\n")
+        else:
+            out.write("\n")
+
+    def render(self, title: str, commits: Iterable[Mapping[str, Any]], **kwargs) -> str:
+        """
+        Render one changelog section to a string.
+
+        Takes the same arguments as write().
+
+        Returns:
+            Markdown for the section
+        """
+        out = io.StringIO()
+        self.write(out, title, commits, **kwargs)
+        return out.getvalue()
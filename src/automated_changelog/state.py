@@ -0,0 +1,212 @@
+"""Optional sidecar index of changelog state and entries."""
+
+import json
+import os
+import tempfile
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any, Optional
+
+# Bump when the index layout changes; older indexes are then ignored
+STATE_INDEX_VERSION = 1
+
+
+class StateIndex:
+    """
+    Compact JSON record of the changelog's state, kept next to the changelog.
+
+    The index stores the last processed commit hash plus one record per
+    entry (its position, commit range and date range), so incremental runs
+    can resume without opening the changelog and tools can seek straight
+    to an entry.
+
+    Entry positions are stored as distances from the end of the changelog:
+    new entries are always prepended, so the bytes after an existing entry
+    never change and its ``end_offset`` stays valid across writes. The
+    index remembers the changelog's size and mtime; if the changelog was
+    changed by anything else, the index is treated as stale: its commit
+    hash is dropped (the in-file state marker remains the source of truth)
+    and its entries are rechecked against the changelog. Entries whose
+    heading is no longer where the index expects it are kept, marked
+    ``"unverified": True``, so later writes don't discard them.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        last_commit_hash: Optional[str] = None,
+        entries: Optional[list[dict[str, Any]]] = None,
+        changelog_size: Optional[int] = None,
+        changelog_mtime_ns: Optional[int] = None,
+    ):
+        """
+        Args:
+            path: Location of the JSON index file
+            last_commit_hash: Hash of the latest processed commit
+            entries: Entry records, newest first
+            changelog_size: Changelog size in bytes when the index was saved
+            changelog_mtime_ns: Changelog mtime when the index was saved
+        """
+        self.path = Path(path)
+        self.last_commit_hash = last_commit_hash
+        self.entries = entries or []
+        self.changelog_size = changelog_size
+        self.changelog_mtime_ns = changelog_mtime_ns
+
+    @classmethod
+    def load(cls, path: str | Path, changelog_path: str | Path) -> "StateIndex":
+        """
+        Load the index for a changelog.
+
+        A missing, unreadable or outdated index loads as an empty index. A
+        stale index (one that no longer matches the changelog on disk)
+        loads without its commit hash, and with its entries rechecked.
+
+        Args:
+            path: Location of the JSON index file
+            changelog_path: Changelog the index describes
+
+        Returns:
+            The loaded index
+        """
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+            stat = os.stat(changelog_path)
+        except (OSError, ValueError):
+            return cls(path)
+
+        if not isinstance(data, dict) or data.get("version") != STATE_INDEX_VERSION:
+            return cls(path)
+
+        if (
+            data.get("changelog_size") != stat.st_size
+            or data.get("changelog_mtime_ns") != stat.st_mtime_ns
+        ):
+            return cls(
+                path,
+                entries=_recheck_entries(
+                    changelog_path, stat.st_size, data.get("entries", [])
+                ),
+                changelog_size=stat.st_size,
+                changelog_mtime_ns=stat.st_mtime_ns,
+            )
+
+        return cls(
+            path,
+            last_commit_hash=data.get("last_commit_hash"),
+            entries=data.get("entries", []),
+            changelog_size=stat.st_size,
+            changelog_mtime_ns=stat.st_mtime_ns,
+        )
+
+    def record_write(
+        self,
+        changelog_path: str | Path,
+        offset: int,
+        sections: Sequence[tuple[str, str, Sequence[Mapping[str, Any]]]],
+        latest_commit_hash: Optional[str] = None,
+    ) -> None:
+        """
+        Record entries just prepended by write_changelog_entry and save.
+
+        Args:
+            changelog_path: Changelog that was written
+            offset: Byte offset of the written text (write_changelog_entry's
+                return value)
+            sections: (title, text, commits) per entry in the written text,
+                newest first, joined by a blank line
+            latest_commit_hash: New state hash, if the write updated it
+        """
+        stat = os.stat(changelog_path)
+        records = []
+        for title, text, commits in sections:
+            length = len(text.encode("utf-8"))
+            records.append(
+                {
+                    "title": title,
+                    "end_offset": stat.st_size - offset,
+                    "length": length,
+                    "commits": len(commits),
+                    "first_commit": commits[-1]["hash"] if commits else None,
+                    "last_commit": commits[0]["hash"] if commits else None,
+                    "first_date": commits[-1]["date"] if commits else None,
+                    "last_date": commits[0]["date"] if commits else None,
+                }
+            )
+            offset += length + 2
+
+        self.entries[:0] = records
+        if latest_commit_hash:
+            self.last_commit_hash = latest_commit_hash
+        self.changelog_size = stat.st_size
+        self.changelog_mtime_ns = stat.st_mtime_ns
+        self.save()
+
+    def entry_offset(self, entry: Mapping[str, Any]) -> int:
+        """Return the byte offset of an entry in the current changelog."""
+        return self.changelog_size - entry["end_offset"]
+
+    def read_entry(self, changelog_path: str | Path, entry: Mapping[str, Any]) -> str:
+        """
+        Read one entry's text without scanning the changelog.
+
+        Args:
+            changelog_path: Changelog the index describes
+            entry: Record from ``entries``
+
+        Returns:
+            The entry's markdown
+        """
+        with open(changelog_path, "rb") as f:
+            f.seek(self.entry_offset(entry))
+            return f.read(entry["length"]).decode("utf-8")
+
+    def save(self) -> None:
+        """Write the index atomically; failures leave the old index in place."""
+        data = {
+            "version": STATE_INDEX_VERSION,
+            "last_commit_hash": self.last_commit_hash,
+            "changelog_size": self.changelog_size,
+            "changelog_mtime_ns": self.changelog_mtime_ns,
+            "entries": self.entries,
+        }
+        try:
+            fd, tmp_name = tempfile.mkstemp(
+                dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp"
+            )
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_name, self.path)
+        except OSError:
+            return
+
+
+def _recheck_entries(
+    changelog_path: str | Path, changelog_size: int, entries: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """
+    Check a stale index's entries against the edited changelog.
+
+    An entry still holds if the first line at its recorded position (which
+    edits above it don't move) mentions its title; other entries are kept
+    but marked ``"unverified": True``.
+    """
+    checked = []
+    try:
+        with open(changelog_path, "rb") as f:
+            for entry in entries:
+                entry = dict(entry)
+                offset = changelog_size - entry.get("end_offset", -1)
+                heading = b""
+                if 0 <= offset <= changelog_size:
+                    f.seek(offset)
+                    heading = f.readline(1024)
+                title = str(entry.get("title", ""))
+                if title and title in heading.decode("utf-8", errors="replace"):
+                    entry.pop("unverified", None)
+                else:
+                    entry["unverified"] = True
+                checked.append(entry)
+    except OSError:
+        return [{**entry, "unverified": True} for entry in entries]
+    return checked
@@ -0,0 +1,322 @@
+"""Local stub LLM server for offline, deterministic testing and load tests."""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+from automated_changelog.llm import estimate_tokens
+
+
+class StubLLMServer:
+    """
+    A stand-in for a LiteLLM proxy that answers without calling a model.
+
+    The server speaks the two protocols litellm uses to reach a proxy: the
+    OpenAI chat completions API (``/chat/completions``) and the Anthropic
+    messages API (``/v1/messages``, used for Claude models), both with and
+    without streaming. Point ``LITELLM_PROXY_API_BASE`` at ``url`` and
+    ``call_llm``, ``AsyncLLMClient`` and the CLI work against it unchanged.
+
+    Answers are deterministic: the same prompt always gets the same summary,
+    which names the number of commit lines in the prompt and a digest of it.
+    Latency, error rate and reported token counts are configurable, so
+    concurrency, retries, hedging and caching can be exercised offline.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        completion_tokens: Optional[int] = None,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            latency: Seconds before each response starts
+            jitter: Up to this many extra seconds, uniformly random
+            error_rate: Fraction of requests answered with error_status
+            error_status: HTTP status of simulated failures (503 and 429 are
+                retried by the client, 400 is not)
+            completion_tokens: Length of each answer in tokens (padded with
+                filler text); None answers with the bare summary
+            seed: Seed for latency jitter and simulated failures
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.completion_tokens = completion_tokens
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        """Base URL to use as LITELLM_PROXY_API_BASE."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubLLMServer":
+        """Serve requests from a background thread."""
+        # A short poll interval keeps stop() quick in test teardown
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, args=(0.05,), daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve requests until interrupted."""
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def stop(self) -> None:
+        """Stop a server started with start()."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def answer(self, prompt: str) -> str:
+        """The deterministic answer to a prompt."""
+        lines = sum(1 for line in prompt.splitlines() if line.startswith("- "))
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+        text = f"- Summarized {lines} commit lines\n- Stub answer {digest}"
+        if self.completion_tokens:
+            missing = self.completion_tokens - estimate_tokens(text)
+            if missing > 0:
+                text += "\n- " + "stub " * ((missing * 4 - 3) // 5 + 1)
+                text = text.rstrip()
+        return text
+
+    def _next_outcome(self) -> tuple[float, bool]:
+        """Count a request; returns its delay and whether it fails."""
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            failed = self._rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        return delay, failed
+
+
+def _prompt_text(messages: list[dict[str, Any]]) -> str:
+    """Plain text of the request messages in either API's format."""
+    parts = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        else:
+            parts.extend(block.get("text", "") for block in content or [])
+    return "\n".join(parts)
+
+
+def _chunks(text: str) -> list[str]:
+    """Split an answer into word-sized pieces for streaming."""
+    words = text.split(" ")
+    return [word + " " for word in words[:-1]] + [words[-1]]
+
+
+def _make_handler(server: StubLLMServer) -> type:
+    """Request handler class bound to a StubLLMServer."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            if self.path.rstrip("/") in ("/health", "/v1/models", "/models"):
+                self._send_json(200, {"status": "ok", "data": []})
+            else:
+                self._send_json(404, {"error": {"message": "Not found"}})
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                request = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self._send_json(400, {"error": {"message": "Invalid JSON"}})
+                return
+
+            path = self.path.split("?")[0].rstrip("/")
+            if path.endswith("/messages"):
+                anthropic = True
+            elif path.endswith("/chat/completions"):
+                anthropic = False
+            else:
+                self._send_json(404, {"error": {"message": "Not found"}})
+                return
+
+            delay, failed = server._next_outcome()
+            if delay:
+                time.sleep(delay)
+            if failed:
+                self._send_error(anthropic)
+                return
+
+            prompt = _prompt_text(request.get("messages", []))
+            text = server.answer(prompt)
+            usage = (estimate_tokens(prompt), estimate_tokens(text))
+            if server.completion_tokens:
+                usage = (usage[0], server.completion_tokens)
+            model = request.get("model", "stub")
+            if request.get("stream"):
+                if anthropic:
+                    self._stream_anthropic(model, text, usage)
+                else:
+                    self._stream_openai(model, text, usage)
+            elif anthropic:
+                self._send_json(200, _anthropic_message(model, text, usage))
+            else:
+                self._send_json(200, _openai_completion(model, text, usage))
+
+        def _send_json(self, status: int, body: dict[str, Any]) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_error(self, anthropic: bool) -> None:
+            message = f"Simulated failure (HTTP {server.error_status})"
+            if anthropic:
+                body = {
+                    "type": "error",
+                    "error": {"type": "api_error", "message": message},
+                }
+            else:
+                body = {"error": {"message": message, "type": "server_error"}}
+            self._send_json(server.error_status, body)
+
+        def _start_events(self) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+
+        def _event(self, data: Any, event: Optional[str] = None) -> None:
+            payload = data if isinstance(data, str) else json.dumps(data)
+            prefix = f"event: {event}\n" if event else ""
+            self.wfile.write(f"{prefix}data: {payload}\n\n".encode())
+            self.wfile.flush()
+
+        def _stream_openai(self, model: str, text: str, usage: tuple) -> None:
+            self._start_events()
+            base = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+            }
+            for piece in _chunks(text):
+                delta = {"role": "assistant", "content": piece}
+                choice = {"index": 0, "delta": delta, "finish_reason": None}
+                self._event({**base, "choices": [choice]})
+            choice = {"index": 0, "delta": {}, "finish_reason": "stop"}
+            self._event({**base, "choices": [choice], "usage": _openai_usage(usage)})
+            self._event("[DONE]")
+
+        def _stream_anthropic(self, model: str, text: str, usage: tuple) -> None:
+            self._start_events()
+            message = _anthropic_message(model, "", (usage[0], 0))
+            message["content"] = []
+            message["stop_reason"] = None
+            self._event({"type": "message_start", "message": message}, "message_start")
+            self._event(
+                {
+                    "type": "content_block_start",
+                    "index": 0,
+                    "content_block": {"type": "text", "text": ""},
+                },
+                "content_block_start",
+            )
+            for piece in _chunks(text):
+                self._event(
+                    {
+                        "type": "content_block_delta",
+                        "index": 0,
+                        "delta": {"type": "text_delta", "text": piece},
+                    },
+                    "content_block_delta",
+                )
+            self._event(
+                {"type": "content_block_stop", "index": 0}, "content_block_stop"
+            )
+            self._event(
+                {
+                    "type": "message_delta",
+                    "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                    "usage": {"output_tokens": usage[1]},
+                },
+                "message_delta",
+            )
+            self._event({"type": "message_stop"}, "message_stop")
+
+    return Handler
+
+
+def _openai_usage(usage: tuple[int, int]) -> dict[str, int]:
+    return {
+        "prompt_tokens": usage[0],
+        "completion_tokens": usage[1],
+        "total_tokens": usage[0] + usage[1],
+    }
+
+
+def _openai_completion(model: str, text: str, usage: tuple[int, int]) -> dict:
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": _openai_usage(usage),
+    }
+
+
+def _anthropic_message(model: str, text: str, usage: tuple[int, int]) -> dict:
+    return {
+        "id": "msg_stub",
+        "type": "message",
+        "role": "assistant",
+        "model": model,
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": usage[0], "output_tokens": usage[1]},
+    }
@@ -1,61 +1,199 @@
-"""Commit filtering and summarization logic."""
+"""Commit summarization logic."""
 
-from typing import Any
+import asyncio
+from collections.abc import Callable, Mapping
+from typing import Any, Optional
 
-from automated_changelog.llm import call_llm
+from automated_changelog.cache import SummaryCache, summary_cache_key
+from automated_changelog.compaction import PromptCompactor, format_commit_lines
+from automated_changelog.filtering import (  # noqa: F401 (re-exported)
+    OTHER_MODULE,
+    CommitFilter,
+    compile_filter,
+    compile_path_patterns,
+    filter_commits,
+    group_commits_by_module,
+)
+from automated_changelog.llm import (
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_TOKENS,
+    AsyncLLMClient,
+    acall_llm,
+    estimate_tokens,
+)
 
+# Default llm.chunk_token_budget: commit text per LLM call before the
+# summary is built map-reduce style
+DEFAULT_CHUNK_TOKEN_BUDGET = 60000
 
-def filter_commits(
-    commits: list[dict[str, str]],
-    filter_config: dict[str, Any],
-) -> list[dict[str, str]]:
+
+def chunk_by_tokens(items: list[str], token_budget: int) -> list[list[str]]:
     """
-    Filter commits based on configuration rules.
+    Split items into consecutive chunks that each fit in a token budget.
+
+    An item larger than the budget on its own gets a chunk to itself.
 
     Args:
-        commits: List of commit dictionaries
-        filter_config: Filter configuration from changelog_config.yaml
+        items: Text items (e.g. commit lines) in order
+        token_budget: Maximum estimated tokens per chunk
 
     Returns:
-        Filtered list of commits
+        List of chunks, preserving item order
     """
-    if not filter_config:
-        return commits
+    chunks: list[list[str]] = []
+    current: list[str] = []
+    current_tokens = 0
+
+    for item in items:
+        item_tokens = estimate_tokens(item)
+        if current and current_tokens + item_tokens > token_budget:
+            chunks.append(current)
+            current = []
+            current_tokens = 0
+        current.append(item)
+        current_tokens += item_tokens
+
+    if current:
+        chunks.append(current)
 
-    filtered = []
-    ignore_prefixes = filter_config.get("ignore_prefixes", [])
-    ignore_keywords = filter_config.get("ignore_keywords", [])
+    return chunks
 
-    for commit in commits:
-        subject = commit["subject"]
 
-        # Check ignore_prefixes
-        if any(subject.startswith(prefix) for prefix in ignore_prefixes):
-            continue
+async def _summarize_chunks(
+    chunks: list[list[str]],
+    prompt_template: str,
+    model: str,
+    max_tokens: int,
+    client: AsyncLLMClient,
+    label: str,
+    instruction: str,
+) -> list[str]:
+    """Summarize each chunk with its own LLM call, all fanned out through client."""
+
+    async def summarize(number: int, chunk: list[str]) -> str:
+        body = "\n".join(chunk)
+        prompt = f"""{prompt_template}
 
-        # Check ignore_keywords (case-insensitive)
-        subject_lower = subject.lower()
-        if any(keyword.lower() in subject_lower for keyword in ignore_keywords):
-            continue
+{label} (part {number} of {len(chunks)}):
+{body}
 
-        # Passed all filters
-        filtered.append(commit)
+{instruction}"""
+        summary = await acall_llm(
+            prompt=prompt, model=model, max_tokens=max_tokens, client=client
+        )
+        return summary.strip()
 
-    return filtered
+    return list(
+        await asyncio.gather(
+            *(summarize(number, chunk) for number, chunk in enumerate(chunks, start=1))
+        )
+    )
 
 
 def generate_summary(
-    commits: list[dict[str, str]],
+    commits: list[Mapping[str, str]],
     prompt_template: str,
     model: str = "claude-sonnet-4-5",
+    chunk_token_budget: Optional[int] = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    cache: Optional[SummaryCache] = None,
+    client: Optional[AsyncLLMClient] = None,
+    compactor: Optional[PromptCompactor] = None,
+    on_token: Optional[Callable[[str], None]] = None,
 ) -> str:
     """
     Generate LLM summary for commits.
 
+    Synchronous wrapper around agenerate_summary; see there for details.
+    Must not be called from a running event loop. A given client's HTTP
+    session is closed before returning, since its event loop ends here.
+
     Args:
-        commits: List of filtered commit dictionaries
+        commits: List of filtered commits (Commit records or dictionaries)
         prompt_template: System prompt template from config
         model: LLM model to use
+        chunk_token_budget: Maximum estimated prompt tokens of commit text per
+            LLM call. None sends every commit in one prompt.
+        max_concurrency: Maximum number of chunk summaries requested at once
+            (ignored when a client is given)
+        max_tokens: Maximum tokens in each LLM response
+        cache: Optional on-disk summary cache
+        client: Optional shared async client carrying concurrency and rate
+            limits
+        compactor: Optional prompt compactor (see agenerate_summary)
+        on_token: Optional callback receiving the final summary as it
+            streams in (see agenerate_summary)
+
+    Returns:
+        Generated summary text
+    """
+
+    async def run() -> str:
+        try:
+            return await agenerate_summary(
+                commits,
+                prompt_template,
+                model=model,
+                chunk_token_budget=chunk_token_budget,
+                max_concurrency=max_concurrency,
+                max_tokens=max_tokens,
+                cache=cache,
+                client=client,
+                compactor=compactor,
+                on_token=on_token,
+            )
+        finally:
+            if client is not None:
+                await client.aclose()
+
+    return asyncio.run(run())
+
+
+async def agenerate_summary(
+    commits: list[Mapping[str, str]],
+    prompt_template: str,
+    model: str = "claude-sonnet-4-5",
+    chunk_token_budget: Optional[int] = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    cache: Optional[SummaryCache] = None,
+    client: Optional[AsyncLLMClient] = None,
+    compactor: Optional[PromptCompactor] = None,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> str:
+    """
+    Generate LLM summary for commits.
+
+    If the commit list fits in ``chunk_token_budget`` a single prompt is
+    sent. Otherwise the summary is built map-reduce style: commits are split
+    into token-budgeted chunks that are summarized concurrently, and the
+    partial summaries are then combined (repeatedly, if they still don't fit
+    in the budget) into the final 2-4 bullet points.
+
+    With a cache, a summary for the same model, prompt, token limit and
+    commits is returned from disk without calling the LLM. Otherwise cached
+    summaries of commit ranges inside this one (such as an earlier run over
+    part of the period) are reused, and only the remaining commits are sent
+    to the LLM together with those summaries.
+
+    Args:
+        commits: List of filtered commits (Commit records or dictionaries)
+        prompt_template: System prompt template from config
+        model: LLM model to use
+        chunk_token_budget: Maximum estimated prompt tokens of commit text per
+            LLM call. None sends every commit in one prompt.
+        max_concurrency: Maximum number of chunk summaries requested at once
+            (ignored when a client is given)
+        max_tokens: Maximum tokens in each LLM response
+        cache: Optional on-disk summary cache
+        client: Shared async client; pass one to run several summaries
+            concurrently under common limits
+        compactor: Optional prompt compactor; without one every commit is
+            sent with its hash, subject, author and date
+        on_token: Optional callback receiving the final summary text as it
+            streams in. Only the last LLM call of the summary is streamed;
+            nothing is streamed for a cached summary.
 
     Returns:
         Generated summary text
@@ -63,16 +201,205 @@ def generate_summary(
     if not commits:
         return "No significant changes."
 
-    # Build commit list for the prompt
-    commit_lines = []
-    for commit in commits:
-        commit_lines.append(
-            f"- {commit['short_hash']} {commit['subject']} "
-            f"({commit['author']}, {commit['date']})"
+    options = {"chunk_token_budget": chunk_token_budget}
+    if compactor is not None:
+        options["compaction"] = compactor.options()
+
+    def key_for(commit_range: list[Mapping[str, str]]) -> str:
+        return summary_cache_key(
+            model, prompt_template, max_tokens, commit_range, **options
         )
 
+    cache_key = None
+    reused: list[str] = []
+    new_commits = commits
+    if cache is not None:
+        cache_key = key_for(commits)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+        reused, new_commits = _find_cached_ranges(commits, cache, key_for)
+
+    # Build commit list for the prompt
+    if compactor is not None:
+        commit_lines = compactor.compact(new_commits) if new_commits else []
+    else:
+        commit_lines = format_commit_lines(new_commits)
+
     commits_text = "\n".join(commit_lines)
 
+    own_client = None
+    if client is None:
+        client = own_client = AsyncLLMClient(max_concurrency=max_concurrency)
+    try:
+        if reused:
+            summary = await _extend_summaries(
+                reused,
+                commit_lines,
+                commits_text,
+                prompt_template,
+                model,
+                max_tokens,
+                chunk_token_budget,
+                client,
+                on_token,
+            )
+        else:
+            summary = await _summarize_lines(
+                commit_lines,
+                commits_text,
+                prompt_template,
+                model,
+                max_tokens,
+                chunk_token_budget,
+                client,
+                on_token,
+            )
+    finally:
+        if own_client is not None:
+            await own_client.aclose()
+
+    if cache is not None:
+        cache.set(cache_key, summary, model=model, commits=len(commits))
+        cache.add_segment(commits[0]["hash"], len(commits))
+
+    return summary
+
+
+def _find_cached_ranges(
+    commits: list[Mapping[str, str]],
+    cache: SummaryCache,
+    key_for: Callable[[list[Mapping[str, str]]], str],
+) -> tuple[list[str], list[Mapping[str, str]]]:
+    """
+    Split commits into already summarized ranges and the commits left over.
+
+    Walks the commits newest first; wherever the cache knows ranges that
+    start at the current commit (typically a previous run's
+    ``LATEST_COMMIT``), the longest one whose summary is still cached for
+    exactly these commits is taken and skipped over.
+
+    Returns:
+        (cached summaries of the reused ranges, remaining commits), both
+        newest first
+    """
+    reused = []
+    remaining = []
+    position = 0
+    while position < len(commits):
+        for length in cache.segment_lengths(commits[position]["hash"]):
+            if length >= len(commits) or position + length > len(commits):
+                continue
+            summary = cache.get(key_for(commits[position : position + length]))
+            if summary is not None:
+                reused.append(summary)
+                position += length
+                break
+        else:
+            remaining.append(commits[position])
+            position += 1
+    return reused, remaining
+
+
+async def _extend_summaries(
+    reused: list[str],
+    commit_lines: list[str],
+    commits_text: str,
+    prompt_template: str,
+    model: str,
+    max_tokens: int,
+    chunk_token_budget: Optional[int],
+    client: AsyncLLMClient,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> str:
+    """
+    Combine reused summaries with commits that have not been summarized yet.
+
+    Without new commits the cached summaries already cover the whole range:
+    a single one is returned as it is, several are merged in one reduce
+    call so the result still follows the summary prompt.
+    """
+    if not commit_lines:
+        if len(reused) == 1:
+            return reused[0].strip()
+        return await _reduce_partials(
+            reused,
+            prompt_template,
+            model,
+            max_tokens,
+            chunk_token_budget,
+            client,
+            on_token,
+        )
+
+    summaries_text = "\n\n".join(reused)
+    if chunk_token_budget and (
+        estimate_tokens(summaries_text) + estimate_tokens(commits_text)
+        > chunk_token_budget
+    ):
+        # Too much for one prompt: summarize the new commits on their own
+        new_summary = await _summarize_lines(
+            commit_lines,
+            commits_text,
+            prompt_template,
+            model,
+            max_tokens,
+            chunk_token_budget,
+            client,
+        )
+        return await _reduce_partials(
+            [new_summary, *reused],
+            prompt_template,
+            model,
+            max_tokens,
+            chunk_token_budget,
+            client,
+            on_token,
+        )
+
+    prompt = f"""{prompt_template}
+
+Earlier commits of this period were already summarized:
+
+{summaries_text}
+
+New commits:
+{commits_text}
+
+Combine both into a concise summary in 2-4 bullet points."""
+
+    summary = await acall_llm(
+        prompt=prompt,
+        model=model,
+        max_tokens=max_tokens,
+        client=client,
+        on_token=on_token,
+    )
+    return summary.strip()
+
+
+async def _summarize_lines(
+    commit_lines: list[str],
+    commits_text: str,
+    prompt_template: str,
+    model: str,
+    max_tokens: int,
+    chunk_token_budget: Optional[int],
+    client: AsyncLLMClient,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> str:
+    """Summarize commit lines in one prompt, or map-reduce if over budget."""
+    if chunk_token_budget and estimate_tokens(commits_text) > chunk_token_budget:
+        return await _map_reduce_summary(
+            commit_lines,
+            prompt_template,
+            model,
+            max_tokens,
+            chunk_token_budget,
+            client,
+            on_token,
+        )
+
     # Build the prompt
     prompt = f"""{prompt_template}
 
@@ -82,5 +409,275 @@ Commits:
 Provide a concise summary in 2-4 bullet points."""
 
     # Call LLM
-    summary = call_llm(prompt=prompt, model=model)
+    summary = await acall_llm(
+        prompt=prompt,
+        model=model,
+        max_tokens=max_tokens,
+        client=client,
+        on_token=on_token,
+    )
     return summary.strip()
+
+
+async def _map_reduce_summary(
+    commit_lines: list[str],
+    prompt_template: str,
+    model: str,
+    max_tokens: int,
+    chunk_token_budget: int,
+    client: AsyncLLMClient,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> str:
+    """Summarize commit lines in chunks, then reduce the partial summaries."""
+    # Map: summarize each chunk of commits
+    partials = await _summarize_chunks(
+        chunk_by_tokens(commit_lines, chunk_token_budget),
+        prompt_template,
+        model,
+        max_tokens,
+        client,
+        label="Commits",
+        instruction=(
+            "Summarize the significant changes in this part as concise "
+            "bullet points."
+        ),
+    )
+
+    return await _reduce_partials(
+        partials,
+        prompt_template,
+        model,
+        max_tokens,
+        chunk_token_budget,
+        client,
+        on_token,
+    )
+
+
+async def _reduce_partials(
+    partials: list[str],
+    prompt_template: str,
+    model: str,
+    max_tokens: int,
+    chunk_token_budget: Optional[int],
+    client: AsyncLLMClient,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> str:
+    """Combine partial summaries into the final summary (only that is streamed)."""
+    # Intermediate reduce: merge groups of partials until they fit in one prompt
+    while chunk_token_budget and (
+        len(partials) > 1
+        and estimate_tokens("\n\n".join(partials)) > chunk_token_budget
+    ):
+        groups = chunk_by_tokens(partials, chunk_token_budget)
+        if len(groups) == len(partials):
+            # Every partial fills a chunk on its own; merge pairwise instead
+            groups = [partials[i : i + 2] for i in range(0, len(partials), 2)]
+        partials = await _summarize_chunks(
+            [["\n\n".join(group)] for group in groups],
+            prompt_template,
+            model,
+            max_tokens,
+            client,
+            label="Partial summaries",
+            instruction=(
+                "Merge these partial summaries into one list of concise "
+                "bullet points, keeping the most significant changes."
+            ),
+        )
+
+    if len(partials) == 1:
+        partials_text = partials[0]
+    else:
+        partials_text = "\n\n".join(
+            f"Part {number}:\n{partial}"
+            for number, partial in enumerate(partials, start=1)
+        )
+
+    # Reduce: combine partial summaries into the final summary
+    prompt = f"""{prompt_template}
+
+The commits for this period were summarized in parts:
+
+{partials_text}
+
+Combine these into a concise summary in 2-4 bullet points."""
+
+    summary = await acall_llm(
+        prompt=prompt,
+        model=model,
+        max_tokens=max_tokens,
+        client=client,
+        on_token=on_token,
+    )
+    return summary.strip()
+
+
+DEFAULT_OVERALL_SUMMARY_PROMPT = (
+    "Provide a high-level summary (3-4 sentences) of the key activities "
+    "across all modules."
+)
+
+
+def generate_module_summaries(
+    module_commits: dict[str, list[Mapping[str, Any]]],
+    module_prompt: str,
+    overall_prompt: str = DEFAULT_OVERALL_SUMMARY_PROMPT,
+    model: str = "claude-sonnet-4-5",
+    chunk_token_budget: Optional[int] = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    cache: Optional[SummaryCache] = None,
+    client: Optional[AsyncLLMClient] = None,
+    compactor: Optional[PromptCompactor] = None,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> tuple[str, dict[str, str]]:
+    """
+    Generate per-module summaries and an overall rollup.
+
+    Synchronous wrapper around agenerate_module_summaries; see there for
+    details. A given client's HTTP session is closed before returning.
+    """
+
+    async def run() -> tuple[str, dict[str, str]]:
+        try:
+            return await agenerate_module_summaries(
+                module_commits,
+                module_prompt,
+                overall_prompt,
+                model=model,
+                chunk_token_budget=chunk_token_budget,
+                max_concurrency=max_concurrency,
+                max_tokens=max_tokens,
+                cache=cache,
+                client=client,
+                compactor=compactor,
+                on_token=on_token,
+            )
+        finally:
+            if client is not None:
+                await client.aclose()
+
+    return asyncio.run(run())
+
+
+async def agenerate_module_summaries(
+    module_commits: dict[str, list[Mapping[str, Any]]],
+    module_prompt: str,
+    overall_prompt: str = DEFAULT_OVERALL_SUMMARY_PROMPT,
+    model: str = "claude-sonnet-4-5",
+    chunk_token_budget: Optional[int] = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    cache: Optional[SummaryCache] = None,
+    client: Optional[AsyncLLMClient] = None,
+    compactor: Optional[PromptCompactor] = None,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> tuple[str, dict[str, str]]:
+    """
+    Generate per-module summaries and an overall rollup.
+
+    All module summaries are requested concurrently through one client, so
+    the time for N modules is close to that of the slowest module. The
+    overall summary is then generated from the module summaries.
+
+    Args:
+        module_commits: Filtered commits per module (see group_commits_by_module)
+        module_prompt: Prompt template for each module summary
+        overall_prompt: Prompt template for the rollup across modules
+        model: LLM model to use
+        chunk_token_budget: Per-call budget for commit text (see
+            agenerate_summary)
+        max_concurrency: Maximum LLM calls in flight (ignored when a client
+            is given)
+        max_tokens: Maximum tokens in each LLM response
+        cache: Optional on-disk summary cache
+        client: Shared async client
+        compactor: Optional prompt compactor applied to each module's commits
+        on_token: Optional callback receiving the overall summary as it
+            streams in
+
+    Returns:
+        Tuple of (overall summary, {module: summary}) with modules in the
+        order of module_commits
+    """
+    if not module_commits:
+        return "No significant changes.", {}
+
+    own_client = None
+    if client is None:
+        client = own_client = AsyncLLMClient(max_concurrency=max_concurrency)
+    try:
+        summaries = await asyncio.gather(
+            *(
+                agenerate_summary(
+                    commits,
+                    f"{module_prompt}\n\nModule: {module}",
+                    model=model,
+                    chunk_token_budget=chunk_token_budget,
+                    max_tokens=max_tokens,
+                    cache=cache,
+                    client=client,
+                    compactor=compactor,
+                )
+                for module, commits in module_commits.items()
+            )
+        )
+        module_summaries = dict(zip(module_commits, summaries))
+
+        overall = await _overall_summary(
+            module_summaries,
+            overall_prompt,
+            model,
+            max_tokens,
+            cache,
+            client,
+            on_token,
+        )
+    finally:
+        if own_client is not None:
+            await own_client.aclose()
+
+    return overall, module_summaries
+
+
+async def _overall_summary(
+    module_summaries: dict[str, str],
+    overall_prompt: str,
+    model: str,
+    max_tokens: int,
+    cache: Optional[SummaryCache],
+    client: AsyncLLMClient,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> str:
+    """Roll module summaries up into one overall summary."""
+    sections = "\n\n".join(
+        f"## {module}\n{summary}" for module, summary in module_summaries.items()
+    )
+    prompt = f"""{overall_prompt}
+
+Module summaries:
+
+{sections}"""
+
+    cache_key = None
+    if cache is not None:
+        # The prompt already embeds every input that shapes the rollup
+        cache_key = summary_cache_key(model, prompt, max_tokens, [])
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    summary = await acall_llm(
+        prompt=prompt,
+        model=model,
+        max_tokens=max_tokens,
+        client=client,
+        on_token=on_token,
+    )
+    summary = summary.strip()
+
+    if cache is not None:
+        cache.set(cache_key, summary, model=model, modules=len(module_summaries))
+
+    return summary
@@ -0,0 +1,19 @@
+"""Shared pytest fixtures."""
+
+import pytest
+
+from automated_changelog.stub_server import StubLLMServer
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    """
+    A running StubLLMServer with the LLM credentials pointing at it.
+
+    Tests can change the server's latency, error_rate, error_status and
+    completion_tokens attributes while it runs.
+    """
+    with StubLLMServer() as server:
+        monkeypatch.setenv("LITELLM_PROXY_API_BASE", server.url)
+        monkeypatch.setenv("LITELLM_PROXY_API_KEY", "stub")
+        yield server
@@ -0,0 +1,235 @@
+"""Tests for backends module."""
+
+import os
+import subprocess
+from types import SimpleNamespace
+
+import pytest
+
+from automated_changelog.backends import (
+    BackendError,
+    GitCLIBackend,
+    Pygit2Backend,
+    _subject,
+    get_backend,
+)
+from automated_changelog.config import ConfigError, get_repo_name
+
+
+def git(repo, *args, date=None):
+    env = {
+        **os.environ,
+        "GIT_AUTHOR_NAME": "Test Author",
+        "GIT_AUTHOR_EMAIL": "test@example.com",
+        "GIT_COMMITTER_NAME": "Test Author",
+        "GIT_COMMITTER_EMAIL": "test@example.com",
+    }
+    if date:
+        env["GIT_AUTHOR_DATE"] = env["GIT_COMMITTER_DATE"] = date
+    result = subprocess.run(
+        ["git", "-C", str(repo), *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    return result.stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """A small repository with a rename, a multi-line subject and a merge."""
+    git(tmp_path, "init", "-q", "-b", "main")
+    (tmp_path / "a.txt").write_text("one\n" * 20)
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "feat: first", date="2025-01-01T10:00:00+00:00")
+
+    git(tmp_path, "mv", "a.txt", "b.txt")
+    git(
+        tmp_path,
+        "commit",
+        "-q",
+        "-m",
+        "refactor: rename",
+        date="2025-01-02T10:00:00+00:00",
+    )
+
+    git(tmp_path, "checkout", "-q", "-b", "topic")
+    (tmp_path / "c.txt").write_text("topic\n")
+    git(tmp_path, "add", ".")
+    git(
+        tmp_path,
+        "commit",
+        "-q",
+        "-m",
+        "fix: wrapped\nsubject line\n\nBody text",
+        date="2025-01-03T10:00:00+00:00",
+    )
+
+    git(tmp_path, "checkout", "-q", "main")
+    git(
+        tmp_path,
+        "merge",
+        "-q",
+        "--no-ff",
+        "-m",
+        "Merge topic",
+        "topic",
+        date="2025-01-04T10:00:00+00:00",
+    )
+    git(tmp_path, "remote", "add", "origin", "https://github.com/user/my-repo.git")
+    return tmp_path
+
+
+class TestGetBackend:
+    """Tests for get_backend function."""
+
+    def test_default_is_git_cli(self, tmp_path):
+        """Test that no backend name selects the git command line backend."""
+        assert isinstance(get_backend(None, tmp_path), GitCLIBackend)
+        assert isinstance(get_backend("git", tmp_path), GitCLIBackend)
+
+    def test_unknown_backend(self, tmp_path):
+        """Test that an unknown backend name is a configuration error."""
+        with pytest.raises(ConfigError, match="Unknown backend 'svn'"):
+            get_backend("svn", tmp_path)
+
+
+class TestGitCLIBackend:
+    """Tests for GitCLIBackend class."""
+
+    def test_iter_commits(self, repo):
+        """Test that commits are read newest first with paths."""
+        commits = list(GitCLIBackend(repo).iter_commits(with_paths=True))
+
+        assert [c.subject for c in commits] == [
+            "Merge topic",
+            "fix: wrapped subject line",
+            "refactor: rename",
+            "feat: first",
+        ]
+        assert commits[0].paths == ()
+        assert commits[2].paths == ("b.txt",)
+
+    def test_remote_url(self, repo, tmp_path_factory):
+        """Test remote lookup, including a repository without remotes."""
+        assert GitCLIBackend(repo).remote_url() == "https://github.com/user/my-repo.git"
+
+        bare = tmp_path_factory.mktemp("plain")
+        git(bare, "init", "-q")
+        assert GitCLIBackend(bare).remote_url() is None
+
+
+class TestPygit2Backend:
+    """Tests for Pygit2Backend class; results must match the git backend."""
+
+    @pytest.fixture(autouse=True)
+    def require_pygit2(self):
+        pytest.importorskip("pygit2")
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {},
+            {"with_paths": True},
+            {"with_stats": True},
+            {"with_paths": True, "with_stats": True},
+            {"with_body": True},
+            {"with_paths": True, "with_body": True, "max_body_tokens": 2},
+            {"max_count": 2},
+            {"since_date": "2025-01-02 00:00:00", "until_date": "2025-01-03 23:59:59"},
+        ],
+    )
+    def test_matches_git_cli(self, repo, kwargs):
+        """Test that both backends return identical commits."""
+        expected = list(GitCLIBackend(repo).iter_commits(**kwargs))
+        actual = list(Pygit2Backend(repo).iter_commits(**kwargs))
+
+        assert actual == expected
+        assert [c.paths for c in actual] == [c.paths for c in expected]
+        assert [c.stats for c in actual] == [c.stats for c in expected]
+        assert [c.body for c in actual] == [c.body for c in expected]
+
+    def test_last_commit_hash(self, repo):
+        """Test that only commits after last_commit_hash are returned."""
+        last = git(repo, "rev-parse", "HEAD~1")
+        expected = list(GitCLIBackend(repo).iter_commits(last_commit_hash=last))
+        actual = list(Pygit2Backend(repo).iter_commits(last_commit_hash=last))
+
+        assert [c.subject for c in actual] == [
+            "Merge topic",
+            "fix: wrapped subject line",
+        ]
+        assert actual == expected
+
+    def test_caps_paths_per_commit(self, tmp_path, monkeypatch):
+        """Test that file lists over the cap are truncated and flagged."""
+        monkeypatch.setattr("automated_changelog.backends.MAX_COMMIT_PATHS", 2)
+        git(tmp_path, "init", "-q", "-b", "main")
+        for name in ("a.txt", "b.txt", "c.txt"):
+            (tmp_path / name).write_text(name)
+        git(tmp_path, "add", ".")
+        git(tmp_path, "commit", "-q", "-m", "feat: three files")
+
+        commit = next(
+            Pygit2Backend(tmp_path).iter_commits(with_stats=True, with_paths=True)
+        )
+
+        assert commit.paths == ("a.txt", "b.txt")
+        assert commit.paths_truncated is True
+        assert commit.stats.files == 3
+
+    def test_since_date_survives_clock_skew(self, tmp_path):
+        """Test that a commit dated before since_date doesn't end the walk."""
+        for subject, date in [
+            ("old", "2024-11-01T10:00:00+00:00"),
+            ("in range", "2025-01-01T10:00:00+00:00"),
+            ("skewed", "2024-12-01T10:00:00+00:00"),
+            ("newest", "2025-01-10T10:00:00+00:00"),
+        ]:
+            if subject == "old":
+                git(tmp_path, "init", "-q", "-b", "main")
+            git(tmp_path, "commit", "-q", "--allow-empty", "-m", subject, date=date)
+        backend = Pygit2Backend(tmp_path)
+        # Walk in parent order, where the skewed commit comes first
+        parent_order = [backend.repo.revparse_single(f"HEAD~{n}") for n in range(4)]
+        backend.repo = SimpleNamespace(
+            head_is_unborn=False,
+            head=backend.repo.head,
+            walk=lambda *args: iter(parent_order),
+        )
+
+        commits = backend.iter_commits(since_date="2024-12-15 00:00:00")
+
+        assert [c.subject for c in commits] == ["newest", "in range"]
+
+    def test_unknown_last_commit_hash(self, repo):
+        """Test that an unknown revision raises BackendError."""
+        with pytest.raises(BackendError, match="Unknown revision"):
+            list(Pygit2Backend(repo).iter_commits(last_commit_hash="f" * 40))
+
+    def test_invalid_date(self, repo):
+        """Test that non-ISO dates are rejected rather than misread."""
+        with pytest.raises(BackendError, match="ISO 8601"):
+            list(Pygit2Backend(repo).iter_commits(since_date="last week"))
+
+    def test_not_a_repository(self, tmp_path):
+        """Test that a directory outside any repository raises BackendError."""
+        with pytest.raises(BackendError, match="Not a git repository"):
+            Pygit2Backend(tmp_path / "missing")
+
+    def test_empty_repository(self, tmp_path):
+        """Test that a repository without commits raises BackendError."""
+        git(tmp_path, "init", "-q")
+        with pytest.raises(BackendError, match="does not have any commits"):
+            list(Pygit2Backend(tmp_path).iter_commits())
+
+    def test_repo_name_from_remote(self, repo):
+        """Test that get_repo_name reads the origin URL through the backend."""
+        assert get_repo_name(Pygit2Backend(repo)) == "my-repo"
+
+
+def test_subject_joins_first_paragraph():
+    """Test that subjects are built like git's %s placeholder."""
+    assert _subject("\n  \nfix: a\nb  \n\nbody\n") == "fix: a b"
+    assert _subject("") == ""
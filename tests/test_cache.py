@@ -0,0 +1,204 @@
+"""Tests for cache module."""
+
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from automated_changelog.cache import SummaryCache, summary_cache_key
+from automated_changelog.git_state import DiffStat
+
+
+def make_commit(subject, commit_hash="a" * 40):
+    return {
+        "hash": commit_hash,
+        "short_hash": commit_hash[:7],
+        "author": "Test Author",
+        "date": "2025-10-27 14:32",
+        "subject": subject,
+    }
+
+
+def age_entry(path, seconds):
+    """Move an entry's last-used time into the past."""
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+class TestSummaryCacheKey:
+    """Tests for summary_cache_key function."""
+
+    def test_key_is_stable(self):
+        """Test that identical inputs produce identical keys."""
+        commits = [make_commit("feat: one")]
+
+        first = summary_cache_key("model", "prompt", 100, commits)
+        second = summary_cache_key("model", "prompt", 100, list(commits))
+
+        assert first == second
+        assert len(first) == 64
+
+    def test_key_changes_with_inputs(self):
+        """Test that every input contributes to the key."""
+        commits = [make_commit("feat: one")]
+        base = summary_cache_key("model", "prompt", 100, commits)
+
+        assert summary_cache_key("other", "prompt", 100, commits) != base
+        assert summary_cache_key("model", "other", 100, commits) != base
+        assert summary_cache_key("model", "prompt", 200, commits) != base
+        assert summary_cache_key("model", "prompt", 100, commits[:0]) != base
+        assert (
+            summary_cache_key("model", "prompt", 100, [make_commit("feat: two")])
+            != base
+        )
+        assert summary_cache_key("model", "prompt", 100, commits, chunk=5) != base
+
+    def test_key_covers_diff_stats(self):
+        """Test that stats change the key, and commits without them don't."""
+        commits = [make_commit("feat: one")]
+        base = summary_cache_key("model", "prompt", 100, commits)
+        with_stats = [{**commits[0], "stats": DiffStat(1, 2, 0, (("src", 2),))}]
+        without_stats = [{**commits[0], "stats": None}]
+
+        assert summary_cache_key("model", "prompt", 100, with_stats) != base
+        assert summary_cache_key("model", "prompt", 100, without_stats) == base
+
+    def test_key_covers_bodies(self):
+        """Test that commit bodies change the key."""
+        commits = [make_commit("feat: one")]
+        base = summary_cache_key("model", "prompt", 100, commits)
+        with_body = [{**commits[0], "body": "Why we did it"}]
+
+        assert summary_cache_key("model", "prompt", 100, with_body) != base
+        assert summary_cache_key("model", "prompt", 100, with_body) != (
+            summary_cache_key("model", "prompt", 100, [{**commits[0], "body": ""}])
+        )
+
+
+class TestSummaryCache:
+    """Tests for SummaryCache class."""
+
+    def test_round_trip(self, tmp_path):
+        """Test storing and reading back a summary."""
+        cache = SummaryCache(tmp_path / "cache")
+
+        assert cache.get("k1") is None
+        cache.set("k1", "- summary")
+
+        assert cache.get("k1") == "- summary"
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_expired_entry_is_a_miss(self, tmp_path):
+        """Test that entries unused for longer than max_age_days are dropped."""
+        cache = SummaryCache(tmp_path, max_age_days=1)
+        cache.set("old", "- stale")
+        age_entry(tmp_path / "old.json", 2 * 24 * 60 * 60)
+
+        assert cache.get("old") is None
+        assert not (tmp_path / "old.json").exists()
+
+    def test_size_eviction_drops_least_recently_used(self, tmp_path):
+        """Test that the oldest entries are evicted over the size cap."""
+        cache = SummaryCache(tmp_path, max_size_mb=0.002)  # ~2 KB
+        for n in range(3):
+            cache.set(f"k{n}", "x" * 600)
+            age_entry(tmp_path / f"k{n}.json", 100 - n)
+
+        cache.set("k3", "x" * 600)
+
+        assert not (tmp_path / "k0.json").exists()
+        assert (tmp_path / "k3.json").exists()
+
+    def test_size_tracked_between_writes(self, tmp_path):
+        """Test that writes under the cap don't rescan the directory."""
+        cache = SummaryCache(tmp_path, max_size_mb=0.002)  # ~2 KB
+
+        with patch.object(cache, "evict", wraps=cache.evict) as evict:
+            for n in range(3):
+                cache.set(f"k{n}", "x" * 600)
+            cache.set("k0", "x" * 600)
+            assert evict.call_count == 1
+
+            cache.set("k3", "x" * 600)
+            assert evict.call_count == 2
+
+        assert len(list(tmp_path.glob("*.json"))) == 3
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        """Test that unreadable entries don't raise."""
+        (tmp_path / "bad.json").write_text("{not json")
+        cache = SummaryCache(tmp_path)
+
+        assert cache.get("bad") is None
+
+    def test_from_config(self, tmp_path):
+        """Test building a cache from the config section."""
+        cache = SummaryCache.from_config(
+            {"directory": str(tmp_path / "c"), "max_age_days": 2, "max_size_mb": 1}
+        )
+
+        assert cache.directory == tmp_path / "c"
+        assert cache.max_age_seconds == 2 * 24 * 60 * 60
+        assert cache.max_size_bytes == 1024 * 1024
+
+    def test_from_config_without_section_is_disabled(self):
+        """Test that no cache is used unless the config asks for one."""
+        assert SummaryCache.from_config(None) is None
+        assert SummaryCache.from_config({}).directory.name == ".changelog_cache"
+
+    def test_clear(self, tmp_path):
+        """Test removing all entries."""
+        cache = SummaryCache(tmp_path)
+        cache.set("k1", "- a")
+        cache.set("k2", "- b")
+
+        cache.clear()
+
+        assert list(tmp_path.glob("*.json")) == []
+
+
+class TestSegmentIndex:
+    """Tests for the commit range index of SummaryCache."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that ranges are listed longest first, without duplicates."""
+        cache = SummaryCache(tmp_path / "cache")
+
+        assert cache.segment_lengths("a" * 40) == []
+        cache.add_segment("a" * 40, 3)
+        cache.add_segment("a" * 40, 10)
+        cache.add_segment("a" * 40, 3)
+
+        assert cache.segment_lengths("a" * 40) == [10, 3]
+        assert cache.segment_lengths("b" * 40) == []
+
+    def test_index_listed_once(self, tmp_path):
+        """Test that probing commits without ranges doesn't read the disk."""
+        SummaryCache(tmp_path / "cache").add_segment("a" * 40, 2)
+        cache = SummaryCache(tmp_path / "cache")
+
+        with patch("automated_changelog.cache.os.listdir", wraps=os.listdir) as ls:
+            with patch.object(
+                Path, "read_text", autospec=True, side_effect=Path.read_text
+            ) as read:
+                lengths = [cache.segment_lengths(f"{n:040x}") for n in range(1000)]
+                assert cache.segment_lengths("a" * 40) == [2]
+
+        assert lengths == [[]] * 1000
+        assert ls.call_count == 1
+        assert read.call_count == 1
+
+    def test_clear_and_expiry(self, tmp_path):
+        """Test that index files expire with age and are cleared."""
+        cache = SummaryCache(tmp_path / "cache", max_age_days=1)
+        cache.add_segment("a" * 40, 2)
+        cache.add_segment("b" * 40, 2)
+        age_entry(cache._segment_path("a" * 40), 2 * 86400)
+
+        cache.evict()
+        assert cache.segment_lengths("a" * 40) == []
+        assert cache.segment_lengths("b" * 40) == [2]
+
+        cache.clear()
+        assert cache.segment_lengths("b" * 40) == []
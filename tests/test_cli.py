@@ -1,11 +1,38 @@
 """Tests for CLI commands."""
 
+import json
+import pstats
+import subprocess
+import sys
+import time
+from datetime import date
 from pathlib import Path
-from unittest.mock import patch
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
 
+import pytest
 from click.testing import CliRunner
 
-from automated_changelog.cli import cli
+from automated_changelog.cli import (
+    _bucket_commits,
+    _date_windows,
+    _read_repo_list,
+    _shared_client,
+    cli,
+)
+from automated_changelog.config import get_repo_name
+from automated_changelog.filtering import CommitFilter
+from automated_changelog.rendering import EntryRenderer
+
+
+def make_commit(day, subject, short_hash="abc123d"):
+    return {
+        "hash": short_hash + "0" * (40 - len(short_hash)),
+        "short_hash": short_hash,
+        "author": "Test Author",
+        "date": f"{day} 12:00",
+        "subject": subject,
+    }
 
 
 def test_cli_help():
@@ -16,6 +43,21 @@ def test_cli_help():
     assert "Automated Changelog Generator" in result.output
 
 
+def test_cli_import_defers_llm_dependencies():
+    """Test that loading the CLI does not import litellm or dotenv."""
+    code = (
+        "import sys, automated_changelog.cli; "
+        "print(sorted(m for m in ('litellm', 'dotenv', 'httpx', "
+        "'automated_changelog.llm', 'automated_changelog.summarization') "
+        "if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
 def test_init_command_creates_config():
     """Test init command creates configuration file."""
     runner = CliRunner()
@@ -32,6 +74,30 @@ def test_init_command_creates_config():
         assert "filter:" in config_content
 
 
+def test_init_reads_repo_name_in_process(tmp_path, monkeypatch):
+    """Test that init names the repository through pygit2 without running git."""
+    pytest.importorskip("pygit2")
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    subprocess.run(
+        ["git", "-C", str(tmp_path), "remote", "add", "origin", "git@host:u/app.git"],
+        check=True,
+    )
+    monkeypatch.chdir(tmp_path)
+
+    names = []
+    record_name = patch(
+        "automated_changelog.cli.get_repo_name",
+        side_effect=lambda backend: names.append(get_repo_name(backend)),
+    )
+    with patch("subprocess.run") as mock_run, record_name as mock_name:
+        result = CliRunner().invoke(cli, ["init"])
+
+    assert result.exit_code == 0
+    assert mock_name.call_args.args[0].name == "pygit2"
+    assert names == ["app"]
+    assert not mock_run.called
+
+
 def test_init_command_overwrite_existing():
     """Test init command with existing config file - user confirms overwrite."""
     runner = CliRunner()
@@ -92,7 +158,7 @@ def test_generate_command_missing_config():
         assert "automated-changelog init" in result.output
 
 
-@patch("automated_changelog.cli.fetch_commits")
+@patch("automated_changelog.cli.iter_commits")
 @patch("automated_changelog.cli.read_last_commit_hash")
 @patch("automated_changelog.cli.write_changelog_entry")
 def test_generate_command_with_valid_config(mock_write, mock_read, mock_fetch):
@@ -126,7 +192,7 @@ def test_generate_command_with_valid_config(mock_write, mock_read, mock_fetch):
         assert mock_write.called
 
 
-@patch("automated_changelog.cli.fetch_commits")
+@patch("automated_changelog.cli.iter_commits")
 @patch("automated_changelog.cli.read_last_commit_hash")
 @patch("automated_changelog.cli.write_changelog_entry")
 def test_generate_dry_run(mock_write, mock_read, mock_fetch):
@@ -158,7 +224,7 @@ def test_generate_dry_run(mock_write, mock_read, mock_fetch):
         assert not mock_write.called
 
 
-@patch("automated_changelog.cli.fetch_commits")
+@patch("automated_changelog.cli.iter_commits")
 @patch("automated_changelog.cli.read_last_commit_hash")
 @patch("automated_changelog.cli.write_changelog_entry")
 def test_generate_custom_config_path(mock_write, mock_read, mock_fetch):
@@ -185,3 +251,484 @@ def test_generate_custom_config_path(mock_write, mock_read, mock_fetch):
 
         assert result.exit_code == 0
         assert "Loaded configuration from my_config.yaml" in result.output
+
+
+@patch("automated_changelog.summarization.generate_module_summaries")
+@patch("automated_changelog.llm.get_llm_client")
+@patch("automated_changelog.cli.iter_commits")
+@patch("automated_changelog.cli.read_last_commit_hash")
+@patch("automated_changelog.cli.write_changelog_entry")
+def test_generate_with_modules(
+    mock_write, mock_read, mock_fetch, mock_client, mock_modules
+):
+    """Test that a monorepo config produces per-module summaries."""
+    mock_read.return_value = None
+    mock_client.return_value = {"api_base": "http://proxy", "api_key": "k"}
+    mock_fetch.return_value = [
+        {
+            "hash": "abc123def456789012345678901234567890abcd",
+            "short_hash": "abc123d",
+            "author": "Test Author",
+            "date": "2025-10-27 14:32",
+            "subject": "Add endpoint",
+            "paths": ("api/app.py",),
+        }
+    ]
+    mock_modules.return_value = ("Overall summary", {"api": "- New endpoint"})
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        runner.invoke(cli, ["init"])
+        with open(".changelog_config.yaml", "a") as f:
+            f.write("modules:\n  - api\n  - web\n")
+
+        result = runner.invoke(cli, ["generate", "--dry-run", "--no-cache"])
+
+        assert result.exit_code == 0
+        assert mock_fetch.call_args.kwargs["with_paths"] is True
+        module_commits = mock_modules.call_args[0][0]
+        assert list(module_commits) == ["api"]
+        assert "### Summary\n\nOverall summary" in result.output
+        assert "#### api\n\n- New endpoint" in result.output
+
+
+@patch("automated_changelog.cli.iter_commits")
+@patch("automated_changelog.cli.read_last_commit_hash")
+def test_generate_with_diff_stats(mock_read, mock_fetch):
+    """Test that diff_stats in the config fetches stats with the commits."""
+    mock_read.return_value = None
+    mock_fetch.return_value = []
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        runner.invoke(cli, ["init"])
+        runner.invoke(cli, ["generate", "--dry-run", "--skip-llm"])
+        assert mock_fetch.call_args.kwargs["with_stats"] is False
+
+        with open(".changelog_config.yaml", "a") as f:
+            f.write("diff_stats: true\n")
+        result = runner.invoke(cli, ["generate", "--dry-run", "--skip-llm"])
+
+        assert result.exit_code == 0
+        assert mock_fetch.call_args.kwargs["with_stats"] is True
+
+
+@patch("automated_changelog.cli.iter_commits")
+@patch("automated_changelog.cli.read_last_commit_hash")
+def test_generate_with_commit_bodies(mock_read, mock_fetch):
+    """Test that the commit_bodies section fetches truncated bodies."""
+    mock_read.return_value = None
+    mock_fetch.return_value = []
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        runner.invoke(cli, ["init"])
+        with open(".changelog_config.yaml", "a") as f:
+            f.write("commit_bodies:\n  enabled: true\n  max_tokens: 40\n")
+        result = runner.invoke(cli, ["generate", "--dry-run", "--skip-llm"])
+
+        assert result.exit_code == 0
+        assert mock_fetch.call_args.kwargs["with_body"] is True
+        assert mock_fetch.call_args.kwargs["max_body_tokens"] == 40
+
+
+def test_date_windows():
+    """Test weekly steps and calendar-month windows clipped to the span."""
+    weeks = _date_windows(date(2025, 1, 1), date(2025, 1, 20), "week")
+    months = _date_windows(date(2024, 11, 15), date(2025, 1, 10), "month")
+
+    assert weeks == [
+        (date(2025, 1, 1), date(2025, 1, 7)),
+        (date(2025, 1, 8), date(2025, 1, 14)),
+        (date(2025, 1, 15), date(2025, 1, 20)),
+    ]
+    assert months == [
+        (date(2024, 11, 15), date(2024, 11, 30)),
+        (date(2024, 12, 1), date(2024, 12, 31)),
+        (date(2025, 1, 1), date(2025, 1, 10)),
+    ]
+
+
+def test_bucket_commits():
+    """Test that commits land in the window containing their author date."""
+    windows = _date_windows(date(2025, 1, 1), date(2025, 1, 14), "week")
+    late = make_commit("2025-01-09", "late")
+    early = make_commit("2025-01-07", "early")
+    # Committed inside the span, but authored before or after it
+    authored_after = make_commit("2025-01-15", "after")
+    authored_before = make_commit("2024-12-20", "before")
+
+    assert _bucket_commits([authored_after, late, early, authored_before], windows) == [
+        [early, authored_before],
+        [authored_after, late],
+    ]
+
+
+@patch("automated_changelog.cli.fetch_commits")
+@patch("automated_changelog.cli.write_changelog_entry")
+def test_backfill_single_log_and_write(mock_write, mock_fetch):
+    """Test that backfill runs one git log and writes all windows at once."""
+    mock_fetch.return_value = [
+        make_commit("2025-01-16", "third", "ccc0000"),
+        make_commit("2025-01-03", "second", "bbb0000"),
+        make_commit("2025-01-01", "first", "aaa0000"),
+    ]
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        runner.invoke(cli, ["init"])
+        result = runner.invoke(
+            cli,
+            ["backfill", "--from", "2025-01-01", "--to", "2025-01-21", "--skip-llm"],
+        )
+
+    assert result.exit_code == 0
+    assert "in 2 non-empty week windows" in result.output
+    mock_fetch.assert_called_once()
+    assert mock_fetch.call_args.kwargs["since_date"] == "2025-01-01 00:00:00"
+    assert mock_fetch.call_args.kwargs["until_date"] == "2025-01-21 23:59:59"
+
+    mock_write.assert_called_once()
+    _, state_hash, content = mock_write.call_args[0]
+    assert state_hash is None
+    # Newest window first; the empty middle week is skipped
+    assert content.index("## [2025-01-15 to 2025-01-21]") < content.index(
+        "## [2025-01-01 to 2025-01-07]"
+    )
+    assert "2025-01-08" not in content
+    assert "### Changes (2 commits)" in content
+
+
+@patch("automated_changelog.summarization.acall_llm", new_callable=AsyncMock)
+@patch("automated_changelog.llm.get_llm_client")
+@patch("automated_changelog.cli.fetch_commits")
+@patch("automated_changelog.cli.write_changelog_entry")
+def test_backfill_summarizes_each_window(mock_write, mock_fetch, mock_client, mock_llm):
+    """Test that every window gets its own summary."""
+    mock_client.return_value = {"api_base": "http://proxy", "api_key": "k"}
+    mock_fetch.return_value = [
+        make_commit("2025-02-10", "feat: february", "bbb0000"),
+        make_commit("2025-01-10", "feat: january", "aaa0000"),
+    ]
+    mock_llm.side_effect = lambda prompt, model, **kwargs: (
+        "- Jan work" if "january" in prompt else "- Feb work"
+    )
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        runner.invoke(cli, ["init"])
+        result = runner.invoke(
+            cli,
+            [
+                "backfill",
+                "--interval",
+                "month",
+                "--from",
+                "2025-01-01",
+                "--to",
+                "2025-02-28",
+                "--no-cache",
+            ],
+        )
+
+    assert result.exit_code == 0
+    assert mock_llm.call_count == 2
+    assert "Compacted prompts: ~" in result.output
+    content = mock_write.call_args[0][2]
+    assert "## [2025-02-01 to 2025-02-28]\n\n### Summary\n\n- Feb work" in content
+    assert "## [2025-01-01 to 2025-01-31]\n\n### Summary\n\n- Jan work" in content
+
+
+@patch("automated_changelog.cli.iter_commits")
+@patch("automated_changelog.cli.read_last_commit_hash")
+def test_generate_uses_state_index(mock_read, mock_fetch):
+    """Test that a configured state file replaces scanning the changelog."""
+    mock_read.return_value = None
+    mock_fetch.return_value = [make_commit("2025-01-02", "feat: one", "aaa0000")]
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        runner.invoke(cli, ["init"])
+        with open(".changelog_config.yaml", "a") as f:
+            f.write('state_file: ".changelog_state.json"\n')
+
+        first = runner.invoke(cli, ["generate", "--skip-llm"])
+        assert first.exit_code == 0
+        assert mock_read.call_count == 1
+        entry = json.loads(Path(".changelog_state.json").read_text())["entries"][0]
+        assert entry["commits"] == 1
+        assert entry["first_commit"] == entry["last_commit"] == "aaa" + "0" * 37
+
+        mock_fetch.return_value = []
+        second = runner.invoke(cli, ["generate", "--skip-llm"])
+
+        assert second.exit_code == 0
+        assert mock_read.call_count == 1
+        assert mock_fetch.call_args.kwargs["last_commit_hash"] == "aaa" + "0" * 37
+
+
+@patch("automated_changelog.cli.iter_commits")
+@patch("automated_changelog.cli.read_last_commit_hash")
+def test_generate_max_commits_requires_first_run(mock_read, mock_fetch):
+    """Test that --max-commits is refused when it would skip older commits."""
+    mock_read.return_value = "a" * 40
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        runner.invoke(cli, ["init"])
+        result = runner.invoke(cli, ["generate", "--max-commits", "10"])
+
+        assert result.exit_code != 0
+        assert "--max-commits is only supported on a first run" in result.output
+        assert not mock_fetch.called
+
+        result = runner.invoke(
+            cli, ["generate", "--max-commits", "10", "--from-date", "2025-01-01"]
+        )
+        assert result.exit_code == 0
+        assert mock_fetch.call_args.kwargs["max_count"] == 10
+
+
+def test_read_repo_list(tmp_path):
+    """Test that repos come from the list file and globs, without duplicates."""
+    for name in ("alpha", "beta", "gamma"):
+        (tmp_path / name).mkdir()
+    (tmp_path / "notes.txt").write_text("")
+    repos_file = tmp_path / "repos.txt"
+    repos_file.write_text("# services\nalpha\n\nbeta\n")
+
+    repos = _read_repo_list(str(repos_file), (str(tmp_path / "*"),))
+
+    assert [repo.name for repo in repos] == ["alpha", "beta", "gamma"]
+
+
+@patch("automated_changelog.summarization.acall_llm", new_callable=AsyncMock)
+@patch("automated_changelog.llm.get_llm_client")
+@patch("automated_changelog.cli.fetch_commits")
+def test_generate_all_reports_each_repo(mock_fetch, mock_client, mock_llm):
+    """Test that repos share one LLM run and failures are reported per repo."""
+    mock_client.return_value = {"api_base": "http://proxy", "api_key": "k"}
+
+    def fetch(backend, **kwargs):
+        name = Path(backend.repo_path).name
+        if name == "locked":
+            raise PermissionError("Permission denied: '.git/HEAD'")
+        return [make_commit("2025-01-02", f"feat: {name}", "aaa0000")]
+
+    mock_fetch.side_effect = fetch
+    mock_llm.side_effect = lambda prompt, model, **kwargs: (
+        "- Alpha work" if "alpha" in prompt else "- Beta work"
+    )
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        for name in ("alpha", "beta", "broken", "locked"):
+            Path(name).mkdir()
+        for name in ("alpha", "beta", "locked"):
+            runner.invoke(cli, ["init", "--config", f"{name}/.changelog_config.yaml"])
+        Path("repos.txt").write_text("alpha\nbeta\nbroken\nlocked\n")
+
+        result = runner.invoke(
+            cli, ["generate-all", "--repos-file", "repos.txt", "--no-cache"]
+        )
+
+        assert result.exit_code == 1
+        assert mock_fetch.call_count == 3
+        assert mock_llm.call_count == 2
+        assert "- Alpha work" in Path("alpha/CHANGELOG.md").read_text()
+        assert "- Beta work" in Path("beta/CHANGELOG.md").read_text()
+        assert "✓ alpha: 1 commits, updated to aaa00000" in result.output
+        assert "✗ broken: Configuration file not found" in result.output
+        assert "✗ locked: PermissionError: Permission denied" in result.output
+        assert "2 succeeded, 2 failed" in result.output
+
+
+def test_shared_client_uses_most_permissive_retry_policy():
+    """Test that the shared client never cuts a repo's timeouts or retries."""
+    configs = [
+        {"llm": {"timeout": 30, "max_retries": 1, "max_concurrency": 8}},
+        {"llm": {"timeout": 120, "max_retries": 4, "max_concurrency": 2}},
+        {"llm": {"hedge_percentile": 95}},
+    ]
+
+    client = _shared_client(configs, None)
+
+    assert client.max_concurrency == 2
+    assert client.retry_policy.timeout == 120
+    assert client.retry_policy.max_retries == 4
+    assert client.retry_policy.hedge_percentile is None
+
+
+@patch("automated_changelog.summarization.acall_llm", new_callable=AsyncMock)
+@patch("automated_changelog.llm.get_llm_client")
+@patch("automated_changelog.cli.iter_commits")
+@patch("automated_changelog.cli.read_last_commit_hash")
+def test_generate_caches_only_when_configured(
+    mock_read, mock_fetch, mock_client, mock_llm
+):
+    """Test that configs without a cache section leave no cache directory."""
+    mock_read.return_value = None
+    mock_fetch.side_effect = lambda **kwargs: [
+        make_commit("2025-01-02", "feat: one", "aaa0000")
+    ]
+    mock_client.return_value = {"api_base": "http://proxy", "api_key": "k"}
+    mock_llm.return_value = "- Added one"
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        runner.invoke(cli, ["init"])
+        config = Path(".changelog_config.yaml").read_text()
+        start = config.index("\ncache:\n")
+        end = config.index("\n\n", start + 1)
+        Path(".changelog_config.yaml").write_text(config[:start] + config[end:])
+        result = runner.invoke(cli, ["generate", "--dry-run"])
+        assert result.exit_code == 0
+        assert not Path(".changelog_cache").exists()
+
+        Path(".changelog_config.yaml").write_text(config)
+        result = runner.invoke(cli, ["generate", "--dry-run"])
+        assert result.exit_code == 0
+        assert Path(".changelog_cache").is_dir()
+
+
+@patch("automated_changelog.llm.acompletion")
+@patch("automated_changelog.llm.get_llm_client")
+@patch("automated_changelog.cli.iter_commits")
+@patch("automated_changelog.cli.read_last_commit_hash")
+def test_generate_dry_run_streams_summary(
+    mock_read, mock_fetch, mock_client, mock_completion
+):
+    """Test that the dry-run preview shows the summary as it streams in."""
+    mock_read.return_value = None
+    mock_fetch.return_value = [make_commit("2025-01-02", "feat: one", "aaa0000")]
+    mock_client.return_value = {"api_base": "http://proxy", "api_key": "k"}
+
+    async def fake_stream():
+        for text in ("- Added", " one\n"):
+            delta = SimpleNamespace(content=text)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+    async def fake_completion(**kwargs):
+        assert kwargs["stream"] is True
+        return fake_stream()
+
+    mock_completion.side_effect = fake_completion
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        runner.invoke(cli, ["init"])
+        result = runner.invoke(cli, ["generate", "--dry-run", "--no-cache"])
+
+    assert result.exit_code == 0
+    preview = result.output.index("--- Summary preview ---\n- Added one")
+    assert result.output.index("### Summary\n\n- Added one\n") > preview
+
+
+@patch("automated_changelog.llm.acompletion")
+@patch("automated_changelog.llm.get_llm_client")
+@patch("automated_changelog.cli.iter_commits")
+@patch("automated_changelog.cli.read_last_commit_hash")
+@patch("automated_changelog.cli.write_changelog_entry")
+def test_generate_profile(
+    mock_write, mock_read, mock_fetch, mock_client, mock_completion
+):
+    """Test the stage breakdown, JSON profile and cProfile dump."""
+    mock_read.return_value = None
+    mock_fetch.return_value = [make_commit("2025-01-02", "feat: one", "aaa0000")]
+    mock_client.return_value = {"api_base": "http://proxy", "api_key": "k"}
+    mock_write.return_value = 0
+    mock_completion.return_value = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="- Added one"))],
+        usage=SimpleNamespace(completion_tokens=5),
+    )
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        runner.invoke(cli, ["init"])
+        result = runner.invoke(
+            cli,
+            [
+                "generate",
+                "--no-cache",
+                "--profile-json",
+                "profile.json",
+                "--profile-cprofile",
+                "profile.out",
+            ],
+            env={"CHANGELOG_PROFILE": "1"},
+        )
+        profile = json.loads(Path("profile.json").read_text())
+        stats = pstats.Stats("profile.out")
+
+    assert result.exit_code == 0
+    assert "Profile:" in result.output
+    assert "generate_summary" in result.output
+    assert list(profile["stages"]) == [
+        "load_config",
+        "read_state",
+        "fetch_commits",
+        "filter_commits",
+        "generate_summary",
+        "build_markdown",
+        "write_changelog_entry",
+    ]
+    assert profile["counters"]["commits"] == 1
+    assert profile["counters"]["llm_requests"] == 1
+    assert profile["counters"]["llm_tokens_in"] > 0
+    assert profile["counters"]["llm_tokens_out"] == 5
+    assert stats.total_calls > 0
+
+
+@patch("automated_changelog.cli.iter_commits")
+@patch("automated_changelog.cli.read_last_commit_hash")
+def test_generate_profile_times_filter_and_render_apart(mock_read, mock_fetch):
+    """Test that filtering and rendering streamed commits aren't billed to git."""
+    mock_read.return_value = None
+    mock_fetch.return_value = [make_commit("2025-01-02", "feat: one", "aaa0000")]
+
+    def slow(method):
+        def wrapper(*args):
+            time.sleep(0.05)
+            return method(*args)
+
+        return wrapper
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        runner.invoke(cli, ["init"])
+        slow_render = slow(EntryRenderer.commit_line)
+        slow_filter = slow(CommitFilter.is_ignored)
+        with patch.object(EntryRenderer, "commit_line", slow_render):
+            with patch.object(CommitFilter, "is_ignored", slow_filter):
+                result = runner.invoke(
+                    cli,
+                    ["generate", "--skip-llm", "--dry-run", "--profile-json", "p.json"],
+                )
+        stages = json.loads(Path("p.json").read_text())["stages"]
+
+    assert result.exit_code == 0
+    assert stages["filter_commits"] >= 0.05
+    assert stages["build_markdown"] >= 0.05
+    assert stages["fetch_commits"] < 0.05
+
+
+def test_generate_without_profile_prints_no_breakdown():
+    """Test that the breakdown is only printed when asked for."""
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        result = runner.invoke(cli, ["generate"])
+
+    assert "Profile:" not in result.output
+
+
+def test_generate_invalid_render_template():
+    """Test that a bad commit line template is reported as a config error."""
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        runner.invoke(cli, ["init"])
+        with open(".changelog_config.yaml", "a") as f:
+            f.write("render:\n  commit_template: '- {{ sha }}'\n")
+        result = runner.invoke(cli, ["generate"])
+
+    assert result.exit_code != 0
+    assert "Unknown placeholder '{{ sha }}'" in result.output
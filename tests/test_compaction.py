@@ -0,0 +1,185 @@
+"""Tests for compaction module."""
+
+from automated_changelog.compaction import (
+    PromptCompactor,
+    format_commit_line,
+    format_commit_lines,
+    format_stats,
+    subject_key,
+)
+from automated_changelog.git_state import DiffStat
+from automated_changelog.llm import estimate_tokens
+
+
+def make_commit(subject, n=0):
+    return {
+        "hash": f"{n:040x}",
+        "short_hash": f"{n:07x}",
+        "author": "Test Author",
+        "date": "2025-10-27 14:32",
+        "subject": subject,
+    }
+
+
+class TestSubjectKey:
+    """Tests for subject_key function."""
+
+    def test_ignores_versions_case_and_punctuation(self):
+        """Test that subjects differing only in variable parts share a key."""
+        assert subject_key("Bump version to 1.2.3") == subject_key(
+            "bump  version to v1.2.40."
+        )
+        assert subject_key("Revert abc1234f") == subject_key("revert 9f8e7d6c")
+
+    def test_keeps_different_words_apart(self):
+        """Test that hex-looking words and real changes stay distinct."""
+        assert subject_key("feat: add login") != subject_key("feat: add logout")
+        assert subject_key("fix defaced icon") != subject_key("fix effaced icon")
+
+
+class TestPromptCompactor:
+    """Tests for PromptCompactor class."""
+
+    def test_drops_fields_and_merges_duplicates(self):
+        """Test that repeated subjects become one counted line, newest kept."""
+        commits = [make_commit("chore: bump version to 2.0.1", 1)]
+        commits += [make_commit("feat: add export", 2)]
+        commits += [
+            make_commit(f"chore: bump version to 1.9.{n}", n + 3) for n in range(39)
+        ]
+        compactor = PromptCompactor()
+
+        lines = compactor.compact(commits)
+
+        assert lines == [
+            "- chore: bump version to 2.0.1 (x40)",
+            "- feat: add export",
+        ]
+        assert compactor.tokens_after < compactor.tokens_before
+        assert compactor.tokens_saved == (
+            compactor.tokens_before - compactor.tokens_after
+        )
+
+    def test_truncates_long_subjects(self):
+        """Test that very long subjects are cut off."""
+        compactor = PromptCompactor(max_subject_chars=10)
+
+        assert compactor.compact([make_commit("feat: " + "x" * 50)]) == [
+            "- feat: xxxx…"
+        ]
+
+    def test_token_budget_keeps_newest_lines(self):
+        """Test that lines beyond the budget are replaced by a note."""
+        commits = [
+            make_commit(f"feat: feature {chr(97 + n)} " * 3, n) for n in range(20)
+        ]
+        commits.append(make_commit("fix: repeated thing", 30))
+        commits.append(make_commit("fix: repeated thing", 31))
+        compactor = PromptCompactor(token_budget=60)
+
+        lines = compactor.compact(commits)
+
+        assert lines[0].startswith("- feat: feature a")
+        assert lines[-1] == f"- ... and {22 - (len(lines) - 1)} older commits not shown"
+        assert len(lines) < 21
+        assert compactor.tokens_after <= 60
+
+    def test_within_budget_unchanged(self):
+        """Test that a budget that fits everything changes nothing."""
+        commits = [make_commit("feat: one", 1), make_commit("fix: two", 2)]
+
+        assert PromptCompactor(token_budget=1000).compact(commits) == [
+            "- feat: one",
+            "- fix: two",
+        ]
+
+    def test_from_config(self):
+        """Test config defaults and disabling compaction."""
+        assert PromptCompactor.from_config(None) is None
+        assert PromptCompactor.from_config({"enabled": False}) is None
+
+        compactor = PromptCompactor.from_config({"enabled": True})
+        assert compactor.token_budget is None
+        assert compactor.max_subject_chars == 200
+
+        compactor = PromptCompactor.from_config({"enabled": True, "token_budget": 500})
+        assert compactor.token_budget == 500
+
+    def test_tokens_before_matches_full_prompt(self):
+        """Test that the uncompacted size is estimated without rendering it."""
+        commits = [make_commit(f"feat: feature {n}", n) for n in range(50)]
+        commits[0]["stats"] = DiffStat(3, 120, 4, (("src/auth", 100),))
+        commits[1]["body"] = "Why:\nthe old flow broke"
+        compactor = PromptCompactor()
+
+        compactor.compact(commits)
+
+        assert compactor.tokens_before == estimate_tokens(
+            "\n".join(format_commit_lines(commits))
+        )
+
+    def test_merged_lines_sum_diff_stats(self):
+        """Test that commits with stats show the combined size of their group."""
+        first = make_commit("bump version to 2.1.0", 1)
+        first["stats"] = DiffStat(1, 1, 1, (("src", 2),))
+        second = make_commit("bump version to 2.2.0", 2)
+        second["stats"] = DiffStat(2, 3, 1, (("docs", 2), ("src", 2)))
+        merge = make_commit("Merge branch 'main'", 3)
+        merge["stats"] = DiffStat()
+
+        assert PromptCompactor().compact([first, second, merge]) == [
+            "- bump version to 2.1.0 (x2) [+4/-2, 3 files: src, docs]",
+            "- Merge branch 'main'",
+        ]
+
+    def test_bodies_are_shown_once(self):
+        """Test that repeated bodies from cherry-pick chains are sent once."""
+        picked = make_commit("fix: retry on 503", 1)
+        picked["body"] = "The proxy drops\nidle connections."
+        original = make_commit("fix: retry on 503 (backport)", 2)
+        original["body"] = "The proxy  drops\nidle connections."
+        other = make_commit("docs: explain retries", 3)
+        other["body"] = ""
+
+        assert PromptCompactor().compact([picked, original, other]) == [
+            "- fix: retry on 503\n  The proxy drops\n  idle connections.",
+            "- fix: retry on 503 (backport)",
+            "- docs: explain retries",
+        ]
+
+
+class TestFormatStats:
+    """Tests for the compact diff stat notes."""
+
+    def test_format(self):
+        """Test that sizes are written in a few tokens."""
+        assert format_stats(DiffStat(1, 5, 0, (("src/auth", 5),))) == (
+            "[+5/-0, 1 file: src/auth]"
+        )
+        assert format_stats(DiffStat(120, 48210, 1500, ())) == (
+            "[+48.2k/-1.5k, 120 files]"
+        )
+
+    def test_commit_line(self):
+        """Test that full commit lines only carry stats when they were fetched."""
+        commit = make_commit("feat: login", 1)
+        assert format_commit_line(commit).endswith("(Test Author, 2025-10-27 14:32)")
+
+        commit["stats"] = DiffStat(2, 10, 4, (("src/auth", 12), ("tests", 2)))
+        assert format_commit_line(commit).endswith(
+            "14:32) [+10/-4, 2 files: src/auth, tests]"
+        )
+
+
+def test_format_commit_lines_deduplicates_bodies():
+    """Test that full commit lines carry each distinct body once."""
+    first = make_commit("feat: login", 1)
+    first["body"] = "Adds OAuth."
+    second = make_commit("feat: login again", 2)
+    second["body"] = "adds oauth."
+
+    lines = format_commit_lines([first, second, make_commit("chore: lint", 3)])
+
+    assert lines[0].endswith("14:32)\n  Adds OAuth.")
+    assert lines[1].endswith("14:32)")
+    assert len(lines) == 3
@@ -1,17 +1,118 @@
 """Tests for git_state module."""
 
+import io
+import os
 import subprocess
 from unittest.mock import MagicMock, patch
 
 import pytest
 
 from automated_changelog.git_state import (
+    MAX_COMMIT_PATHS,
+    MAX_STAT_DIRECTORIES,
+    STAT_OTHER_DIRECTORIES,
+    STATE_HEAD_BYTES,
+    Commit,
+    DiffStat,
+    StatCounter,
+    clean_body,
     fetch_commits,
+    iter_commits,
     read_last_commit_hash,
     write_changelog_entry,
 )
 
 
+def log_record(n, subject, author="A"):
+    """Build one mocked ``git log`` record whose hashes repeat the digit ``n``."""
+    digit = str(n)
+    return (
+        f"{digit * 40}|||{digit * 7}|||{author}|||2025-10-22 07:10:33 -0700|||{subject}"
+    )
+
+
+def mock_git_log(mock_popen, records, returncode=0, stderr=b""):
+    """Configure a mocked subprocess.Popen to stream NUL-delimited records."""
+    process = MagicMock()
+    process.stdout = io.BytesIO("\0".join(records).encode("utf-8"))
+    process.wait.return_value = returncode
+    process.poll.return_value = returncode
+
+    def popen(cmd, **kwargs):
+        kwargs["stderr"].write(stderr)
+        return process
+
+    mock_popen.side_effect = popen
+    return process
+
+
+class TestCommit:
+    """Tests for the Commit record type."""
+
+    def make_commit(self, **overrides):
+        fields = {
+            "hash": "abc123def456789012345678901234567890abcd",
+            "author": "Test Author",
+            "date": "2025-10-27 14:32",
+            "subject": "Initial commit",
+        }
+        fields.update(overrides)
+        return Commit(**fields)
+
+    def test_dict_style_access(self):
+        """Test that a Commit can be read like the old commit dicts."""
+        commit = self.make_commit()
+
+        assert commit["hash"] == "abc123def456789012345678901234567890abcd"
+        assert commit["short_hash"] == "abc123d"
+        assert commit["author"] == "Test Author"
+        assert commit["date"] == "2025-10-27 14:32"
+        assert commit["subject"] == "Initial commit"
+        assert commit.get("missing") is None
+        with pytest.raises(KeyError):
+            commit["missing"]
+
+    def test_equals_equivalent_dict(self):
+        """Test that a Commit compares equal to the equivalent dict."""
+        commit = self.make_commit()
+
+        assert dict(commit) == {
+            "hash": "abc123def456789012345678901234567890abcd",
+            "short_hash": "abc123d",
+            "author": "Test Author",
+            "date": "2025-10-27 14:32",
+            "subject": "Initial commit",
+        }
+        assert commit == dict(commit)
+
+    def test_stores_raw_hash_and_custom_abbrev(self):
+        """Test hex hashes are kept as raw bytes and abbreviated on demand."""
+        commit = self.make_commit(abbrev=10)
+
+        assert commit._hash == bytes.fromhex(commit.hash)
+        assert len(commit._hash) == 20
+        assert commit.short_hash == "abc123def4"
+
+    def test_non_hex_hash_kept_verbatim(self):
+        """Test that hashes which are not hex round-trip unchanged."""
+        commit = self.make_commit(hash="not-a-hash")
+
+        assert commit.hash == "not-a-hash"
+
+    def test_author_is_interned(self):
+        """Test that identical author names share one string object."""
+        first = self.make_commit(author="".join(["Ada ", "Lovelace"]))
+        second = self.make_commit(author="".join(["Ada ", "Love", "lace"]))
+
+        assert first.author is second.author
+
+    def test_has_no_instance_dict(self):
+        """Test that the record uses slots rather than a per-instance dict."""
+        commit = self.make_commit()
+
+        assert not hasattr(commit, "__dict__")
+
+
 class TestReadLastCommitHash:
     """Tests for read_last_commit_hash function."""
 
@@ -59,6 +160,37 @@ class TestReadLastCommitHash:
         result = read_last_commit_hash(str(changelog))
         assert result == test_hash
 
+    def test_read_hash_from_latest_commit_marker(self, tmp_path):
+        """Test that entry markers are used when the state marker is missing."""
+        changelog = tmp_path / "CHANGELOG.md"
+        newer, older = "b" * 40, "a" * 40
+        changelog.write_text(
+            f"## [2025-01-15]\n<!-- LATEST_COMMIT: {newer} -->\n\n"
+            f"## [2025-01-14]\n<!-- LATEST_COMMIT: {older} -->\n"
+        )
+
+        assert read_last_commit_hash(changelog) == newer
+
+    def test_first_marker_wins(self, tmp_path):
+        """Test that scanning stops at the first marker in the file."""
+        changelog = tmp_path / "CHANGELOG.md"
+        state, stale = "c" * 40, "d" * 40
+        changelog.write_text(
+            f"<!-- CHANGELOG_STATE: {state} -->\n\n"
+            f"## [old]\n<!-- CHANGELOG_STATE: {stale} -->\n"
+        )
+
+        assert read_last_commit_hash(changelog) == state
+
+    def test_marker_split_across_chunks(self, tmp_path):
+        """Test that a marker straddling a read boundary is still found."""
+        changelog = tmp_path / "CHANGELOG.md"
+        test_hash = "abc123def456789012345678901234567890abcd"
+        padding = "x" * (STATE_HEAD_BYTES - 20)
+        changelog.write_text(f"{padding}<!-- CHANGELOG_STATE: {test_hash} -->\n")
+
+        assert read_last_commit_hash(changelog) == test_hash
+
 
 class TestWriteChangelogEntry:
     """Tests for write_changelog_entry function."""
@@ -133,17 +265,75 @@ class TestWriteChangelogEntry:
         assert new_summary in content
         assert old_content.strip() in content
 
+    def test_entry_without_hash_keeps_marker_on_top(self, tmp_path):
+        """Test that historical entries are inserted below the state marker."""
+        changelog = tmp_path / "CHANGELOG.md"
+        test_hash = "abc123def456789012345678901234567890abcd"
+        changelog.write_text(
+            f"<!-- CHANGELOG_STATE: {test_hash} -->\n\n## [2025-01-14]\n"
+        )
+
+        write_changelog_entry(changelog, None, "## [2024-01-01 to 2024-01-07]\n")
+
+        assert changelog.read_text() == (
+            f"<!-- CHANGELOG_STATE: {test_hash} -->\n\n"
+            "## [2024-01-01 to 2024-01-07]\n\n\n"
+            "## [2025-01-14]\n"
+        )
+
+    def test_large_file_copied_through(self, tmp_path):
+        """Test that a changelog larger than the copy chunks is preserved."""
+        changelog = tmp_path / "CHANGELOG.md"
+        old_hash = "a" * 40
+        body = "".join(f"## [entry {n}]\n\n- change {n}\n\n" for n in range(200_000))
+        changelog.write_text(f"<!-- CHANGELOG_STATE: {old_hash} -->\n\n{body}")
+
+        write_changelog_entry(changelog, "b" * 40, "## [new]\n")
+
+        content = changelog.read_text()
+        assert content.startswith(f"<!-- CHANGELOG_STATE: {'b' * 40} -->\n\n## [new]")
+        assert content.endswith(body)
+        assert old_hash not in content
+
+    def test_failed_write_leaves_original(self, tmp_path):
+        """Test that an error mid-write keeps the old file and no temp files."""
+        changelog = tmp_path / "CHANGELOG.md"
+        changelog.write_text("## [2025-01-14]\n\n- Old entry\n")
+
+        with patch(
+            "automated_changelog.git_state.shutil.copyfileobj",
+            side_effect=OSError("disk full"),
+        ):
+            with pytest.raises(OSError):
+                write_changelog_entry(changelog, "a" * 40, "## [new]\n")
+
+        assert changelog.read_text() == "## [2025-01-14]\n\n- Old entry\n"
+        assert list(tmp_path.iterdir()) == [changelog]
+
+    def test_preserves_file_mode(self, tmp_path):
+        """Test that the replaced file keeps its permissions."""
+        changelog = tmp_path / "CHANGELOG.md"
+        changelog.write_text("## Old\n")
+        changelog.chmod(0o664)
+
+        write_changelog_entry(changelog, "a" * 40, "## New\n")
+
+        assert changelog.stat().st_mode & 0o777 == 0o664
+
 
 class TestFetchCommits:
     """Tests for fetch_commits function."""
 
-    @patch("automated_changelog.git_state.subprocess.run")
-    def test_fetch_commits_with_no_last_hash(self, mock_run):
+    @patch("automated_changelog.git_state.subprocess.Popen")
+    def test_fetch_commits_with_no_last_hash(self, mock_popen):
         """Test fetching commits when no last hash provided."""
         # Mock git log output
-        mock_result = MagicMock()
-        mock_result.stdout = "abc123def456789012345678901234567890abcd|||a1b2c3d|||John Doe|||2025-10-27 14:32:15 -0700|||Initial commit"
-        mock_run.return_value = mock_result
+        mock_git_log(
+            mock_popen,
+            [
+                "abc123def456789012345678901234567890abcd|||abc123d|||John Doe|||2025-10-27 14:32:15 -0700|||Initial commit"
+            ],
+        )
 
         # Fetch commits
         commits = fetch_commits()
@@ -151,26 +341,30 @@ class TestFetchCommits:
         assert len(commits) == 1
         commit = commits[0]
         assert len(commit["hash"]) == 40  # Full SHA-1 hash
-        assert commit["short_hash"] == "a1b2c3d"
+        assert commit["short_hash"] == "abc123d"
         assert commit["author"] == "John Doe"
         assert commit["date"] == "2025-10-27 14:32"
         assert commit["subject"] == "Initial commit"
 
         # Verify git log was called correctly (without commit range)
-        mock_run.assert_called_once()
-        args = mock_run.call_args[0][0]
+        mock_popen.assert_called_once()
+        args = mock_popen.call_args[0][0]
         assert args[0] == "git"
         assert "log" in args
+        assert "-z" in args
         assert "--pretty=format:%H|||%h|||%an|||%ai|||%s" in args
 
-    @patch("automated_changelog.git_state.subprocess.run")
-    def test_fetch_commits_with_last_hash(self, mock_run):
+    @patch("automated_changelog.git_state.subprocess.Popen")
+    def test_fetch_commits_with_last_hash(self, mock_popen):
         """Test fetching commits since a specific hash."""
         # Mock git log output
         first_hash = "abc123def456789012345678901234567890abcd"
-        mock_result = MagicMock()
-        mock_result.stdout = "def456789012345678901234567890abcdef456|||d4e5f67|||Jane Smith|||2025-10-26 10:15:42 -0700|||Second commit"
-        mock_run.return_value = mock_result
+        mock_git_log(
+            mock_popen,
+            [
+                "def456789012345678901234567890abcdef456|||d4e5f67|||Jane Smith|||2025-10-26 10:15:42 -0700|||Second commit"
+            ],
+        )
 
         # Fetch commits since first hash
         commits = fetch_commits(last_commit_hash=first_hash)
@@ -180,60 +374,366 @@ class TestFetchCommits:
         assert commit["subject"] == "Second commit"
 
         # Verify git log was called with commit range
-        mock_run.assert_called_once()
-        args = mock_run.call_args[0][0]
+        mock_popen.assert_called_once()
+        args = mock_popen.call_args[0][0]
         assert f"{first_hash}..HEAD" in args
 
-    @patch("automated_changelog.git_state.subprocess.run")
-    def test_fetch_commits_returns_empty_when_no_new_commits(self, mock_run):
+    @patch("automated_changelog.git_state.subprocess.Popen")
+    def test_fetch_commits_returns_empty_when_no_new_commits(self, mock_popen):
         """Test that fetch returns empty list when no new commits."""
         # Mock empty git log output
         head_hash = "abc123def456789012345678901234567890abcd"
-        mock_result = MagicMock()
-        mock_result.stdout = ""
-        mock_run.return_value = mock_result
+        mock_git_log(mock_popen, [])
 
         # Fetch commits since HEAD (should be empty)
         commits = fetch_commits(last_commit_hash=head_hash)
 
         assert len(commits) == 0
 
-    @patch("automated_changelog.git_state.subprocess.run")
-    def test_fetch_commits_raises_on_invalid_repo(self, mock_run):
+    @patch("automated_changelog.git_state.subprocess.Popen")
+    def test_fetch_commits_raises_on_invalid_repo(self, mock_popen):
         """Test that function raises error for invalid git repo."""
-        # Mock subprocess error
-        mock_run.side_effect = subprocess.CalledProcessError(128, "git")
+        # Mock git exiting with an error
+        mock_git_log(mock_popen, [], returncode=128, stderr=b"not a git repository")
 
-        with pytest.raises(subprocess.CalledProcessError):
+        with pytest.raises(subprocess.CalledProcessError) as exc_info:
             fetch_commits()
 
-    @patch("automated_changelog.git_state.subprocess.run")
-    def test_fetch_multiple_commits(self, mock_run):
+        assert exc_info.value.returncode == 128
+        assert "not a git repository" in exc_info.value.stderr
+
+    @patch("automated_changelog.git_state.subprocess.Popen")
+    def test_fetch_commits_raises_when_git_missing(self, mock_popen):
+        """Test that a missing git executable propagates FileNotFoundError."""
+        mock_popen.side_effect = FileNotFoundError("git")
+
+        with pytest.raises(FileNotFoundError):
+            fetch_commits()
+
+    @patch("automated_changelog.git_state.subprocess.Popen")
+    def test_fetch_multiple_commits(self, mock_popen):
         """Test fetching multiple commits."""
         # Mock multiple commits in git log output
-        mock_result = MagicMock()
-        mock_result.stdout = (
-            "333333333333333333333333333333333333333333|||3333333|||Alice|||2025-10-24 09:20:11 -0700|||Third\n"
-            "222222222222222222222222222222222222222222|||2222222|||Bob|||2025-10-23 08:15:22 -0700|||Second\n"
-            "111111111111111111111111111111111111111111|||1111111|||Charlie|||2025-10-22 07:10:33 -0700|||First"
+        mock_git_log(
+            mock_popen,
+            [
+                "333333333333333333333333333333333333333333|||3333333|||Alice|||2025-10-24 09:20:11 -0700|||Third",
+                "222222222222222222222222222222222222222222|||2222222|||Bob|||2025-10-23 08:15:22 -0700|||Second",
+                "111111111111111111111111111111111111111111|||1111111|||Charlie|||2025-10-22 07:10:33 -0700|||First",
+            ],
         )
-        mock_run.return_value = mock_result
 
         # Fetch all commits
         commits = fetch_commits()
 
+        assert all(isinstance(commit, Commit) for commit in commits)
         assert len(commits) == 3
         # Commits are in reverse chronological order (newest first)
         assert commits[0]["subject"] == "Third"
         assert commits[1]["subject"] == "Second"
         assert commits[2]["subject"] == "First"
 
+    @patch("automated_changelog.git_state.subprocess.Popen")
+    def test_fetch_commits_with_max_count(self, mock_popen):
+        """Test that max_count is passed through to git log."""
+        mock_git_log(mock_popen, [])
+
+        fetch_commits(max_count=500)
+
+        args = mock_popen.call_args[0][0]
+        assert "--max-count=500" in args
+
+    @patch("automated_changelog.git_state.subprocess.Popen")
+    def test_subject_containing_field_separator(self, mock_popen):
+        """Test that subjects containing the field separator are kept intact."""
+        mock_git_log(
+            mock_popen,
+            [log_record(1, "Split a|||b", "Ann")],
+        )
+
+        commits = fetch_commits()
+
+        assert commits[0]["subject"] == "Split a|||b"
+
+
+class TestIterCommits:
+    """Tests for the streaming iter_commits reader."""
+
+    @patch("automated_changelog.git_state.READ_CHUNK_SIZE", 7)
+    @patch("automated_changelog.git_state.subprocess.Popen")
+    def test_records_split_across_reads(self, mock_popen):
+        """Test that records spanning several pipe reads are reassembled."""
+        mock_git_log(
+            mock_popen,
+            [log_record(n, f"Commit {n}", f"Author {n}") for n in range(1, 4)],
+        )
+
+        commits = list(iter_commits())
+
+        assert [c["subject"] for c in commits] == ["Commit 1", "Commit 2", "Commit 3"]
+        assert commits[2]["author"] == "Author 3"
+
+    @patch("automated_changelog.git_state.subprocess.Popen")
+    def test_with_paths_parses_file_lists(self, mock_popen):
+        """Test that --name-only output is attached to each commit."""
+        mock_git_log(
+            mock_popen,
+            [
+                log_record(3, "Empty", "A"),
+                log_record(2, "Docs\ndocs/a.md", "B"),
+                "docs/b.md",
+                "",
+                log_record(1, "Code\nsrc/app.py", "C"),
+            ],
+        )
+
+        commits = fetch_commits(with_paths=True)
+
+        assert "--name-only" in mock_popen.call_args[0][0]
+        assert [c["subject"] for c in commits] == ["Empty", "Docs", "Code"]
+        assert commits[0]["paths"] == ()
+        assert commits[1]["paths"] == ("docs/a.md", "docs/b.md")
+        assert commits[2]["paths"] == ("src/app.py",)
+
+    @patch("automated_changelog.git_state.subprocess.Popen")
+    def test_without_paths_has_no_paths_key(self, mock_popen):
+        """Test that commits fetched without paths don't expose the key."""
+        mock_git_log(
+            mock_popen,
+            [log_record(1, "Code", "C")],
+        )
+
+        commit = fetch_commits()[0]
+
+        assert "paths" not in commit
+        assert commit.get("paths") is None
+
+    @patch("automated_changelog.git_state.subprocess.Popen")
+    def test_with_stats_parses_numstat(self, mock_popen):
+        """Test that --numstat output is aggregated, including renames and binaries."""
+        mock_git_log(
+            mock_popen,
+            [
+                log_record(2, "Move\n3\t1\t", "B"),
+                "src/auth/old.py",
+                "src/auth/login.py",
+                "-\t-\tdocs/logo.png",
+                "10\t0\tsrc/auth/tokens.py",
+                "",
+                log_record(1, "Merge", "C"),
+            ],
+        )
+
+        commits = fetch_commits(with_paths=True, with_stats=True)
+
+        command = mock_popen.call_args[0][0]
+        assert "--numstat" in command
+        assert "--name-only" not in command
+        assert commits[0]["paths"] == (
+            "src/auth/login.py",
+            "docs/logo.png",
+            "src/auth/tokens.py",
+        )
+        assert commits[0]["stats"] == DiffStat(
+            3, 13, 1, (("src/auth", 14), ("docs", 0))
+        )
+        assert commits[1]["paths"] == ()
+        assert commits[1]["stats"] == DiffStat()
+
+    @pytest.mark.parametrize("with_stats", [False, True])
+    @patch("automated_changelog.git_state.subprocess.Popen")
+    def test_caps_paths_per_commit(self, mock_popen, with_stats):
+        """Test that a commit touching more files than the cap is truncated."""
+        files = [f"vendor/lib/f{n}.c" for n in range(MAX_COMMIT_PATHS + 5)]
+        files.append("src/app.py")
+        if with_stats:
+            files = [f"1\t0\t{path}" for path in files]
+        mock_git_log(
+            mock_popen,
+            [log_record(2, "Vendor lib\n" + files[0], "B"), *files[1:-1], ""]
+            + [log_record(1, "Fix\n" + files[-1], "C")],
+        )
+
+        commits = fetch_commits(with_paths=True, with_stats=with_stats)
+
+        assert len(commits[0]["paths"]) == MAX_COMMIT_PATHS
+        assert commits[0]["paths_truncated"] is True
+        assert commits[1]["paths"] == ("src/app.py",)
+        assert "paths_truncated" not in commits[1]
+        if with_stats:
+            assert commits[0]["stats"].files == MAX_COMMIT_PATHS + 5
+
+    @patch("automated_changelog.git_state.subprocess.Popen")
+    def test_with_stats_only_keeps_no_paths(self, mock_popen):
+        """Test that stats can be fetched without keeping the file lists."""
+        mock_git_log(
+            mock_popen,
+            [
+                log_record(1, "Code\n2\t2\tREADME.md", "C"),
+            ],
+        )
+
+        commit = fetch_commits(with_stats=True)[0]
+
+        assert "paths" not in commit
+        assert commit["stats"] == DiffStat(1, 2, 2, ((".", 4),))
+
+    @patch("automated_changelog.git_state.subprocess.Popen")
+    def test_with_body_parses_bodies(self, mock_popen):
+        """Test that %b bodies are captured between their control characters."""
+        mock_git_log(
+            mock_popen,
+            [
+                log_record(
+                    2,
+                    "Fix login\x1fTokens expired early.\n\n"
+                    "Signed-off-by: B <b@example.com>\n\x1e",
+                    "B",
+                ),
+                log_record(1, "Tweak\x1f\x1e", "C"),
+            ],
+        )
+
+        commits = fetch_commits(with_body=True)
+
+        assert mock_popen.call_args[0][0][-1].endswith("%s%x1f%b%x1e")
+        assert commits[0]["subject"] == "Fix login"
+        assert commits[0]["body"] == "Tokens expired early."
+        assert commits[1]["body"] == ""
+
+    @patch("automated_changelog.git_state.subprocess.Popen")
+    def test_with_body_and_paths(self, mock_popen):
+        """Test that body lines are not mistaken for file names."""
+        mock_git_log(
+            mock_popen,
+            [
+                log_record(2, "Docs\x1fFirst line\nsecond line\n\x1e\ndocs/a.md", "B"),
+                "",
+                log_record(1, "Merge\x1f\x1e", "C"),
+            ],
+        )
+
+        commits = fetch_commits(with_paths=True, with_body=True)
+
+        assert commits[0]["paths"] == ("docs/a.md",)
+        assert commits[0]["body"] == "First line\nsecond line"
+        assert commits[1]["paths"] == ()
+        assert commits[1]["body"] == ""
+
+    def test_noisy_stderr_does_not_block(self, tmp_path, monkeypatch):
+        """Test that git writing more than a pipe buffer to stderr can't hang."""
+        fake_git = tmp_path / "git"
+        record = "1" * 40 + "|||1111111|||A|||2025-10-22 07:10:33 -0700|||Done"
+        fake_git.write_text(
+            "#!/bin/sh\n"
+            "head -c 1000000 /dev/zero | tr '\\0' w >&2\n"
+            f"printf '{record}'\n"
+            "exit 1\n"
+        )
+        fake_git.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+        with pytest.raises(subprocess.CalledProcessError) as exc_info:
+            list(iter_commits())
+
+        assert len(exc_info.value.stderr) == 1000000
+
+    @patch("automated_changelog.git_state.subprocess.Popen")
+    def test_is_lazy(self, mock_popen):
+        """Test that git is not started until iteration begins."""
+        mock_git_log(mock_popen, [])
+
+        commits = iter_commits()
+
+        assert not mock_popen.called
+        assert list(commits) == []
+        assert mock_popen.called
+
+    @patch("automated_changelog.git_state.subprocess.Popen")
+    def test_early_stop_kills_git(self, mock_popen):
+        """Test that abandoning the iterator terminates the git process."""
+        process = mock_git_log(
+            mock_popen,
+            [
+                log_record(1, "First", "A"),
+                log_record(2, "Second", "B"),
+            ],
+        )
+        process.poll.return_value = None
+
+        commits = iter_commits()
+        assert next(commits)["subject"] == "First"
+        commits.close()
+
+        process.kill.assert_called_once()
+
+
+class TestStatCounter:
+    """Tests for the per-commit diff stat aggregation."""
+
+    def test_keeps_busiest_directories(self):
+        """Test that directories are ranked by changed lines, then name."""
+        counter = StatCounter()
+        counter.add("src/auth/login.py", 5, 5)
+        counter.add("src/api/v1/routes.py", 30, 0)
+        counter.add("tests/test_auth.py", 2, 0)
+        counter.add("docs/index.md", 2, 0)
+
+        stats = counter.result()
+
+        assert stats.files == 4
+        assert (stats.insertions, stats.deletions) == (39, 5)
+        assert stats.directories == (("src/api", 30), ("src/auth", 10), ("docs", 2))
+
+    def test_caps_tracked_directories(self):
+        """Test that a huge vendoring commit tracks a bounded set of directories."""
+        counter = StatCounter()
+        for n in range(5000):
+            counter.add(f"vendor/pkg{n}/module.py", 1, 0)
+
+        stats = counter.result()
+
+        assert len(counter.directories) == MAX_STAT_DIRECTORIES + 1
+        assert stats.files == 5000
+        assert stats.directories[0] == (
+            STAT_OTHER_DIRECTORIES,
+            5000 - MAX_STAT_DIRECTORIES,
+        )
+
+
+class TestCleanBody:
+    """Tests for commit body cleanup."""
+
+    def test_strips_trailers_and_blank_lines(self):
+        """Test that trailers and cherry-pick notes are dropped."""
+        body = (
+            "  Retry on 503 responses.\n\n"
+            "Fixes: #42\n"
+            "(cherry picked from commit 0123456789abcdef)\n\n"
+            "Signed-off-by: A <a@example.com>\n"
+            "Co-authored-by: B <b@example.com>\n"
+            "Reviewed-By: C <c@example.com>\n"
+            "Change-Id: I0123456789\n"
+        )
+
+        assert clean_body(body) == "Retry on 503 responses.\nFixes: #42"
+        assert clean_body("Signed-off-by: A <a@example.com>\n") == ""
+
+    def test_truncates_to_token_budget(self):
+        """Test that long bodies are cut to about max_tokens tokens."""
+        body = "word " * 10000
+
+        cleaned = clean_body(body, max_tokens=10)
+
+        assert len(cleaned) <= 41
+        assert cleaned.endswith("…")
+
 
 class TestIntegration:
     """Integration tests combining multiple functions."""
 
-    @patch("automated_changelog.git_state.subprocess.run")
-    def test_full_workflow(self, mock_run, tmp_path):
+    @patch("automated_changelog.git_state.subprocess.Popen")
+    def test_full_workflow(self, mock_popen, tmp_path):
         """Test the complete workflow: read, fetch, write."""
         first_hash = "abc123def456789012345678901234567890abcd"
         second_hash = "def456789012345678901234567890abcdef456"
@@ -249,9 +749,12 @@ class TestIntegration:
         assert read_hash == first_hash
 
         # Mock fetching new commits
-        mock_result = MagicMock()
-        mock_result.stdout = f"{second_hash}|||d4e5f67|||John|||2025-10-27 15:45:30 -0700|||Second commit"
-        mock_run.return_value = mock_result
+        mock_git_log(
+            mock_popen,
+            [
+                f"{second_hash}|||d4e5f67|||John|||2025-10-27 15:45:30 -0700|||Second commit"
+            ],
+        )
 
         # Fetch new commits
         new_commits = fetch_commits(last_commit_hash=read_hash)
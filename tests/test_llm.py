@@ -0,0 +1,469 @@
+"""Tests for llm module."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import litellm
+import pytest
+
+from automated_changelog.llm import (
+    AsyncLLMClient,
+    LatencyTracker,
+    RateLimiter,
+    RetryPolicy,
+    acall_llm,
+    call_llm,
+    estimate_tokens,
+    is_retryable,
+)
+
+CLIENT_CONFIG = {"api_base": "http://proxy", "api_key": "sk-test"}
+
+
+def make_response(content, completion_tokens=0):
+    message = SimpleNamespace(content=content)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=message)],
+        usage=SimpleNamespace(completion_tokens=completion_tokens),
+    )
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestEstimateTokens:
+    """Tests for estimate_tokens function."""
+
+    def test_roughly_four_chars_per_token(self):
+        """Test the character-based token heuristic."""
+        assert estimate_tokens("") == 1
+        assert estimate_tokens("x" * 400) == 101
+
+
+class TestRateLimiter:
+    """Tests for RateLimiter class."""
+
+    def test_unlimited_never_waits(self):
+        """Test that a limiter without limits never delays requests."""
+        limiter = RateLimiter()
+
+        assert all(limiter.reserve(10_000) == 0 for _ in range(100))
+
+    def test_requests_per_minute(self):
+        """Test that requests beyond the per-minute budget are delayed."""
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=60, clock=clock)
+
+        delays = [limiter.reserve(0) for _ in range(62)]
+
+        assert delays[:60] == [0.0] * 60
+        assert delays[60] == pytest.approx(1.0)
+        assert delays[61] == pytest.approx(2.0)
+
+    def test_tokens_refill_over_time(self):
+        """Test that the token bucket refills at the per-minute rate."""
+        clock = FakeClock()
+        limiter = RateLimiter(tokens_per_minute=600, clock=clock)
+
+        assert limiter.reserve(600) == 0
+        assert limiter.reserve(60) == pytest.approx(6.0)
+
+        clock.now = 12.0
+        assert limiter.reserve(60) == pytest.approx(0.0)
+
+    def test_charge_delays_later_requests(self):
+        """Test that charged completion tokens count against the budget."""
+        clock = FakeClock()
+        limiter = RateLimiter(tokens_per_minute=600, clock=clock)
+
+        limiter.reserve(100)
+        limiter.charge(500)
+
+        assert limiter.reserve(60) == pytest.approx(6.0)
+
+
+class TestRetryPolicy:
+    """Tests for RetryPolicy and is_retryable."""
+
+    def test_transient_errors_are_retryable(self):
+        """Test which failures are considered transient."""
+        assert is_retryable(StatusError(429))
+        assert is_retryable(StatusError(503))
+        assert is_retryable(asyncio.TimeoutError())
+        assert is_retryable(ConnectionResetError())
+        assert not is_retryable(StatusError(400))
+        assert not is_retryable(StatusError(401))
+        assert not is_retryable(ValueError("bad"))
+
+    def test_backoff_is_exponential_with_full_jitter(self):
+        """Test that the backoff ceiling doubles per retry up to the maximum."""
+        policy = RetryPolicy(backoff_base=1.0, backoff_max=5.0, rng=lambda: 1.0)
+
+        assert [policy.backoff(n) for n in range(4)] == [1.0, 2.0, 4.0, 5.0]
+        assert RetryPolicy(rng=lambda: 0.5).backoff(1) == 1.0
+
+    def test_from_config(self):
+        """Test reading the policy from the llm config section."""
+        policy = RetryPolicy.from_config({"timeout": 30, "hedge_percentile": 90})
+
+        assert policy.timeout == 30
+        assert policy.max_retries == 3
+        assert policy.hedge_percentile == 90
+
+
+class TestLatencyTracker:
+    """Tests for LatencyTracker class."""
+
+    def test_percentile_and_summary(self):
+        """Test nearest-rank percentiles over successful attempts only."""
+        tracker = LatencyTracker()
+        for seconds in range(1, 11):
+            tracker.record(float(seconds), "ok")
+        tracker.record(60.0, "timeout")
+        tracker.retries = 1
+
+        assert tracker.percentile(50) == 5.0
+        assert tracker.percentile(95) == 10.0
+        assert tracker.summary() == (
+            "11 attempts (1 failed), p50 5.0s, p95 10.0s, max 10.0s, 1 retries"
+        )
+
+    def test_empty(self):
+        """Test that no attempts means no percentile."""
+        assert LatencyTracker().percentile(50) is None
+
+
+@patch("automated_changelog.llm.get_llm_client", return_value=CLIENT_CONFIG)
+@patch("automated_changelog.llm.acompletion")
+class TestRetries:
+    """Tests for timeouts, retries and hedging in AsyncLLMClient."""
+
+    def run_client(self, client, prompts=1):
+        sleeps = []
+        real_sleep = asyncio.sleep
+
+        async def fake_sleep(seconds):
+            sleeps.append(seconds)
+            await real_sleep(0)
+
+        async def run():
+            async with client:
+                return await asyncio.gather(
+                    *(client.complete("p") for _ in range(prompts))
+                )
+
+        with patch("automated_changelog.llm.asyncio.sleep", fake_sleep):
+            return asyncio.run(run()), sleeps
+
+    def test_retries_transient_errors(self, mock_completion, mock_client):
+        """Test that 429 and 5xx responses are retried with backoff."""
+        mock_completion.side_effect = [
+            StatusError(429),
+            StatusError(502),
+            make_response("ok"),
+        ]
+        client = AsyncLLMClient(retry_policy=RetryPolicy(rng=lambda: 1.0))
+
+        results, sleeps = self.run_client(client)
+
+        assert results == ["ok"]
+        assert sleeps == [1.0, 2.0]
+        assert client.latency.retries == 2
+        assert [outcome for _, outcome in client.latency.attempts] == [
+            "error",
+            "error",
+            "ok",
+        ]
+
+    def test_gives_up_after_max_retries(self, mock_completion, mock_client):
+        """Test that the last error is raised once retries are exhausted."""
+        mock_completion.side_effect = StatusError(500)
+        client = AsyncLLMClient(retry_policy=RetryPolicy(max_retries=2))
+
+        with pytest.raises(StatusError):
+            self.run_client(client)
+
+        assert mock_completion.call_count == 3
+
+    def test_permanent_errors_not_retried(self, mock_completion, mock_client):
+        """Test that client errors fail immediately."""
+        mock_completion.side_effect = StatusError(400)
+        client = AsyncLLMClient()
+
+        with pytest.raises(StatusError):
+            self.run_client(client)
+
+        assert mock_completion.call_count == 1
+
+    def test_timeout_is_retried(self, mock_completion, mock_client):
+        """Test that a hanging request times out and is sent again."""
+        calls = 0
+
+        async def fake_completion(**kwargs):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.Event().wait()
+            return make_response("ok")
+
+        mock_completion.side_effect = fake_completion
+        client = AsyncLLMClient(retry_policy=RetryPolicy(timeout=0.01))
+
+        results, _ = self.run_client(client)
+
+        assert results == ["ok"]
+        assert client.latency.attempts[0][1] == "timeout"
+
+    def test_hedged_request_wins(self, mock_completion, mock_client):
+        """Test that a slow request is hedged and the faster answer is used."""
+        calls = 0
+
+        async def fake_completion(**kwargs):
+            nonlocal calls
+            calls += 1
+            if calls == 3:
+                # The third request stalls; its hedge answers instead
+                await asyncio.Event().wait()
+            await asyncio.sleep(0.001)
+            return make_response(f"answer {calls}")
+
+        mock_completion.side_effect = fake_completion
+        client = AsyncLLMClient(
+            max_concurrency=1,
+            retry_policy=RetryPolicy(hedge_percentile=50, hedge_min_samples=2),
+        )
+
+        async def run():
+            async with client:
+                return [await client.complete("p") for _ in range(3)]
+
+        assert asyncio.run(run()) == ["answer 1", "answer 2", "answer 4"]
+        assert client.latency.hedges == 1
+        assert client.latency.hedge_wins == 1
+        assert client.latency.attempts[-1][1] == "cancelled"
+
+
+@patch("automated_changelog.llm.get_llm_client", return_value=CLIENT_CONFIG)
+@patch("automated_changelog.llm.completion")
+def test_call_llm_retries(mock_completion, mock_client):
+    """Test that the synchronous call retries and passes the timeout."""
+    mock_completion.side_effect = [StatusError(503), make_response("ok")]
+
+    with patch("automated_changelog.llm.time.sleep") as mock_sleep:
+        result = call_llm("prompt", retry_policy=RetryPolicy(timeout=5))
+
+    assert result == "ok"
+    mock_sleep.assert_called_once()
+    assert mock_completion.call_args.kwargs["timeout"] == 5
+
+
+@patch("automated_changelog.llm.get_llm_client", return_value=CLIENT_CONFIG)
+@patch("automated_changelog.llm.acompletion")
+class TestAsyncLLMClient:
+    """Tests for AsyncLLMClient class."""
+
+    def test_complete(self, mock_completion, mock_client):
+        """Test a single completion through the async client."""
+        mock_completion.return_value = make_response("- summary")
+
+        async def run():
+            async with AsyncLLMClient() as client:
+                return await client.complete("prompt", model="m", max_tokens=10)
+
+        assert asyncio.run(run()) == "- summary"
+        kwargs = mock_completion.call_args.kwargs
+        assert kwargs["model"] == "m"
+        assert kwargs["max_tokens"] == 10
+        assert kwargs["api_base"] == "http://proxy"
+        assert kwargs["messages"] == [{"role": "user", "content": "prompt"}]
+
+    def test_credentials_resolved_once(self, mock_completion, mock_client):
+        """Test that many requests share one credential lookup."""
+        mock_completion.return_value = make_response("ok")
+
+        async def run():
+            async with AsyncLLMClient() as client:
+                await asyncio.gather(*(client.complete("p") for _ in range(5)))
+
+        asyncio.run(run())
+
+        assert mock_completion.call_count == 5
+        mock_client.assert_called_once()
+
+    def test_concurrency_is_bounded(self, mock_completion, mock_client):
+        """Test that no more than max_concurrency requests are in flight."""
+        in_flight = 0
+        peak = 0
+
+        async def fake_completion(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return make_response("ok")
+
+        mock_completion.side_effect = fake_completion
+
+        async def run():
+            async with AsyncLLMClient(max_concurrency=2) as client:
+                await asyncio.gather(*(client.complete("p") for _ in range(6)))
+
+        asyncio.run(run())
+
+        assert peak == 2
+
+    def test_rate_limit_waits(self, mock_completion, mock_client):
+        """Test that the client sleeps for the delay the rate limiter asks for."""
+        mock_completion.return_value = make_response("ok", completion_tokens=5)
+        client = AsyncLLMClient(requests_per_minute=1)
+        sleeps = []
+
+        async def fake_sleep(seconds):
+            sleeps.append(seconds)
+
+        async def run():
+            async with client:
+                await client.complete("p")
+                await client.complete("p")
+
+        with patch("automated_changelog.llm.asyncio.sleep", fake_sleep):
+            asyncio.run(run())
+
+        assert len(sleeps) == 1
+        assert sleeps[0] == pytest.approx(60, rel=0.01)
+
+    def test_shared_session_installed_and_closed(self, mock_completion, mock_client):
+        """Test that one HTTP session is shared while the client is open."""
+        sessions = []
+
+        async def fake_completion(**kwargs):
+            sessions.append(litellm.aclient_session)
+            return make_response("ok")
+
+        mock_completion.side_effect = fake_completion
+
+        async def run():
+            async with AsyncLLMClient() as client:
+                await asyncio.gather(*(client.complete("p") for _ in range(3)))
+
+        asyncio.run(run())
+
+        assert sessions[0] is not None
+        assert all(session is sessions[0] for session in sessions)
+        assert sessions[0].is_closed
+        assert litellm.aclient_session is None
+
+    def test_client_reusable_across_event_loops(self, mock_completion, mock_client):
+        """Test that a client can serve several asyncio.run calls."""
+        mock_completion.return_value = make_response("ok")
+        client = AsyncLLMClient()
+
+        async def run():
+            try:
+                return await client.complete("p")
+            finally:
+                await client.aclose()
+
+        assert asyncio.run(run()) == "ok"
+        assert asyncio.run(run()) == "ok"
+
+    def test_acall_llm(self, mock_completion, mock_client):
+        """Test the one-off acall_llm helper."""
+        mock_completion.return_value = make_response("- done")
+
+        assert asyncio.run(acall_llm("prompt")) == "- done"
+        assert litellm.aclient_session is None
+
+    def test_missing_credentials_raise(self, mock_completion, mock_client):
+        """Test that missing credentials surface as ValueError."""
+        mock_client.side_effect = ValueError("No LLM API credentials found.")
+
+        with pytest.raises(ValueError):
+            asyncio.run(acall_llm("prompt"))
+
+        assert not mock_completion.called
+
+
+def make_stream(*texts):
+    """Async iterator of streamed chunks, like litellm with stream=True."""
+
+    async def stream():
+        for text in texts:
+            delta = SimpleNamespace(content=text)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+    return stream()
+
+
+@patch("automated_changelog.llm.get_llm_client", return_value=CLIENT_CONFIG)
+@patch("automated_changelog.llm.acompletion")
+class TestStreaming:
+    """Tests for streamed completions."""
+
+    def test_streamed_text_matches_complete_text(self, mock_completion, mock_client):
+        """Test that streaming passes each piece on and returns the same text."""
+        pieces = []
+
+        async def fake_completion(**kwargs):
+            if kwargs.get("stream"):
+                return make_stream("- Added", " things", None, "\n")
+            return make_response("- Added things\n")
+
+        mock_completion.side_effect = fake_completion
+
+        async def run():
+            async with AsyncLLMClient() as client:
+                streamed = await client.complete("p", on_token=pieces.append)
+                plain = await client.complete("p")
+            return streamed, plain
+
+        streamed, plain = asyncio.run(run())
+
+        assert streamed == plain == "- Added things\n"
+        assert pieces == ["- Added", " things", "\n"]
+
+    def test_no_retry_after_output(self, mock_completion, mock_client):
+        """Test that a stream failing midway is not sent again."""
+
+        async def broken_stream():
+            delta = SimpleNamespace(content="- partial")
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+            raise StatusError(503)
+
+        async def fake_completion(**kwargs):
+            return broken_stream()
+
+        mock_completion.side_effect = fake_completion
+
+        with pytest.raises(StatusError):
+            asyncio.run(acall_llm("p", on_token=lambda text: None))
+
+        assert mock_completion.call_count == 1
+
+
+@patch("automated_changelog.llm.get_llm_client", return_value=CLIENT_CONFIG)
+@patch("automated_changelog.llm.completion")
+def test_call_llm_streams(mock_completion, mock_client):
+    """Test that the synchronous call streams through on_token as well."""
+    delta = [SimpleNamespace(content=text) for text in ("a", "b")]
+    mock_completion.return_value = iter(
+        SimpleNamespace(choices=[SimpleNamespace(delta=d)]) for d in delta
+    )
+    pieces = []
+
+    assert call_llm("prompt", on_token=pieces.append) == "ab"
+    assert pieces == ["a", "b"]
+    assert mock_completion.call_args.kwargs["stream"] is True
@@ -0,0 +1,87 @@
+"""Tests for profiling module."""
+
+import json
+
+import pytest
+
+from automated_changelog.profiling import StageTimer, profile_run
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStageTimer:
+    """Tests for StageTimer class."""
+
+    def test_stages_accumulate_in_order(self):
+        """Test that re-entered stages add up and keep first-run order."""
+        clock = FakeClock()
+        timer = StageTimer(clock=clock)
+        with timer.stage("fetch"):
+            clock.now += 2.0
+        with timer.stage("render"):
+            clock.now += 0.5
+        with timer.stage("fetch"):
+            clock.now += 1.0
+
+        assert timer.stages == {"fetch": 3.0, "render": 0.5}
+
+    def test_stage_timed_on_error(self):
+        """Test that a failing stage still records its time."""
+        clock = FakeClock()
+        timer = StageTimer(clock=clock)
+        with pytest.raises(RuntimeError), timer.stage("fetch"):
+            clock.now += 1.5
+            raise RuntimeError("boom")
+
+        assert timer.stages == {"fetch": 1.5}
+
+    def test_add_measured_time(self):
+        """Test that time measured elsewhere joins the stage totals."""
+        clock = FakeClock()
+        timer = StageTimer(clock=clock)
+        timer.add("filter", 0.25)
+        with timer.stage("filter"):
+            clock.now += 1.0
+
+        assert timer.stages == {"filter": 1.25}
+
+    def test_report_and_dict(self):
+        """Test the text breakdown and its JSON form."""
+        clock = FakeClock()
+        timer = StageTimer(clock=clock)
+        with timer.stage("fetch_commits"):
+            clock.now += 3.0
+        clock.now += 1.0
+        timer.count("llm_tokens_in", 1200)
+        timer.count("llm_tokens_in", 300)
+
+        report = timer.report()
+        assert "fetch_commits     3.000s   75.0%" in report
+        assert "other             1.000s" in report
+        assert "total             4.000s" in report
+        assert "llm_tokens_in: 1,500" in report
+        assert timer.to_dict() == {
+            "total_seconds": 4.0,
+            "stages": {"fetch_commits": 3.0},
+            "counters": {"llm_tokens_in": 1500},
+        }
+
+
+def test_profile_run_reports_on_failure(tmp_path):
+    """Test that the report and JSON are written even if the run fails."""
+    reports = []
+    json_path = tmp_path / "profile.json"
+    timer = StageTimer()
+    with pytest.raises(ValueError):
+        with profile_run(timer, echo=reports.append, json_path=json_path):
+            with timer.stage("load_config"):
+                raise ValueError("bad config")
+
+    assert reports and reports[0].startswith("Profile:")
+    assert list(json.loads(json_path.read_text())["stages"]) == ["load_config"]
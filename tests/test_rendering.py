@@ -0,0 +1,116 @@
+"""Tests for rendering module."""
+
+import io
+
+import pytest
+
+from automated_changelog.config import ConfigError
+from automated_changelog.git_state import Commit
+from automated_changelog.rendering import EntryRenderer, compile_template
+
+
+def make_commit(n, subject="feat: change"):
+    return Commit(
+        hash=f"{n:040x}",
+        author="Test Author",
+        date="2025-01-01 12:00:00",
+        subject=f"{subject} {n}",
+    )
+
+
+class TestCompileTemplate:
+    """Tests for compile_template function."""
+
+    def test_placeholders_and_literal_braces(self):
+        """Test that placeholders are filled and other braces kept."""
+        line = compile_template("{{subject}} {x} {{  author }}", ["subject", "author"])
+
+        assert line({"subject": "feat: a", "author": "Ann"}) == "feat: a {x} Ann"
+
+    @pytest.mark.parametrize(
+        "template,expected",
+        [("100% {{ subject }}", "100% feat: a"), ("static", "static")],
+    )
+    def test_percent_and_field_counts(self, template, expected):
+        """Test that literal percent signs survive and any field count works."""
+        line = compile_template(template, ["subject"])
+
+        commit = Commit(hash="a" * 40, author="Ann", date="2025-01-01", subject="x")
+
+        assert line({"subject": "feat: a"}) == expected
+        assert line(commit) == expected.replace("feat: a", "x")
+
+    def test_unknown_placeholder(self):
+        """Test that an unknown field is a configuration error."""
+        with pytest.raises(ConfigError, match="Unknown placeholder '{{ sha }}'"):
+            compile_template("- {{ sha }}", ["hash", "subject"])
+
+    @pytest.mark.parametrize(
+        "template", ["{{ subject | upper }}", "{% for c in commits %}"]
+    )
+    def test_unsupported_syntax(self, template):
+        """Test that filters and blocks are rejected."""
+        with pytest.raises(ConfigError, match="Unsupported template syntax"):
+            compile_template(template, ["subject"])
+
+
+class TestEntryRenderer:
+    """Tests for EntryRenderer class."""
+
+    def test_default_format(self):
+        """Test the full entry layout with every section."""
+        entry = EntryRenderer().render(
+            "2025-01-02",
+            [make_commit(1)],
+            latest_hash="abc",
+            changelog_summary="- Added things",
+            module_summaries={"api": "- API things"},
+            collapse_commits=True,
+        )
+
+        assert entry == (
+            "## [2025-01-02]\n"
+            "<!-- LATEST_COMMIT: abc -->\n\n"
+            "### Summary\n\n- Added things\n\n"
+            "### Module Summaries\n\n#### api\n\n- API things\n\n"
+            "### Changes (1 commits)\n\n"
+            "<details>\n<summary>All commits</summary>\n\n"
+            "- `0000000` feat: change 1 (Test Author, 2025-01-01 12:00:00)\n"
+            "\n</details>\n\n"
+        )
+
+    def test_plain_list(self):
+        """Test an entry without marker, summaries or details block."""
+        entry = EntryRenderer().render("Since 2025-01-01", [make_commit(2)])
+
+        assert entry == (
+            "## [Since 2025-01-01]\n\n"
+            "### Changes (1 commits)\n\n"
+            "- `0000000` feat: change 2 (Test Author, 2025-01-01 12:00:00)\n\n"
+        )
+
+    def test_from_config_templates(self):
+        """Test custom header and commit line templates."""
+        renderer = EntryRenderer.from_config(
+            {
+                "header_template": "## {{ title }}",
+                "commit_template": "* {{ subject }} by {{ author }} ({{ hash }})",
+            }
+        )
+
+        entry = renderer.render("v1.0", [make_commit(3)])
+
+        assert entry.startswith("## v1.0\n\n")
+        assert f"* feat: change 3 by Test Author ({3:040x})\n" in entry
+
+    def test_write_streams_iterator(self):
+        """Test writing commits from an iterator straight to a stream."""
+        out = io.StringIO()
+
+        EntryRenderer().write(
+            out, "big", (make_commit(n) for n in range(100_000)), commit_count=100_000
+        )
+
+        text = out.getvalue()
+        assert "### Changes (100000 commits)" in text
+        assert text.count("\n- `") == 100_000
@@ -0,0 +1,129 @@
+"""Tests for state module."""
+
+import json
+
+from automated_changelog.git_state import write_changelog_entry
+from automated_changelog.state import StateIndex
+
+
+def make_commit(hash_char, date):
+    return {"hash": hash_char * 40, "date": date}
+
+
+class TestStateIndex:
+    """Tests for StateIndex class."""
+
+    def test_missing_index_loads_empty(self, tmp_path):
+        """Test that a missing index file behaves like no state."""
+        index = StateIndex.load(tmp_path / "state.json", tmp_path / "CHANGELOG.md")
+
+        assert index.last_commit_hash is None
+        assert index.entries == []
+
+    def test_round_trip_and_entry_lookup(self, tmp_path):
+        """Test that entries stay addressable after later writes prepend text."""
+        changelog = tmp_path / "CHANGELOG.md"
+        state_file = tmp_path / "state.json"
+
+        # Indexes are loaded before each write, as the CLI does
+        first = "## [2025-01-14]\n\n- First entry\n"
+        index = StateIndex.load(state_file, changelog)
+        offset = write_changelog_entry(changelog, "a" * 40, first)
+        index.record_write(
+            changelog,
+            offset,
+            [("2025-01-14", first, [make_commit("a", "2025-01-14 10:00")])],
+            "a" * 40,
+        )
+
+        second = "## [2025-01-21]\n\n- Second entry\n"
+        index = StateIndex.load(state_file, changelog)
+        offset = write_changelog_entry(changelog, "b" * 40, second)
+        index.record_write(
+            changelog,
+            offset,
+            [
+                (
+                    "2025-01-21",
+                    second,
+                    [
+                        make_commit("c", "2025-01-21 09:00"),
+                        make_commit("b", "2025-01-20 09:00"),
+                    ],
+                )
+            ],
+            "b" * 40,
+        )
+
+        index = StateIndex.load(state_file, changelog)
+        assert index.last_commit_hash == "b" * 40
+        assert [entry["title"] for entry in index.entries] == [
+            "2025-01-21",
+            "2025-01-14",
+        ]
+        assert index.read_entry(changelog, index.entries[0]) == second
+        assert index.read_entry(changelog, index.entries[1]) == first
+        assert index.entries[0]["first_commit"] == "b" * 40
+        assert index.entries[0]["last_commit"] == "c" * 40
+        assert index.entries[0]["first_date"] == "2025-01-20 09:00"
+
+    def test_multiple_sections_in_one_write(self, tmp_path):
+        """Test that entries written together each get their own offset."""
+        changelog = tmp_path / "CHANGELOG.md"
+        sections = [
+            ("week 2", "## [week 2]\n\n- two\n", [make_commit("b", "2025-01-08")]),
+            ("week 1", "## [week 1]\n\n- one\n", [make_commit("a", "2025-01-01")]),
+        ]
+
+        content = "\n\n".join(text for _, text, _ in sections)
+        offset = write_changelog_entry(changelog, None, content)
+        index = StateIndex(tmp_path / "state.json")
+        index.record_write(changelog, offset, sections)
+
+        assert [index.read_entry(changelog, e) for e in index.entries] == [
+            text for _, text, _ in sections
+        ]
+
+    def test_stale_index_keeps_entries(self, tmp_path):
+        """Test that a hand-edited changelog keeps the index's entries."""
+        changelog = tmp_path / "CHANGELOG.md"
+        state_file = tmp_path / "state.json"
+        sections = [
+            ("week 2", "## [week 2]\n\n- two\n", [make_commit("b", "2025-01-08")]),
+            ("week 1", "## [week 1]\n\n- one\n", [make_commit("a", "2025-01-01")]),
+        ]
+        content = "\n\n".join(text for _, text, _ in sections)
+        offset = write_changelog_entry(changelog, "b" * 40, content)
+        StateIndex(state_file).record_write(changelog, offset, sections, "b" * 40)
+
+        # Reword the newest entry: older entries keep their position
+        changelog.write_text(changelog.read_text().replace("- two", "- two, fixed"))
+        index = StateIndex.load(state_file, changelog)
+
+        assert index.last_commit_hash is None
+        assert [e["title"] for e in index.entries] == ["week 2", "week 1"]
+        assert index.entries[0]["unverified"] is True
+        assert "unverified" not in index.entries[1]
+        assert index.read_entry(changelog, index.entries[1]) == sections[1][1]
+
+        third = "## [week 3]\n\n- three\n"
+        offset = write_changelog_entry(changelog, "c" * 40, third)
+        index.record_write(
+            changelog, offset, [("week 3", third, [make_commit("c", "2025-01-15")])]
+        )
+
+        index = StateIndex.load(state_file, changelog)
+        assert [e["title"] for e in index.entries] == ["week 3", "week 2", "week 1"]
+        assert index.read_entry(changelog, index.entries[2]) == sections[1][1]
+
+    def test_corrupt_index_ignored(self, tmp_path):
+        """Test that an unreadable index file behaves like no state."""
+        changelog = tmp_path / "CHANGELOG.md"
+        changelog.write_text("## [old]\n")
+        state_file = tmp_path / "state.json"
+        state_file.write_text("{not json")
+
+        assert StateIndex.load(state_file, changelog).entries == []
+
+        state_file.write_text(json.dumps({"version": 0}))
+        assert StateIndex.load(state_file, changelog).entries == []
@@ -0,0 +1,119 @@
+"""Tests for stub_server module, through the real litellm client."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from automated_changelog.cli import cli
+from automated_changelog.llm import AsyncLLMClient, RetryPolicy, call_llm
+from automated_changelog.stub_server import StubLLMServer
+from automated_changelog.summarization import generate_summary
+
+PROMPT = "Summarize these commits:\n- feat: add login\n- fix: token refresh"
+
+# Claude models reach the proxy through the Anthropic messages API, other
+# models through OpenAI chat completions
+MODELS = ["claude-sonnet-4-5", "gpt-4o"]
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_call_llm_is_deterministic(stub_llm, model):
+    """Test that the same prompt always gets the same answer."""
+    first = call_llm(PROMPT, model=model)
+
+    assert first == call_llm(PROMPT, model=model) == stub_llm.answer(PROMPT)
+    assert first.startswith("- Summarized 2 commit lines\n")
+    assert call_llm(PROMPT + "\n- docs: readme", model=model) != first
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_call_llm_streams(stub_llm, model):
+    """Test that streamed answers arrive in pieces and match the full answer."""
+    pieces = []
+
+    text = call_llm(PROMPT, model=model, on_token=pieces.append)
+
+    assert len(pieces) > 1
+    assert "".join(pieces) == text == stub_llm.answer(PROMPT)
+
+
+def test_completion_tokens(stub_llm):
+    """Test that answers are padded to and report the configured tokens."""
+    stub_llm.completion_tokens = 50
+    client = AsyncLLMClient()
+
+    async def run():
+        async with client:
+            return await client.complete(PROMPT)
+
+    text = asyncio.run(run())
+
+    assert len(text) // 4 + 1 >= 50
+    assert client.latency.completion_tokens == 50
+
+
+def test_failures_are_retried(stub_llm):
+    """Test that simulated server errors go through the client's retries."""
+    stub_llm.error_rate = 1.0
+    policy = RetryPolicy(max_retries=2, backoff_base=0)
+
+    with pytest.raises(Exception) as excinfo:
+        call_llm(PROMPT, retry_policy=policy)
+
+    assert excinfo.value.status_code == 503
+    assert stub_llm.requests == stub_llm.errors == 3
+
+
+def test_client_errors_are_not_retried(stub_llm):
+    """Test that a simulated 400 fails without retries."""
+    stub_llm.error_rate = 1.0
+    stub_llm.error_status = 400
+
+    with pytest.raises(Exception):
+        call_llm(PROMPT, retry_policy=RetryPolicy(max_retries=2, backoff_base=0))
+
+    assert stub_llm.requests == 1
+
+
+def test_concurrent_summaries_with_latency(stub_llm):
+    """Test a map-reduce summary running concurrently against slow answers."""
+    stub_llm.latency = 0.2
+    commits = [
+        {"short_hash": f"{n:07x}", "subject": f"feat: change {n}", "author": "A",
+         "date": "2025-01-01 10:00", "hash": f"{n:040x}"}
+        for n in range(40)
+    ]  # fmt: skip
+    client = AsyncLLMClient(max_concurrency=8)
+
+    summary = generate_summary(
+        commits, "Summarize.", chunk_token_budget=100, client=client
+    )
+
+    # Eight chunk summaries at once, then the reduce step
+    assert summary.startswith("- Summarized ")
+    assert stub_llm.requests > 2
+    assert client.latency.percentile(50) >= 0.2
+    assert sum(seconds for seconds, _ in client.latency.attempts) > 1.0
+
+
+def test_seeded_failures_are_reproducible():
+    """Test that the same seed fails the same requests."""
+
+    def outcomes(seed):
+        with StubLLMServer(error_rate=0.5, seed=seed) as server:
+            return [server._next_outcome()[1] for _ in range(20)]
+
+    assert outcomes(1) == outcomes(1)
+    assert any(outcomes(1)) and not all(outcomes(1))
+
+
+def test_stub_llm_command():
+    """Test that the command prints how to point the tools at the server."""
+    with patch.object(StubLLMServer, "serve_forever"):
+        result = CliRunner().invoke(cli, ["stub-llm", "--port", "0", "--latency", "1"])
+
+    assert result.exit_code == 0
+    assert "export LITELLM_PROXY_API_BASE=http://127.0.0.1:" in result.output
+    assert "0 requests served (0 failed)" in result.output
@@ -0,0 +1,556 @@
+"""Tests for summarization module."""
+
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from automated_changelog.cache import SummaryCache
+from automated_changelog.compaction import PromptCompactor
+from automated_changelog.summarization import (
+    OTHER_MODULE,
+    CommitFilter,
+    chunk_by_tokens,
+    compile_filter,
+    compile_path_patterns,
+    estimate_tokens,
+    filter_commits,
+    generate_module_summaries,
+    generate_summary,
+    group_commits_by_module,
+)
+
+
+def make_commit(subject, paths=None, short_hash="abc123d"):
+    commit = {
+        "hash": short_hash + "0" * (40 - len(short_hash)),
+        "short_hash": short_hash,
+        "author": "Test Author",
+        "date": "2025-10-27 14:32",
+        "subject": subject,
+    }
+    if paths is not None:
+        commit["paths"] = tuple(paths)
+    return commit
+
+
+class TestFilterCommits:
+    """Tests for filter_commits function."""
+
+    def test_no_filter_config_returns_all(self):
+        """Test that an empty filter config keeps every commit."""
+        commits = [make_commit("chore: bump"), make_commit("feat: add")]
+
+        assert filter_commits(commits, {}) == commits
+
+    def test_ignore_prefixes(self):
+        """Test that commits starting with an ignored prefix are dropped."""
+        commits = [make_commit("chore: bump"), make_commit("feat: add")]
+
+        result = filter_commits(commits, {"ignore_prefixes": ["chore:"]})
+
+        assert [c["subject"] for c in result] == ["feat: add"]
+
+    def test_ignore_keywords_case_insensitive(self):
+        """Test that keyword matching ignores case."""
+        commits = [make_commit("Fix TYPO in help"), make_commit("Fix crash")]
+
+        result = filter_commits(commits, {"ignore_keywords": ["typo"]})
+
+        assert [c["subject"] for c in result] == ["Fix crash"]
+
+    def test_accepts_iterator(self):
+        """Test that commits can be consumed lazily from an iterator."""
+        commits = iter([make_commit("feat: one"), make_commit("chore: two")])
+
+        result = filter_commits(commits, {"ignore_prefixes": ["chore:"]})
+
+        assert [c["subject"] for c in result] == ["feat: one"]
+
+    def test_ignore_paths_only_drops_docs_only_commit(self):
+        """Test that a commit touching only ignored paths is dropped."""
+        commits = [
+            make_commit("Update guide", paths=["docs/guide.rst", "README.md"]),
+            make_commit("Add parser", paths=["src/parser.py", "docs/parser.md"]),
+        ]
+
+        result = filter_commits(
+            commits, {"ignore_paths_only": ["*.md", "docs/", "tests/"]}
+        )
+
+        assert [c["subject"] for c in result] == ["Add parser"]
+
+    def test_ignore_paths_only_keeps_commits_without_paths(self):
+        """Test that commits with unknown or empty file lists are kept."""
+        commits = [
+            make_commit("Merge branch"),
+            make_commit("Empty commit", paths=[]),
+        ]
+
+        result = filter_commits(commits, {"ignore_paths_only": ["*.md"]})
+
+        assert len(result) == 2
+
+    def test_ignore_paths_only_keeps_truncated_commits(self):
+        """Test that a commit whose file list was cut short is never dropped."""
+        commit = make_commit("Vendor docs", paths=["docs/a.md", "docs/b.md"])
+        commit["paths_truncated"] = True
+
+        result = filter_commits([commit], {"ignore_paths_only": ["docs/"]})
+
+        assert result == [commit]
+
+
+class TestCompileFilter:
+    """Tests for the precompiled CommitFilter."""
+
+    def reference_is_ignored(self, subject, prefixes, keywords):
+        """The original per-rule implementation, kept as an oracle."""
+        if any(subject.startswith(prefix) for prefix in prefixes):
+            return True
+        subject_lower = subject.lower()
+        return any(keyword.lower() in subject_lower for keyword in keywords)
+
+    def test_matches_reference_implementation(self):
+        """Test that compiled rules give the same results as the naive loop."""
+        rng = random.Random(42)
+        words = ["fix", "fixture", "fixup", "Typo", "typ", "cache", "[skip ci]", "é"]
+        prefixes = ["chore:", "docs:", "fix", "Fix(", "wip"]
+        keywords = words + ["merge branch", "FIXME", "ca"]
+        subjects = [
+            " ".join(rng.choice(words + prefixes + ["feat:", "add"]) for _ in range(4))
+            for _ in range(2000)
+        ]
+
+        compiled = CommitFilter(tuple(prefixes), tuple(keywords))
+
+        for subject in subjects:
+            expected = self.reference_is_ignored(subject, prefixes, keywords)
+            assert compiled.is_ignored({"subject": subject}) == expected, subject
+
+    def test_keyword_special_characters(self):
+        """Test that regex metacharacters in keywords are matched literally."""
+        compiled = CommitFilter(ignore_keywords=("[skip ci]", "a.b", "(wip)"))
+
+        assert compiled.is_ignored({"subject": "Release [SKIP CI]"})
+        assert compiled.is_ignored({"subject": "see A.B"})
+        assert not compiled.is_ignored({"subject": "see axb"})
+        assert compiled.is_ignored({"subject": "(WIP) parser"})
+
+    def test_empty_keyword_matches_everything(self):
+        """Test that an empty keyword keeps the original 'always matches' rule."""
+        compiled = CommitFilter(ignore_keywords=("",))
+
+        assert compiled.is_ignored({"subject": "anything"})
+
+    def test_compile_filter_is_cached(self):
+        """Test that identical configs reuse one compiled filter."""
+        config = {"ignore_prefixes": ["chore:"], "ignore_keywords": ["typo"]}
+
+        assert compile_filter(config) is compile_filter(dict(config))
+
+    def test_filter_commits_accepts_compiled_filter(self):
+        """Test that filter_commits takes a CommitFilter directly."""
+        commits = [make_commit("chore: bump"), make_commit("feat: add")]
+
+        result = filter_commits(
+            commits, compile_filter({"ignore_prefixes": ["chore:"]})
+        )
+
+        assert [c["subject"] for c in result] == ["feat: add"]
+
+
+class TestCompilePathPatterns:
+    """Tests for compile_path_patterns function."""
+
+    def test_no_patterns(self):
+        """Test that an empty pattern list compiles to None."""
+        assert compile_path_patterns(()) is None
+
+    def test_basename_pattern_matches_at_any_depth(self):
+        """Test that slash-free patterns match file names anywhere."""
+        matcher = compile_path_patterns(("*.md",))
+
+        assert matcher.match("README.md")
+        assert matcher.match("docs/deep/guide.md")
+        assert not matcher.match("src/md.py")
+
+    def test_directory_pattern(self):
+        """Test that trailing-slash patterns match everything beneath them."""
+        matcher = compile_path_patterns(("tests/",))
+
+        assert matcher.match("tests/test_cli.py")
+        assert matcher.match("pkg/tests/unit/test_x.py")
+        assert not matcher.match("src/tests.py")
+        assert not matcher.match("contests/a.py")
+
+    def test_rooted_pattern(self):
+        """Test that patterns with an inner slash match from the root."""
+        matcher = compile_path_patterns(("src/*.txt", "/.github/*"))
+
+        assert matcher.match("src/notes.txt")
+        assert not matcher.match("lib/src/notes.txt")
+        assert matcher.match(".github/workflows/ci.yml")
+
+    def test_star_stays_within_one_directory(self):
+        """Test that '*' doesn't cross '/', unlike fnmatch, while '**' does."""
+        matcher = compile_path_patterns(("src/*.py",))
+
+        assert matcher.match("src/app.py")
+        assert not matcher.match("src/a/b/c.py")
+
+        matcher = compile_path_patterns(("src/**/*.py", "**/fixtures", "vendor/**"))
+
+        assert matcher.match("src/app.py")
+        assert matcher.match("src/a/b/c.py")
+        assert not matcher.match("src/a/b/c.txt")
+        assert matcher.match("tests/unit/fixtures/data.json")
+        assert matcher.match("vendor/lib/x.c")
+        assert not matcher.match("lib/vendor/x.c")
+
+    def test_character_classes(self):
+        """Test '?' and bracket expressions, including negation."""
+        matcher = compile_path_patterns(("v?.[0-9]", "*.[!c]"))
+
+        assert matcher.match("v1.2")
+        assert not matcher.match("v12.c")
+        assert matcher.match("lib/x.h")
+        assert not matcher.match("lib/x.c")
+
+
+class TestChunkByTokens:
+    """Tests for chunk_by_tokens function."""
+
+    def test_chunks_respect_budget_and_order(self):
+        """Test that items are packed in order without exceeding the budget."""
+        items = [f"- line {n:03d} " + "x" * 30 for n in range(20)]
+
+        chunks = chunk_by_tokens(items, token_budget=40)
+
+        assert [item for chunk in chunks for item in chunk] == items
+        assert len(chunks) > 1
+        for chunk in chunks:
+            assert sum(estimate_tokens(item) for item in chunk) <= 40
+
+    def test_oversized_item_gets_own_chunk(self):
+        """Test that an item larger than the budget is not dropped."""
+        chunks = chunk_by_tokens(["short", "y" * 400, "short"], token_budget=10)
+
+        assert chunks == [["short"], ["y" * 400], ["short"]]
+
+
+class TestGenerateSummary:
+    """Tests for generate_summary function."""
+
+    def test_no_commits(self):
+        """Test that an empty commit list needs no LLM call."""
+        with patch(
+            "automated_changelog.summarization.acall_llm", new_callable=AsyncMock
+        ) as mock_llm:
+            assert generate_summary([], "Summarize") == "No significant changes."
+
+        assert not mock_llm.called
+
+    @patch("automated_changelog.summarization.acall_llm", new_callable=AsyncMock)
+    def test_single_prompt_when_within_budget(self, mock_llm):
+        """Test that small ranges are summarized with one LLM call."""
+        mock_llm.return_value = "  - Added things\n"
+        commits = [make_commit("feat: one"), make_commit("fix: two")]
+
+        summary = generate_summary(commits, "Summarize", chunk_token_budget=10_000)
+
+        assert summary == "- Added things"
+        mock_llm.assert_called_once()
+        prompt = mock_llm.call_args.kwargs["prompt"]
+        assert "feat: one" in prompt and "fix: two" in prompt
+
+    @patch("automated_changelog.summarization.acall_llm", new_callable=AsyncMock)
+    def test_map_reduce_for_large_ranges(self, mock_llm):
+        """Test that large ranges are chunked, summarized, then reduced."""
+
+        def fake_llm(prompt, model, **kwargs):
+            if "summarized in parts" in prompt:
+                return "- final"
+            return f"- partial {prompt.count('feat:')}"
+
+        mock_llm.side_effect = fake_llm
+        commits = [make_commit(f"feat: change {n}") for n in range(40)]
+
+        summary = generate_summary(commits, "Summarize", chunk_token_budget=100)
+
+        assert summary == "- final"
+        prompts = [call.kwargs["prompt"] for call in mock_llm.call_args_list]
+        map_prompts = [p for p in prompts if "summarized in parts" not in p]
+        assert len(map_prompts) > 1
+        # Every commit is sent exactly once across the map prompts
+        assert sum(p.count("feat:") for p in map_prompts) == 40
+        # The reduce prompt sees every partial summary
+        assert prompts[-1].count("- partial") == len(map_prompts)
+
+    @patch("automated_changelog.summarization.acall_llm", new_callable=AsyncMock)
+    def test_only_final_call_streams(self, mock_llm):
+        """Test that on_token is only passed to the reduce call."""
+        mock_llm.return_value = "- summary"
+        commits = [make_commit(f"feat: change {n}") for n in range(40)]
+        on_token = print
+
+        generate_summary(
+            commits, "Summarize", chunk_token_budget=100, on_token=on_token
+        )
+
+        streams = [call.kwargs.get("on_token") for call in mock_llm.call_args_list]
+        assert streams[-1] is on_token
+        assert not any(streams[:-1])
+
+    @patch("automated_changelog.llm.get_llm_client")
+    @patch("automated_changelog.llm.acompletion")
+    def test_map_calls_run_concurrently(self, mock_completion, mock_client):
+        """Test that chunk summaries are requested in parallel, up to the limit."""
+        mock_client.return_value = {"api_base": "http://proxy", "api_key": "k"}
+        in_flight = 0
+        peak = 0
+
+        async def fake_completion(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+            message = SimpleNamespace(content="- partial")
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+        mock_completion.side_effect = fake_completion
+        commits = [make_commit(f"feat: change {n}") for n in range(40)]
+
+        summary = generate_summary(
+            commits, "Summarize", chunk_token_budget=100, max_concurrency=3
+        )
+
+        assert summary == "- partial"
+        assert peak == 3
+
+    @patch("automated_changelog.summarization.acall_llm", new_callable=AsyncMock)
+    def test_partials_reduced_hierarchically(self, mock_llm):
+        """Test that partials which don't fit one prompt are merged in rounds."""
+        mock_llm.side_effect = lambda prompt, model, **kwargs: "- " + "p" * 200
+
+        commits = [make_commit(f"feat: change {n}") for n in range(40)]
+
+        summary = generate_summary(commits, "Summarize", chunk_token_budget=100)
+
+        prompts = [call.kwargs["prompt"] for call in mock_llm.call_args_list]
+        assert any("Partial summaries (part" in p for p in prompts)
+        assert "summarized in parts" in prompts[-1]
+        assert summary.startswith("- p")
+
+    @patch("automated_changelog.summarization.acall_llm", new_callable=AsyncMock)
+    def test_cached_summary_skips_llm(self, mock_llm, tmp_path):
+        """Test that a repeated run over the same commits hits the cache."""
+        mock_llm.return_value = "- Added things"
+        cache = SummaryCache(tmp_path / "cache")
+        commits = [make_commit("feat: one"), make_commit("fix: two")]
+
+        first = generate_summary(commits, "Summarize", cache=cache)
+        second = generate_summary(commits, "Summarize", cache=cache)
+
+        assert first == second == "- Added things"
+        mock_llm.assert_called_once()
+        assert cache.hits == 1
+
+    @patch("automated_changelog.summarization.acall_llm", new_callable=AsyncMock)
+    def test_cache_key_depends_on_inputs(self, mock_llm, tmp_path):
+        """Test that changing model, prompt, max_tokens or commits misses."""
+        mock_llm.return_value = "- summary"
+        cache = SummaryCache(tmp_path / "cache")
+        commits = [make_commit("feat: one")]
+
+        generate_summary(commits, "Summarize", cache=cache)
+        generate_summary(commits, "Summarize", model="other", cache=cache)
+        generate_summary(commits, "Other prompt", cache=cache)
+        generate_summary(commits, "Summarize", max_tokens=100, cache=cache)
+
+        assert mock_llm.call_count == 4
+        assert cache.hits == 0
+
+        # A longer range still calls the LLM, reusing the cached sub-range
+        generate_summary(commits + [make_commit("fix")], "Summarize", cache=cache)
+
+        assert mock_llm.call_count == 5
+        assert "already summarized" in mock_llm.call_args.kwargs["prompt"]
+
+    @patch("automated_changelog.summarization.acall_llm", new_callable=AsyncMock)
+    def test_reuses_summary_of_earlier_range(self, mock_llm, tmp_path):
+        """Test that only commits after an already summarized range are sent."""
+        mock_llm.side_effect = lambda prompt, model, **kwargs: (
+            "- combined" if "already summarized" in prompt else "- earlier work"
+        )
+        cache = SummaryCache(tmp_path / "cache")
+        earlier = [
+            make_commit("feat: two", short_hash="bbb0000"),
+            make_commit("feat: one", short_hash="aaa0000"),
+        ]
+        generate_summary(earlier, "Summarize", cache=cache)
+
+        newer = [
+            make_commit("fix: four", short_hash="ddd0000"),
+            make_commit("fix: three", short_hash="ccc0000"),
+        ]
+        summary = generate_summary(newer + earlier, "Summarize", cache=cache)
+
+        assert summary == "- combined"
+        prompt = mock_llm.call_args.kwargs["prompt"]
+        assert "- earlier work" in prompt
+        assert "fix: four" in prompt and "fix: three" in prompt
+        assert "feat: one" not in prompt and "feat: two" not in prompt
+
+    @patch("automated_changelog.summarization.acall_llm", new_callable=AsyncMock)
+    def test_combines_adjacent_cached_ranges(self, mock_llm, tmp_path):
+        """Test that cached ranges are merged by one reduce call, then cached."""
+
+        def fake_llm(prompt, model, **kwargs):
+            if "summarized in parts" in prompt:
+                return "- one and two"
+            return "- one" if "feat: one" in prompt else "- two"
+
+        mock_llm.side_effect = fake_llm
+        cache = SummaryCache(tmp_path / "cache")
+        first = [make_commit("feat: one", short_hash="aaa0000")]
+        second = [make_commit("feat: two", short_hash="bbb0000")]
+        generate_summary(first, "Summarize", cache=cache)
+        generate_summary(second, "Summarize", cache=cache)
+
+        summary = generate_summary(second + first, "Summarize", cache=cache)
+
+        assert summary == "- one and two"
+        assert mock_llm.call_count == 3
+        prompt = mock_llm.call_args.kwargs["prompt"]
+        assert "Part 1:\n- two" in prompt and "Part 2:\n- one" in prompt
+        assert "feat: one" not in prompt
+
+        assert generate_summary(second + first, "Summarize", cache=cache) == summary
+        assert mock_llm.call_count == 3
+
+    @patch("automated_changelog.summarization.acall_llm", new_callable=AsyncMock)
+    def test_compactor_shrinks_prompt(self, mock_llm, tmp_path):
+        """Test that a compactor sends merged subjects and gets its own cache key."""
+        mock_llm.return_value = "- summary"
+        cache = SummaryCache(tmp_path / "cache")
+        commits = [make_commit(f"chore: bump version to 1.{n}") for n in range(10)]
+        compactor = PromptCompactor()
+
+        generate_summary(commits, "Summarize", cache=cache, compactor=compactor)
+        generate_summary(commits, "Summarize", cache=cache)
+
+        compact_prompt, full_prompt = (
+            call.kwargs["prompt"] for call in mock_llm.call_args_list
+        )
+        assert "- chore: bump version to 1.0 (x10)" in compact_prompt
+        assert "Test Author" not in compact_prompt
+        assert full_prompt.count("Test Author") == 10
+        assert compactor.tokens_saved > 0
+        assert cache.hits == 0
+
+
+class TestGroupCommitsByModule:
+    """Tests for group_commits_by_module function."""
+
+    def test_groups_by_touched_directories(self):
+        """Test that commits land in every module whose files they touch."""
+        api = make_commit("api fix", paths=["services/api/app.py"])
+        both = make_commit("shared", paths=["web/index.ts", "services/api/x.py"])
+        root = make_commit("readme", paths=["README.md"])
+
+        groups = group_commits_by_module([api, both, root], ["web", "services/api"])
+
+        assert list(groups) == ["web", "services/api", OTHER_MODULE]
+        assert groups["web"] == [both]
+        assert groups["services/api"] == [api, both]
+        assert groups[OTHER_MODULE] == [root]
+
+    def test_most_specific_module_wins(self):
+        """Test that nested module directories take precedence."""
+        commit = make_commit("api", paths=["services/api/app.py"])
+        other = make_commit("svc", paths=["services/common/util.py"])
+
+        groups = group_commits_by_module([commit, other], ["services", "services/api/"])
+
+        assert groups["services/api/"] == [commit]
+        assert groups["services"] == [other]
+
+    def test_empty_modules_omitted_and_unknown_paths_other(self):
+        """Test that unused modules are dropped and pathless commits are 'other'."""
+        commit = make_commit("merge")
+
+        groups = group_commits_by_module([commit], ["web", "api"])
+
+        assert groups == {OTHER_MODULE: [commit]}
+
+    def test_truncated_paths_are_other(self):
+        """Test that commits with truncated file lists are grouped as 'other'."""
+        commit = make_commit("vendor", paths=["web/vendor/a.js"])
+        commit["paths_truncated"] = True
+
+        groups = group_commits_by_module([commit], ["web", "api"])
+
+        assert groups == {OTHER_MODULE: [commit]}
+
+
+class TestGenerateModuleSummaries:
+    """Tests for generate_module_summaries function."""
+
+    @patch("automated_changelog.summarization.acall_llm", new_callable=AsyncMock)
+    def test_module_and_overall_summaries(self, mock_llm):
+        """Test that each module is summarized and then rolled up."""
+
+        def fake_llm(prompt, model, **kwargs):
+            if "Module summaries:" in prompt:
+                return "Overall rollup"
+            return "- " + prompt.split("Module: ")[1].split("\n")[0]
+
+        mock_llm.side_effect = fake_llm
+        groups = {
+            "web": [make_commit("feat: page")],
+            "api": [make_commit("feat: endpoint")],
+        }
+
+        overall, modules = generate_module_summaries(
+            groups, "Summarize module", "Roll up"
+        )
+
+        assert overall == "Overall rollup"
+        assert modules == {"web": "- web", "api": "- api"}
+        rollup_prompt = mock_llm.call_args_list[-1].kwargs["prompt"]
+        assert rollup_prompt.startswith("Roll up")
+        assert "## web\n- web" in rollup_prompt
+        assert "## api\n- api" in rollup_prompt
+
+    @patch("automated_changelog.summarization.acall_llm", new_callable=AsyncMock)
+    def test_modules_summarized_in_parallel(self, mock_llm):
+        """Test that N modules take about as long as the slowest one."""
+
+        async def fake_llm(prompt, model, **kwargs):
+            await asyncio.sleep(0.1)
+            return "- done"
+
+        mock_llm.side_effect = fake_llm
+        groups = {f"module{n}": [make_commit(f"feat: {n}")] for n in range(8)}
+
+        start = time.perf_counter()
+        generate_module_summaries(groups, "Summarize", max_concurrency=8)
+        elapsed = time.perf_counter() - start
+
+        # 8 module calls in parallel plus the rollup, not 9 sequential calls
+        assert elapsed < 0.5
+
+    @patch("automated_changelog.summarization.acall_llm", new_callable=AsyncMock)
+    def test_rollup_is_cached(self, mock_llm, tmp_path):
+        """Test that a repeated run reuses module and overall summaries."""
+        mock_llm.return_value = "- cached"
+        cache = SummaryCache(tmp_path)
+        groups = {"web": [make_commit("a")], "api": [make_commit("b")]}
+
+        generate_module_summaries(groups, "Summarize", cache=cache)
+        generate_module_summaries(groups, "Summarize", cache=cache)
+
+        assert mock_llm.call_count == 3